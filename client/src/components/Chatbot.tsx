@@ -4,6 +4,9 @@ import { BeatLoader } from 'react-spinners';
 import { FaTimes } from 'react-icons/fa'; // För stäng-knappen
 import profilfoto from '../assets/profilfoto.jpg'; // Relativ sökväg till din bild
 
+// Conversation thread of this browser session, assigned by the server
+const CONVERSATION_ID_KEY = 'chat_conversation_id';
+
 // --- Types ---
 interface Message {
     id: number;
@@ -22,6 +25,7 @@ const ChatWindow: React.FC = () => {
     // const [error, setError] = useState<string | null>(null);
     const [isVisible, setIsVisible] = useState(false); // För att visa/dölja chatboten
     const messagesEndRef = useRef<HTMLDivElement>(null);
+    const conversationIdRef = useRef<string | null>(sessionStorage.getItem(CONVERSATION_ID_KEY));
 
     const apiBaseUrl = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
@@ -55,7 +59,8 @@ const ChatWindow: React.FC = () => {
                 },
                 body: JSON.stringify({ 
                     query: trimmedInput,
-                    conversation_id: 'frontend_chat',
+                    // Omitted on the first message, the server then starts a new conversation
+                    ...(conversationIdRef.current ? { conversation_id: conversationIdRef.current } : {}),
                     user_id: 'web_user'
                 }),
             });
@@ -77,6 +82,11 @@ const ChatWindow: React.FC = () => {
                 throw new Error("Received an empty response from the server.");
             }
 
+            if (data.conversation_id) {
+                conversationIdRef.current = data.conversation_id;
+                sessionStorage.setItem(CONVERSATION_ID_KEY, data.conversation_id);
+            }
+
             const aiMessage: Message = {
                 id: Date.now() + 1,
                 text: data.response,
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Compare end-to-end chat latency of the quality and fast agent profiles."""
+
+import sys
+import time
+import asyncio
+import statistics
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+QUERIES = [
+    "How old are you?",
+    "What is your experience with Python?",
+    "Vad har du studerat?",
+    "Which projects are you most proud of?",
+    "Hello!",
+]
+
+
+async def time_profile(profile: str) -> list:
+    """Answer every query with one profile, returning latencies in ms."""
+    from src.core.agent import get_agent_graph, run_agent
+
+    graph = get_agent_graph(profile=profile)
+    timings = []
+    for i, query in enumerate(QUERIES):
+        started = time.perf_counter()
+        result = await run_agent(
+            query=query,
+            conversation_id=f"benchmark_{profile}_{i}",
+            graph=graph
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+        if result.get("error"):
+            print(f"❌ {profile}: {result['error']}")
+    return timings
+
+
+async def main():
+    """Run the benchmark."""
+    print("🧪 Agent Profile Benchmark")
+    print("=" * 60)
+    print(f"⏱️  Answering {len(QUERIES)} queries per profile...")
+
+    medians = {}
+    for profile in ("quality", "fast"):
+        timings = await time_profile(profile)
+        medians[profile] = statistics.median(timings)
+        print(
+            f"   {profile:<8} median {medians[profile]:8.0f} ms   "
+            f"max {max(timings):8.0f} ms"
+        )
+
+    reduction = 1 - medians["fast"] / medians["quality"]
+    print(f"📊 Fast profile is {reduction:.0%} faster at the median")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
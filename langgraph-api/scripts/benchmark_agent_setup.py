@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Benchmark the per-request setup cost of the LangGraph agent."""
+
+import sys
+import time
+import statistics
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+REQUESTS = 50
+
+
+def time_calls(func, count: int) -> list:
+    """Time a function call repeatedly, in milliseconds."""
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(label: str, timings: list):
+    """Print median and p95 of a list of timings."""
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"   {label:<28} median {statistics.median(timings):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    """Compare building the graph per request with reusing the shared graph."""
+    print("🧪 Agent Setup Benchmark")
+    print("=" * 60)
+
+    from src.core.agent import create_agent_graph, get_agent_graph
+
+    print(f"⏱️  Setting up the agent for {REQUESTS} requests...")
+
+    # What every chat request used to do
+    per_request = time_calls(create_agent_graph, REQUESTS)
+
+    started = time.perf_counter()
+    graph = get_agent_graph()
+    first_use = (time.perf_counter() - started) * 1000
+    shared = time_calls(get_agent_graph, REQUESTS)
+
+    print("📊 Per-request setup cost:")
+    report("compile per request", per_request)
+    report("shared compiled graph", shared)
+    print(f"   One-time compile at startup: {first_use:.3f} ms")
+
+    if get_agent_graph() is not graph:
+        print("❌ Shared graph was rebuilt between requests")
+        sys.exit(1)
+
+    speedup = statistics.median(per_request) / max(statistics.median(shared), 1e-6)
+    print(f"✅ Shared graph removes per-request setup ({speedup:,.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
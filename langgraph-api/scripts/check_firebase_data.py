@@ -125,6 +125,7 @@ async def test_direct_search():
         docs = list(collection_ref.stream())
         
         results = []
+        embeddings = []
         for doc in docs:
             doc_data = doc.to_dict()
             
@@ -138,9 +139,7 @@ async def test_direct_search():
                 embedding_field = 'vector'
             
             if embedding_field and doc_data[embedding_field]:
-                # Calculate similarity
-                doc_embedding = doc_data[embedding_field]
-                similarity = embedding_service.calculate_similarity(query_embedding, doc_embedding)
+                embeddings.append(doc_data[embedding_field])
                 
                 # Get text content
                 text_content = doc_data.get('text') or doc_data.get('content') or doc_data.get('chunk') or 'No text found'
@@ -148,10 +147,14 @@ async def test_direct_search():
                 results.append({
                     'id': doc.id,
                     'text': text_content,
-                    'similarity': similarity,
                     'fields': list(doc_data.keys())
                 })
         
+        # Score all documents in one matrix product
+        similarities = embedding_service.similarities(query_embedding, embeddings)
+        for result, similarity in zip(results, similarities):
+            result['similarity'] = float(similarity)
+        
         # Sort by similarity
         results.sort(key=lambda x: x['similarity'], reverse=True)
         
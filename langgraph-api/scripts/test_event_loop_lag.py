@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Test that Firestore calls do not block the event loop under concurrent load."""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+CONCURRENT_REQUESTS = 20
+TICK_INTERVAL = 0.005
+MAX_ACCEPTABLE_LAG_MS = 50
+
+
+async def measure_lag(samples: list, stop: asyncio.Event):
+    """Record how late each scheduled tick of the event loop fires."""
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK_INTERVAL
+        await asyncio.sleep(TICK_INTERVAL)
+        samples.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def test_event_loop_lag():
+    """Run concurrent Firestore reads while measuring event loop lag."""
+    print("⏱️  Testing event loop lag under concurrent Firestore load...")
+
+    from src.services import FirebaseVectorStore
+
+    vector_store = FirebaseVectorStore()
+    docs, total, _ = await vector_store.list_documents(limit=1)
+    if not docs:
+        print("❌ No documents in collection, add some with scripts/test_search.py first")
+        return False
+    document_id = docs[0]["id"]
+    print(f"📄 Collection has {total} documents, reading {document_id}")
+
+    samples = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(samples, stop))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        vector_store.get_document(document_id)
+        for _ in range(CONCURRENT_REQUESTS)
+    ])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1] if samples else 0.0
+    worst = samples[-1] if samples else 0.0
+
+    print(f"📊 {CONCURRENT_REQUESTS} concurrent reads in {elapsed * 1000:.0f} ms")
+    print(f"   Event loop lag p99: {p99:.1f} ms, max: {worst:.1f} ms")
+
+    if worst > MAX_ACCEPTABLE_LAG_MS:
+        print(f"❌ Event loop was blocked for more than {MAX_ACCEPTABLE_LAG_MS} ms")
+        return False
+
+    print("✅ Event loop stayed responsive")
+    return True
+
+
+async def main():
+    """Run the test."""
+    print("🧪 Event Loop Lag Test")
+    print("=" * 60)
+
+    ok = await test_event_loop_lag()
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
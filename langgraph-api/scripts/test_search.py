@@ -50,7 +50,7 @@ async def test_firebase_search():
             # Try listing all documents
             print("\n📋 Listing all documents in collection...")
             try:
-                docs, total = await vector_store.list_documents(limit=10)
+                docs, total, _ = await vector_store.list_documents(limit=10)
                 print(f"Total documents in collection: {total}")
                 
                 if docs:
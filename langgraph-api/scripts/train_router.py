@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Train the local retrieval router from logged LLM decisions."""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import numpy as np
+
+HOLDOUT_SHARE = 0.2
+MIN_EXAMPLES = 50
+
+
+def read_decisions(path: Path) -> dict:
+    """Read logged decisions, keeping the latest one per query."""
+    decisions = {}
+    with open(path, encoding="utf-8") as log:
+        for line in log:
+            if line.strip():
+                entry = json.loads(line)
+                decisions[entry["query"]] = bool(entry["should_retrieve"])
+    return decisions
+
+
+async def main():
+    """Embed the logged queries, fit the classifier and save it."""
+    print("🧪 Retrieval Router Training")
+    print("=" * 60)
+
+    from src.config import settings
+    from src.core.router import RetrievalRouter, save_model, train_model
+    from src.services import EmbeddingService
+
+    if not settings.router_log_path:
+        print("❌ ROUTER_LOG_PATH is not set, decisions are only logged when it is")
+        sys.exit(1)
+    log_path = Path(settings.router_log_path)
+    if not log_path.is_file():
+        print(f"❌ No decision log at {log_path}, run the agent with ROUTER_LOG_PATH set first")
+        sys.exit(1)
+
+    decisions = read_decisions(log_path)
+    if len(decisions) < MIN_EXAMPLES:
+        print(f"❌ Only {len(decisions)} logged queries, need at least {MIN_EXAMPLES}")
+        sys.exit(1)
+
+    queries = list(decisions)
+    labels = np.array([decisions[q] for q in queries], dtype=np.float32)
+    print(f"📄 {len(queries)} queries, {labels.mean():.0%} needed retrieval")
+
+    embedding_service = EmbeddingService()
+    try:
+        embeddings = np.asarray(await embedding_service.embed_texts(queries), dtype=np.float32)
+    finally:
+        await embedding_service.aclose()
+
+    order = np.random.default_rng(0).permutation(len(queries))
+    split = int(len(order) * (1 - HOLDOUT_SHARE))
+    train, holdout = order[:split], order[split:]
+
+    weights, bias = train_model(embeddings[train], labels[train])
+
+    router = RetrievalRouter(confidence=settings.router_confidence)
+    router.weights, router.bias = weights, bias
+    probabilities = np.array([router.predict(e) for e in embeddings[holdout]])
+    confident = np.maximum(probabilities, 1 - probabilities) >= settings.router_confidence
+    correct = (probabilities >= 0.5) == labels[holdout].astype(bool)
+
+    print(f"📊 Holdout accuracy: {correct.mean():.1%} on {len(holdout)} queries")
+    if confident.any():
+        print(
+            f"   Confident on {confident.mean():.0%} of queries, "
+            f"accuracy there {correct[confident].mean():.1%}"
+        )
+
+    # Final model uses every example
+    weights, bias = train_model(embeddings, labels)
+    save_model(settings.router_model_path, weights, bias)
+    print(f"✅ Saved router model to {settings.router_model_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
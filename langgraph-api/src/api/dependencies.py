@@ -0,0 +1,27 @@
+"""FastAPI dependencies for the shared services."""
+
+from fastapi import Request
+from langgraph.graph.state import CompiledStateGraph
+
+from src.services import EmbeddingService, FirebaseVectorStore
+from src.services.container import ServiceContainer
+
+
+def get_services(request: Request) -> ServiceContainer:
+    """Get the application's service container."""
+    return request.app.state.services
+
+
+def get_vector_store(request: Request) -> FirebaseVectorStore:
+    """Get the shared vector store."""
+    return get_services(request).vector_store
+
+
+def get_embedding_service(request: Request) -> EmbeddingService:
+    """Get the shared embedding service."""
+    return get_services(request).embedding_service
+
+
+def get_agent(request: Request) -> CompiledStateGraph:
+    """Get the shared compiled agent graph."""
+    return get_services(request).agent_graph
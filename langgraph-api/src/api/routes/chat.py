@@ -1,21 +1,34 @@
 """Chat endpoint for AI assistant interactions."""
 
-from fastapi import APIRouter, HTTPException
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from langgraph.graph.state import CompiledStateGraph
 import structlog
+from src.api.dependencies import get_services
 from src.models import ChatRequest, ChatResponse, ErrorResponse
-from src.core.agent import run_agent
+from src.config import settings
+from src.core.agent import has_history, record_turn, run_agent, stream_agent
+from src.core.history import CHAT_MODEL
+from src.core.router import get_retrieval_router
+from src.services.container import ServiceContainer
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 logger = structlog.get_logger()
 
 
 @router.post("/", response_model=ChatResponse)
-async def chat(request: ChatRequest) -> ChatResponse:
+async def chat(
+    request: ChatRequest,
+    services: ServiceContainer = Depends(get_services)
+) -> ChatResponse:
     """
     Chat with the AI assistant.
     
     This endpoint processes user queries through the LangGraph agent,
-    which may retrieve relevant context from the knowledge base.
+    which may retrieve relevant context from the knowledge base. Answers
+    to near-identical earlier questions are served from the response cache.
     """
     try:
         logger.info(
@@ -25,12 +38,24 @@ async def chat(request: ChatRequest) -> ChatResponse:
             user_id=request.user_id
         )
         
+        graph = services.agent(request.profile)
+        query_embedding, cached = await _cached_response(request, services, graph)
+        if cached is not None:
+            logger.info("chat_response_cached", query=request.query[:100])
+            return ChatResponse(
+                **cached,
+                conversation_id=request.conversation_id,
+                cached=True
+            )
+        
         # Run the agent
         result = await run_agent(
             query=request.query,
             conversation_id=request.conversation_id,
             user_id=request.user_id,
-            additional_context=request.additional_context
+            additional_context=request.additional_context,
+            graph=graph,
+            filters=request.filters
         )
         
         # Check for errors
@@ -58,6 +83,13 @@ async def chat(request: ChatRequest) -> ChatResponse:
                 for doc in result.get("retrieved_context", [])
             ]
         )
+        _cache_response(
+            request,
+            services,
+            query_embedding,
+            response.response,
+            response.retrieved_context
+        )
         
         logger.info(
             "chat_response_sent",
@@ -74,4 +106,157 @@ async def chat(request: ChatRequest) -> ChatResponse:
         raise HTTPException(
             status_code=500,
             detail=f"Chat endpoint error: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    services: ServiceContainer = Depends(get_services)
+) -> StreamingResponse:
+    """
+    Chat with the AI assistant, streaming the answer as server-sent events.
+    
+    Emits a "node_start" and "node_end" event per agent step, a "token"
+    event per chunk of the generated answer and a final "done" event with
+    the full response and retrieved context, or an "error" event. A cached
+    answer is sent as a single "token" event followed by "done".
+    """
+    logger.info(
+        "chat_stream_request_received",
+        query=request.query[:100],
+        conversation_id=request.conversation_id,
+        user_id=request.user_id
+    )
+    
+    async def agent_events():
+        graph = services.agent(request.profile)
+        query_embedding, cached = await _cached_response(request, services, graph)
+        if cached is not None:
+            logger.info("chat_response_cached", query=request.query[:100])
+            yield {"event": "token", "content": cached["response"]}
+            yield {
+                "event": "done",
+                **cached,
+                "conversation_id": request.conversation_id,
+                "cached": True
+            }
+            return
+        
+        async for event in stream_agent(
+            query=request.query,
+            conversation_id=request.conversation_id,
+            user_id=request.user_id,
+            additional_context=request.additional_context,
+            graph=graph,
+            filters=request.filters
+        ):
+            if event["event"] == "done":
+                _cache_response(
+                    request,
+                    services,
+                    query_embedding,
+                    event["response"],
+                    event["retrieved_context"]
+                )
+                event["cached"] = False
+            yield event
+    
+    async def events():
+        try:
+            async for event in agent_events():
+                data = json.dumps(
+                    {key: value for key, value in event.items() if key != "event"},
+                    ensure_ascii=False,
+                    default=str
+                )
+                yield f"event: {event['event']}\ndata: {data}\n\n"
+        except Exception as e:
+            logger.error("chat_stream_error", error=str(e))
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _cached_response(
+    request: ChatRequest,
+    services: ServiceContainer,
+    graph: CompiledStateGraph
+) -> Tuple[Optional[List[float]], Optional[Dict[str, Any]]]:
+    """
+    Look up a cached answer to a chat request.
+    
+    Only the first turn of a conversation is cached, since later answers
+    depend on the history. Requests with additional context are never
+    cached, since the answer depends on more than the query, and neither
+    is small talk, which is answered without retrieval and would otherwise
+    pay for an embedding it does not need. A hit is recorded in the
+    conversation thread like an agent turn.
+    
+    Returns:
+        Tuple of (query embedding, cached response), the embedding is None
+        if the request is not cacheable
+    """
+    response_cache = services.response_cache
+    if not response_cache.enabled or request.additional_context:
+        return None, None
+    
+    route = get_retrieval_router().rule(request.query)
+    if route is not None and not route.should_retrieve:
+        return None, None
+    
+    if await has_history(graph, request.conversation_id):
+        return None, None
+    
+    # Reused by retrieval through the query embedding cache
+    query_embedding = await services.embedding_service.embed_text(request.query)
+    cached = response_cache.get(
+        query_embedding,
+        _cache_scope(request, services),
+        services.vector_store.document_version
+    )
+    if cached is not None:
+        await record_turn(
+            graph,
+            request.conversation_id,
+            request.query,
+            cached["response"],
+            cached["retrieved_context"]
+        )
+    return query_embedding, cached
+
+
+def _cache_scope(request: ChatRequest, services: ServiceContainer) -> str:
+    """Build the response cache scope of a chat request."""
+    return services.response_cache.scope(
+        request.filters,
+        request.profile or settings.agent_profile,
+        CHAT_MODEL
+    )
+
+
+def _cache_response(
+    request: ChatRequest,
+    services: ServiceContainer,
+    query_embedding: Optional[List[float]],
+    response: str,
+    retrieved_context: List[Dict[str, Any]]
+) -> None:
+    """Store an answer with the current versions of the documents it used."""
+    if query_embedding is None:
+        return
+    
+    services.response_cache.put(
+        query_embedding,
+        _cache_scope(request, services),
+        {"response": response, "retrieved_context": retrieved_context},
+        {
+            doc["id"]: services.vector_store.document_version(doc["id"])
+            for doc in retrieved_context
+        }
+    )
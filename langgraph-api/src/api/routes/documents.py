@@ -1,25 +1,46 @@
 """Document management endpoints."""
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive
+from typing import List, Optional, Tuple
+import asyncio
+import json
 import structlog
+from src.api.dependencies import get_vector_store
 from src.models import DocumentRequest, DocumentResponse, ErrorResponse
 from src.services import FirebaseVectorStore
+from src.services.bulk_ingest import BulkIngestor, iter_lines
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 logger = structlog.get_logger()
 
 
+class _RequestStreamingResponse(StreamingResponse):
+    """
+    Streaming response produced while the request body is still being read.
+    
+    StreamingResponse watches for a client disconnect by reading request
+    messages alongside the body iterator, which would swallow the request
+    chunks the iterator is waiting for. That listener is parked instead; a
+    disconnect still ends the stream through request.stream() or a failed send.
+    """
+    
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        await asyncio.Event().wait()
+
+
 @router.post("/", response_model=DocumentResponse)
-async def create_document(request: DocumentRequest) -> DocumentResponse:
+async def create_document(
+    request: DocumentRequest,
+    vector_store: FirebaseVectorStore = Depends(get_vector_store)
+) -> DocumentResponse:
     """
     Add a new document to the knowledge base.
     
     This will create embeddings and store the document in Firebase.
     """
     try:
-        vector_store = FirebaseVectorStore()
-        
         document_id = await vector_store.add_document(
             text=request.text,
             metadata=request.metadata,
@@ -47,11 +68,38 @@ async def create_document(request: DocumentRequest) -> DocumentResponse:
         )
 
 
+@router.post("/bulk")
+async def bulk_create_documents(
+    request: Request,
+    vector_store: FirebaseVectorStore = Depends(get_vector_store)
+) -> StreamingResponse:
+    """
+    Add many documents from an NDJSON request body.
+    
+    Each line is a JSON object with the same fields as a single document
+    request. Documents are embedded and written in batches while the body is
+    still streaming in. The response is NDJSON as well: an "error" event per
+    rejected line, a "progress" event per written batch and a final "done"
+    event with the totals.
+    """
+    ingestor = BulkIngestor(vector_store)
+    
+    logger.info("bulk_ingest_started")
+    
+    async def events():
+        async for event in ingestor.ingest(iter_lines(request.stream())):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+    
+    return _RequestStreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @router.get("/{document_id}")
-async def get_document(document_id: str):
+async def get_document(
+    document_id: str,
+    vector_store: FirebaseVectorStore = Depends(get_vector_store)
+):
     """Get a specific document by ID."""
     try:
-        vector_store = FirebaseVectorStore()
         document = await vector_store.get_document(document_id)
         
         if not document:
@@ -75,12 +123,11 @@ async def get_document(document_id: str):
 @router.put("/{document_id}", response_model=DocumentResponse)
 async def update_document(
     document_id: str,
-    request: DocumentRequest
+    request: DocumentRequest,
+    vector_store: FirebaseVectorStore = Depends(get_vector_store)
 ) -> DocumentResponse:
     """Update an existing document."""
     try:
-        vector_store = FirebaseVectorStore()
-        
         success = await vector_store.update_document(
             document_id=document_id,
             text=request.text,
@@ -112,11 +159,12 @@ async def update_document(
 
 
 @router.delete("/{document_id}", response_model=DocumentResponse)
-async def delete_document(document_id: str) -> DocumentResponse:
+async def delete_document(
+    document_id: str,
+    vector_store: FirebaseVectorStore = Depends(get_vector_store)
+) -> DocumentResponse:
     """Delete a document from the knowledge base."""
     try:
-        vector_store = FirebaseVectorStore()
-        
         success = await vector_store.delete_document(document_id)
         
         if not success:
@@ -146,14 +194,26 @@ async def delete_document(document_id: str) -> DocumentResponse:
 @router.get("/")
 async def list_documents(
     limit: int = Query(default=100, ge=1, le=1000),
-    offset: int = Query(default=0, ge=0)
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    offset: int = Query(
+        default=0,
+        ge=0,
+        deprecated=True,
+        description="Documents to skip; reads every skipped document, use cursor instead"
+    ),
+    vector_store: FirebaseVectorStore = Depends(get_vector_store)
 ):
-    """List documents with pagination."""
+    """
+    List documents, newest first.
+    
+    Pass the returned next_cursor to get the following page; it is null on
+    the last page. offset still works but is deprecated, since its cost
+    grows with the page depth.
+    """
     try:
-        vector_store = FirebaseVectorStore()
-        
-        documents, total_count = await vector_store.list_documents(
+        documents, total_count, next_cursor = await vector_store.list_documents(
             limit=limit,
+            cursor=cursor,
             offset=offset
         )
         
@@ -161,9 +221,12 @@ async def list_documents(
             "documents": documents,
             "total_count": total_count,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": next_cursor
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("document_list_error", error=str(e))
         raise HTTPException(
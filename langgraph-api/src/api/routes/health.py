@@ -1,6 +1,6 @@
 """Health check endpoint."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from datetime import datetime
 import structlog
 
@@ -9,16 +9,26 @@ logger = structlog.get_logger()
 
 
 @router.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """
     Health check endpoint.
     
-    Returns the service status and current timestamp.
+    Returns the service status, current timestamp and the state of the
+    in-memory embedding index, including its sync lag.
     """
+    services = request.app.state.services
+    embedding_service = services.embedding_service
+    document_cache = embedding_service.document_cache
+    
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "service": "peterbot-langgraph-api"
+        "service": "peterbot-langgraph-api",
+        **services.stats(),
+        "query_embedding_cache": embedding_service.query_cache.stats(),
+        "document_embedding_cache": (
+            document_cache.stats() if document_cache else None
+        )
     }
 
 
@@ -1,16 +1,47 @@
 """Search endpoint for semantic search in the knowledge base."""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 import structlog
-from src.models import SearchRequest, SearchResponse, SearchResult
+from typing import Any, Dict, List
+from src.api.dependencies import get_vector_store
+from src.models import (
+    SearchRequest,
+    SearchResponse,
+    SearchResult,
+    BatchSearchRequest,
+    BatchSearchResponse
+)
 from src.services import FirebaseVectorStore
 
 router = APIRouter(prefix="/search", tags=["search"])
 logger = structlog.get_logger()
 
 
+def _to_search_response(query: str, results: List[Dict[str, Any]]) -> SearchResponse:
+    """Convert vector store results to the response model."""
+    search_results = [
+        SearchResult(
+            id=result["id"],
+            text=result["text"],
+            similarity=result["similarity"],
+            metadata=result.get("metadata", {}),
+            created_at=result.get("created_at")
+        )
+        for result in results
+    ]
+    
+    return SearchResponse(
+        results=search_results,
+        query=query,
+        total_results=len(search_results)
+    )
+
+
 @router.post("/", response_model=SearchResponse)
-async def search(request: SearchRequest) -> SearchResponse:
+async def search(
+    request: SearchRequest,
+    vector_store: FirebaseVectorStore = Depends(get_vector_store)
+) -> SearchResponse:
     """
     Search the knowledge base using semantic similarity.
     
@@ -22,40 +53,26 @@ async def search(request: SearchRequest) -> SearchResponse:
             "search_request_received",
             query=request.query[:100],
             top_k=request.top_k,
-            threshold=request.threshold
+            threshold=request.threshold,
+            filters=request.filters,
+            mode=request.mode
         )
         
-        vector_store = FirebaseVectorStore()
-        
         # Perform search
         results = await vector_store.search(
             query=request.query,
             top_k=request.top_k,
-            threshold=request.threshold
+            threshold=request.threshold,
+            filters=request.filters,
+            mode=request.mode
         )
         
-        # Convert to response model
-        search_results = [
-            SearchResult(
-                id=result["id"],
-                text=result["text"],
-                similarity=result["similarity"],
-                metadata=result.get("metadata", {}),
-                created_at=result.get("created_at")
-            )
-            for result in results
-        ]
-        
-        response = SearchResponse(
-            results=search_results,
-            query=request.query,
-            total_results=len(search_results)
-        )
+        response = _to_search_response(request.query, results)
         
         logger.info(
             "search_completed",
-            results_count=len(search_results),
-            top_similarity=search_results[0].similarity if search_results else 0
+            results_count=response.total_results,
+            top_similarity=response.results[0].similarity if response.results else 0
         )
         
         return response
@@ -65,4 +82,46 @@ async def search(request: SearchRequest) -> SearchResponse:
         raise HTTPException(
             status_code=500,
             detail=f"Search error: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/batch", response_model=BatchSearchResponse)
+async def search_batch(
+    request: BatchSearchRequest,
+    vector_store: FirebaseVectorStore = Depends(get_vector_store)
+) -> BatchSearchResponse:
+    """
+    Search the knowledge base for many queries in one call.
+    
+    All queries are embedded with a single embedding request and scored
+    together, so N searches cost roughly as much as one.
+    """
+    try:
+        logger.info(
+            "batch_search_request_received",
+            query_count=len(request.queries),
+            top_k=request.top_k,
+            threshold=request.threshold
+        )
+        
+        results = await vector_store.search_batch(
+            queries=request.queries,
+            top_k=request.top_k,
+            threshold=request.threshold,
+            filters=request.filters
+        )
+        
+        return BatchSearchResponse(
+            results=[
+                _to_search_response(query, query_results)
+                for query, query_results in zip(request.queries, results)
+            ],
+            total_queries=len(request.queries)
+        )
+        
+    except Exception as e:
+        logger.error("batch_search_endpoint_error", error=str(e))
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch search error: {str(e)}"
+        )
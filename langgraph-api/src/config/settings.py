@@ -52,6 +52,70 @@ class Settings(BaseSettings):
     similarity_threshold: float = Field(default=0.7, env="SIMILARITY_THRESHOLD")
     max_search_results: int = Field(default=5, env="MAX_SEARCH_RESULTS")
     
+    # Agent Configuration
+    agent_profile: str = Field(default="quality", env="AGENT_PROFILE")
+    router_model_path: Optional[str] = Field(default=".cache/router.npz", env="ROUTER_MODEL_PATH")
+    router_confidence: float = Field(default=0.85, env="ROUTER_CONFIDENCE")
+    router_log_path: Optional[str] = Field(default=None, env="ROUTER_LOG_PATH")
+    router_shadow_rate: float = Field(default=0.0, env="ROUTER_SHADOW_RATE")
+    speculative_retrieval: bool = Field(default=True, env="SPECULATIVE_RETRIEVAL")
+    
+    # Conversation History Configuration
+    history_max_tokens: int = Field(default=1500, env="HISTORY_MAX_TOKENS")
+    history_summary_max_tokens: int = Field(default=300, env="HISTORY_SUMMARY_MAX_TOKENS")
+    
+    # Conversation Checkpoint Configuration
+    checkpoint_max_threads: int = Field(default=1000, env="CHECKPOINT_MAX_THREADS")
+    checkpoint_ttl_seconds: int = Field(default=86400, env="CHECKPOINT_TTL_SECONDS")
+    checkpoint_max_per_thread: int = Field(default=20, env="CHECKPOINT_MAX_PER_THREAD")
+    checkpoint_db_path: Optional[str] = Field(default=None, env="CHECKPOINT_DB_PATH")
+    
+    # Lexical and Hybrid Search Configuration
+    lexical_index_enabled: bool = Field(default=True, env="LEXICAL_INDEX_ENABLED")
+    search_mode: str = Field(default="vector", env="SEARCH_MODE")
+    hybrid_candidates: int = Field(default=20, env="HYBRID_CANDIDATES")
+    rrf_k: int = Field(default=60, env="RRF_K")
+    lexical_fast_path_coverage: float = Field(default=1.0, env="LEXICAL_FAST_PATH_COVERAGE")
+    lexical_fast_path_max_terms: int = Field(default=3, env="LEXICAL_FAST_PATH_MAX_TERMS")
+    
+    # Query Embedding Cache Configuration
+    query_embedding_cache_size: int = Field(default=1024, env="QUERY_EMBEDDING_CACHE_SIZE")
+    query_embedding_cache_ttl: int = Field(default=3600, env="QUERY_EMBEDDING_CACHE_TTL")
+    query_embedding_cache_normalize: bool = Field(
+        default=True,
+        env="QUERY_EMBEDDING_CACHE_NORMALIZE"
+    )
+    
+    # Response Cache Configuration
+    response_cache_size: int = Field(default=512, env="RESPONSE_CACHE_SIZE")
+    response_cache_ttl: int = Field(default=3600, env="RESPONSE_CACHE_TTL")
+    response_cache_similarity: float = Field(default=0.95, env="RESPONSE_CACHE_SIMILARITY")
+    
+    # Document Embedding Cache Configuration
+    embedding_cache_path: Optional[str] = Field(
+        default=".cache/embeddings.sqlite3",
+        env="EMBEDDING_CACHE_PATH"
+    )
+    
+    # Chunking Configuration
+    chunk_size_tokens: int = Field(default=400, env="CHUNK_SIZE_TOKENS")
+    chunk_overlap_tokens: int = Field(default=60, env="CHUNK_OVERLAP_TOKENS")
+    
+    # Bulk Ingest Configuration
+    bulk_max_batch_size: int = Field(default=256, env="BULK_MAX_BATCH_SIZE")
+    bulk_max_batch_tokens: int = Field(default=100000, env="BULK_MAX_BATCH_TOKENS")
+    bulk_embed_concurrency: int = Field(default=4, env="BULK_EMBED_CONCURRENCY")
+    
+    # Embedding Index Configuration
+    index_sync_enabled: bool = Field(default=False, env="INDEX_SYNC_ENABLED")
+    index_snapshot_dir: Optional[str] = Field(default=None, env="INDEX_SNAPSHOT_DIR")
+    vector_index_backend: str = Field(default="exact", env="VECTOR_INDEX_BACKEND")
+    ivf_nlist: Optional[int] = Field(default=None, env="IVF_NLIST")
+    ivf_nprobe: int = Field(default=8, env="IVF_NPROBE")
+    quantization_rerank_factor: int = Field(default=4, env="QUANTIZATION_RERANK_FACTOR")
+    index_vector_dir: Optional[str] = Field(default=None, env="INDEX_VECTOR_DIR")
+    index_recall_sample_size: int = Field(default=100, env="INDEX_RECALL_SAMPLE_SIZE")
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
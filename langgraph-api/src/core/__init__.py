@@ -1,6 +1,6 @@
 """Core module for LangGraph components."""
 
-from .agent import create_agent_graph
+from .agent import create_agent_graph, get_agent_graph, run_agent, stream_agent
 from .state import AgentState
 
-__all__ = ["create_agent_graph", "AgentState"]
\ No newline at end of file
+__all__ = ["create_agent_graph", "get_agent_graph", "run_agent", "stream_agent", "AgentState"]
\ No newline at end of file
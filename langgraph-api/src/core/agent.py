@@ -1,14 +1,33 @@
 """LangGraph agent implementation."""
 
-from typing import Dict, Any
-from langgraph.graph import StateGraph, END
+from typing import AsyncIterator, Dict, Any, List, Optional
+import threading
+import time
+from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph.state import CompiledStateGraph
+from langchain_core.messages import AIMessage, HumanMessage
 import structlog
+from src.config import settings
+from src.services import FirebaseVectorStore
 from .state import AgentState
+from .checkpointer import get_checkpointer
 from .nodes import Nodes
+from .router import SMALL_TALK
 
 logger = structlog.get_logger()
 
+# Node whose model tokens are streamed to the client
+STREAMED_NODE = "generate_response"
+
+# Last node of every profile, after which a turn is complete
+HISTORY_NODE = "compact_history"
+
+# "quality" analyzes, plans and generates with three model calls,
+# "fast" retrieves heuristically and answers with a single call
+PROFILES = ("quality", "fast")
+
 
 def should_retrieve(state: AgentState) -> str:
     """Determine if retrieval is needed based on analysis."""
@@ -17,28 +36,85 @@ def should_retrieve(state: AgentState) -> str:
     return "skip"
 
 
-def create_agent_graph():
+def needs_retrieval(state: AgentState) -> str:
+    """Retrieve for everything but small talk, without a model call."""
+    if SMALL_TALK.match(state["query"]):
+        return "skip"
+    return "retrieve"
+
+
+def create_agent_graph(
+    vector_store: Optional[FirebaseVectorStore] = None,
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+    profile: str = "quality"
+) -> CompiledStateGraph:
     """
     Create the LangGraph agent with all nodes and edges.
     
-    The graph flow:
+    The "quality" graph flow:
     1. Analyze query to determine if retrieval is needed
     2. Either retrieve context or skip to planning
     3. Plan the response based on available information
     4. Generate the final response
+    5. Compact the conversation history
+    
+    The "fast" graph retrieves for every query except small talk and
+    generates the response directly, planning as part of the same call.
+    It drops turns beyond the history budget instead of summarizing them,
+    so no turn makes a second model call.
+    
+    Prompts include the history summary and the recent turns within
+    HISTORY_MAX_TOKENS, so a turn costs the same however long the
+    conversation has been.
+    
+    Args:
+        vector_store: Shared vector store, a new one by default
+        checkpointer: Conversation checkpointer, a new MemorySaver by default
+        profile: Graph profile, "quality" or "fast"
+        
+    Returns:
+        Compiled agent graph
     """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown agent profile: {profile}")
+    
     # Initialize nodes
-    nodes = Nodes()
+    nodes = Nodes(vector_store=vector_store)
     
     # Create the graph
     workflow = StateGraph(AgentState)
     
+    if profile == "fast":
+        workflow.add_node("retrieve_context", nodes.retrieve_context)
+        workflow.add_node("skip_retrieval", nodes.skip_retrieval)
+        workflow.add_node("generate_response", nodes.generate_response)
+        # Trimmed without a summarization call to keep the profile at one call
+        workflow.add_node("compact_history", nodes.trim_history)
+        
+        workflow.add_conditional_edges(
+            START,
+            needs_retrieval,
+            {
+                "retrieve": "retrieve_context",
+                "skip": "skip_retrieval"
+            }
+        )
+        workflow.add_edge("retrieve_context", "generate_response")
+        workflow.add_edge("skip_retrieval", "generate_response")
+        workflow.add_edge("generate_response", "compact_history")
+        workflow.add_edge("compact_history", END)
+        
+        app = workflow.compile(checkpointer=checkpointer or MemorySaver())
+        logger.info("agent_graph_created", profile=profile, nodes_count=4)
+        return app
+    
     # Add nodes
     workflow.add_node("analyze_query", nodes.analyze_query)
     workflow.add_node("retrieve_context", nodes.retrieve_context)
     workflow.add_node("skip_retrieval", nodes.skip_retrieval)
     workflow.add_node("plan_response", nodes.plan_response)
     workflow.add_node("generate_response", nodes.generate_response)
+    workflow.add_node("compact_history", nodes.compact_history)
     
     # Define edges
     workflow.set_entry_point("analyze_query")
@@ -60,25 +136,142 @@ def create_agent_graph():
     # Planning leads to response generation
     workflow.add_edge("plan_response", "generate_response")
     
-    # End after generating response
-    workflow.add_edge("generate_response", END)
+    # Keep the history within budget, then end
+    workflow.add_edge("generate_response", "compact_history")
+    workflow.add_edge("compact_history", END)
     
     # Add memory for conversation persistence
-    memory = MemorySaver()
+    memory = checkpointer or MemorySaver()
     
     # Compile the graph
     app = workflow.compile(checkpointer=memory)
     
-    logger.info("agent_graph_created", nodes_count=5)
+    logger.info("agent_graph_created", profile=profile, nodes_count=6)
     
     return app
 
 
+_agent_graphs: Dict[str, CompiledStateGraph] = {}
+_agent_graph_lock = threading.Lock()
+
+
+def get_agent_graph(
+    vector_store: Optional[FirebaseVectorStore] = None,
+    profile: Optional[str] = None
+) -> CompiledStateGraph:
+    """
+    Get the process-wide compiled agent graph of a profile.
+    
+    Each graph is compiled on first use and then shared by all requests,
+    together with its services. All profiles share the bounded process-wide
+    checkpointer, so conversation memory survives across turns and profile
+    switches without growing forever.
+    
+    Args:
+        vector_store: Vector store to use if the graph is not compiled yet
+        profile: Graph profile, the configured AGENT_PROFILE by default
+        
+    Returns:
+        Compiled agent graph
+    """
+    profile = profile or settings.agent_profile
+    with _agent_graph_lock:
+        if profile not in _agent_graphs:
+            _agent_graphs[profile] = create_agent_graph(
+                vector_store=vector_store,
+                checkpointer=get_checkpointer(),
+                profile=profile
+            )
+        return _agent_graphs[profile]
+
+
+async def has_history(graph: CompiledStateGraph, conversation_id: str) -> bool:
+    """
+    Check whether a conversation thread already has turns.
+    
+    Args:
+        graph: Compiled agent graph
+        conversation_id: Conversation thread ID
+        
+    Returns:
+        True if the thread has messages or a history summary
+    """
+    config = {"configurable": {"thread_id": conversation_id}}
+    snapshot = await graph.aget_state(config)
+    return bool(snapshot.values.get("messages") or snapshot.values.get("history_summary"))
+
+
+async def record_turn(
+    graph: CompiledStateGraph,
+    conversation_id: str,
+    query: str,
+    response: str,
+    retrieved_context: List[Dict[str, Any]]
+) -> None:
+    """
+    Add a turn answered outside the graph to a conversation thread.
+    
+    The turn is written as if the graph had completed it, so later turns
+    see it in their history.
+    
+    Args:
+        graph: Compiled agent graph
+        conversation_id: Conversation thread ID
+        query: User query
+        response: Answer given
+        retrieved_context: Documents the answer was based on
+    """
+    config = {"configurable": {"thread_id": conversation_id}}
+    await graph.aupdate_state(
+        config,
+        {
+            "messages": [HumanMessage(content=query), AIMessage(content=response)],
+            "query": query,
+            "retrieved_context": retrieved_context,
+            "final_response": response,
+            "conversation_id": conversation_id,
+            "error": None
+        },
+        as_node=HISTORY_NODE
+    )
+
+
+def _initial_state(
+    query: str,
+    conversation_id: str,
+    user_id: str,
+    additional_context: Optional[Dict[str, Any]],
+    filters: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Build the state a conversation turn starts from.
+    
+    No messages are added and history_summary is left out, so the turn
+    continues the conversation checkpointed for its thread.
+    """
+    return {
+        "messages": [],
+        "query": query,
+        "retrieved_context": [],
+        "search_filters": filters,
+        "should_retrieve": False,
+        "retrieval_complete": False,
+        "response_plan": None,
+        "final_response": None,
+        "conversation_id": conversation_id,
+        "user_id": user_id,
+        "error": None,
+        "additional_context": additional_context or {}
+    }
+
+
 async def run_agent(
     query: str,
     conversation_id: str = "default",
     user_id: str = "anonymous",
-    additional_context: Dict[str, Any] = None
+    additional_context: Dict[str, Any] = None,
+    graph: Optional[CompiledStateGraph] = None,
+    filters: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Run the agent with a query.
@@ -88,28 +281,19 @@ async def run_agent(
         conversation_id: Conversation thread ID
         user_id: User identifier
         additional_context: Any additional context
+        graph: Compiled agent graph, the process-wide graph by default
+        filters: Metadata filters applied when retrieving context
         
     Returns:
         Agent response with final answer and metadata
     """
     try:
-        # Create the agent
-        app = create_agent_graph()
+        app = graph or get_agent_graph()
         
         # Initialize state
-        initial_state = {
-            "messages": [],
-            "query": query,
-            "retrieved_context": [],
-            "should_retrieve": False,
-            "retrieval_complete": False,
-            "response_plan": None,
-            "final_response": None,
-            "conversation_id": conversation_id,
-            "user_id": user_id,
-            "error": None,
-            "additional_context": additional_context or {}
-        }
+        initial_state = _initial_state(
+            query, conversation_id, user_id, additional_context, filters
+        )
         
         # Run the agent
         config = {"configurable": {"thread_id": conversation_id}}
@@ -142,4 +326,104 @@ async def run_agent(
             "response": "I apologize, but I encountered an error processing your request.",
             "error": str(e),
             "conversation_id": conversation_id
-        }
\ No newline at end of file
+        }
+
+
+async def stream_agent(
+    query: str,
+    conversation_id: str = "default",
+    user_id: str = "anonymous",
+    additional_context: Dict[str, Any] = None,
+    graph: Optional[CompiledStateGraph] = None,
+    filters: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the agent with a query, yielding progress as it happens.
+    
+    Chat models stream automatically inside ``astream_events``, so the
+    nodes are unchanged and the tokens of the final answer reach the
+    client while it is still being generated.
+    
+    Args:
+        query: User query
+        conversation_id: Conversation thread ID
+        user_id: User identifier
+        additional_context: Any additional context
+        graph: Compiled agent graph, the process-wide graph by default
+        filters: Metadata filters applied when retrieving context
+        
+    Yields:
+        Event dicts: "node_start" and "node_end" per graph node, "token"
+        per generated chunk of the answer, then "done" with the full
+        response and retrieved context, or "error"
+    """
+    started = time.perf_counter()
+    first_token_ms = None
+    result = None
+    
+    try:
+        app = graph or get_agent_graph()
+        initial_state = _initial_state(
+            query, conversation_id, user_id, additional_context, filters
+        )
+        config = {"configurable": {"thread_id": conversation_id}}
+        
+        async for event in app.astream_events(initial_state, config, version="v2"):
+            kind = event["event"]
+            node = event.get("metadata", {}).get("langgraph_node")
+            
+            if kind == "on_chat_model_stream" and node == STREAMED_NODE:
+                content = event["data"]["chunk"].content
+                if content:
+                    if first_token_ms is None:
+                        first_token_ms = (time.perf_counter() - started) * 1000
+                    yield {"event": "token", "content": content}
+            
+            elif kind in ("on_chain_start", "on_chain_end"):
+                if not event.get("parent_ids") and kind == "on_chain_end":
+                    result = event["data"].get("output")
+                elif event["name"] == node:
+                    yield {
+                        "event": "node_start" if kind == "on_chain_start" else "node_end",
+                        "node": node
+                    }
+        
+        result = result or {}
+        retrieved_context = result.get("retrieved_context") or []
+        
+        logger.info(
+            "agent_stream_completed",
+            query=query[:100],
+            conversation_id=conversation_id,
+            retrieved_docs=len(retrieved_context),
+            first_token_ms=round(first_token_ms, 1) if first_token_ms is not None else None,
+            total_ms=round((time.perf_counter() - started) * 1000, 1),
+            has_error=bool(result.get("error"))
+        )
+        
+        if result.get("error"):
+            yield {"event": "error", "error": result["error"]}
+            return
+        
+        yield {
+            "event": "done",
+            "response": result.get("final_response", ""),
+            "conversation_id": conversation_id,
+            "retrieved_context": [
+                {
+                    "id": doc["id"],
+                    "text": doc["text"],
+                    "similarity": doc["similarity"]
+                }
+                for doc in retrieved_context
+            ]
+        }
+    
+    except Exception as e:
+        logger.error(
+            "agent_stream_failed",
+            error=str(e),
+            query=query[:100],
+            conversation_id=conversation_id
+        )
+        yield {"event": "error", "error": str(e)}
@@ -0,0 +1,656 @@
+"""Bounded conversation checkpointer with optional SQLite persistence."""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+import structlog
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata
+)
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+# Seconds between purges of expired threads from the database
+PURGE_INTERVAL = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    checkpoint_type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    parent_id TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    value_type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value_type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+"""
+
+
+# A serialized value: (type, bytes)
+Serialized = Tuple[str, bytes]
+
+# Table statements for deleting a thread; fixed names, never user input
+_DELETE_THREAD = tuple(
+    f"DELETE FROM {table} WHERE thread_id = ?"  # noqa: S608
+    for table in ("threads", "checkpoints", "writes", "blobs")
+)
+
+
+class _Thread:
+    """The checkpoints of one conversation thread."""
+
+    __slots__ = ("checkpoints", "writes", "blobs", "refs", "last_used")
+
+    def __init__(self):
+        # namespace -> checkpoint ID -> (checkpoint, metadata, parent checkpoint ID)
+        self.checkpoints: Dict[str, Dict[str, Tuple[Serialized, Serialized, Optional[str]]]] = (
+            defaultdict(dict)
+        )
+        # (namespace, checkpoint ID) -> (task ID, index) -> (task ID, channel, value, task path)
+        self.writes: Dict[Tuple[str, str], Dict[Tuple[str, int], Tuple[str, str, Serialized, str]]] = (
+            defaultdict(dict)
+        )
+        # (namespace, channel, version) -> channel value
+        self.blobs: Dict[Tuple[str, str, Any], Serialized] = {}
+        # (namespace, checkpoint ID) -> channel versions the checkpoint reads
+        self.refs: Dict[Tuple[str, str], Set[Tuple[str, Any]]] = {}
+        self.last_used = time.time()
+
+
+class BoundedCheckpointSaver(BaseCheckpointSaver):
+    """
+    Conversation checkpointer with bounded memory.
+
+    Checkpoints are stored per thread, with channel values kept once per
+    version like LangGraph's in-memory saver, so a thread can be dropped
+    as a unit. Threads idle for longer than the TTL are deleted, the least
+    recently used threads are evicted beyond ``max_threads``, and only the
+    newest ``max_checkpoints`` checkpoints of each thread are kept.
+
+    With a database path, every write goes through to SQLite as well.
+    Threads evicted from memory for space are then reloaded from disk on
+    their next turn and survive restarts; only the TTL deletes them there.
+    The async methods then run in a worker thread, keeping database I/O
+    off the event loop. Threads held in memory are served from memory
+    without consulting the database, so a second process writing the same
+    file goes unnoticed and its turns are lost or overwritten. Only set a
+    path when the API runs as a single worker process.
+    """
+
+    def __init__(
+        self,
+        max_threads: int = 1000,
+        ttl_seconds: float = 86400,
+        max_checkpoints: int = 20,
+        path: Optional[str] = None
+    ):
+        """
+        Initialize the checkpointer.
+
+        Args:
+            max_threads: Maximum conversation threads kept in memory
+            ttl_seconds: Seconds of inactivity after which a thread is deleted
+            max_checkpoints: Checkpoints kept per thread and namespace
+            path: SQLite database file, None to keep checkpoints in memory only
+        """
+        super().__init__()
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.max_checkpoints = max_checkpoints
+        self.path = path
+        self._threads: "OrderedDict[str, _Thread]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_purge = 0.0
+        self.evictions = 0
+        self.expirations = 0
+        self.pruned = 0
+        self.loads = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+            logger.info("checkpoint_database_opened", path=path)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Get the checkpoint of a config, or the latest of its thread."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        with self._lock:
+            thread = self._thread(thread_id, create=False)
+            if thread is None:
+                return None
+
+            saved = thread.checkpoints.get(checkpoint_ns)
+            checkpoint_id = get_checkpoint_id(config) or (max(saved) if saved else None)
+            if not saved or checkpoint_id not in saved:
+                return None
+            return self._tuple(thread_id, thread, checkpoint_ns, checkpoint_id)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints, newest first within each thread and namespace."""
+        config_ns = config["configurable"].get("checkpoint_ns") if config else None
+        config_id = get_checkpoint_id(config) if config else None
+        before_id = get_checkpoint_id(before) if before else None
+
+        with self._lock:
+            if config:
+                thread_id = config["configurable"]["thread_id"]
+                thread = self._thread(thread_id, create=False)
+                threads = [(thread_id, thread)] if thread else []
+            else:
+                threads = list(self._threads.items())
+
+            results = []
+            for thread_id, thread in threads:
+                for checkpoint_ns, saved in thread.checkpoints.items():
+                    if config_ns is not None and checkpoint_ns != config_ns:
+                        continue
+                    for checkpoint_id in sorted(saved, reverse=True):
+                        if config_id and checkpoint_id != config_id:
+                            continue
+                        if before_id and checkpoint_id >= before_id:
+                            continue
+                        metadata = self.serde.loads_typed(saved[checkpoint_id][1])
+                        if filter and any(metadata.get(key) != value for key, value in filter.items()):
+                            continue
+                        if limit is not None and len(results) >= limit:
+                            break
+                        results.append(
+                            self._tuple(thread_id, thread, checkpoint_ns, checkpoint_id, metadata)
+                        )
+
+        yield from results
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Save a checkpoint, then enforce the per-thread and global limits."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        stored = checkpoint.copy()
+        values = stored.pop("channel_values")
+
+        with self._lock:
+            thread = self._thread(thread_id, create=True)
+            for channel, version in new_versions.items():
+                thread.blobs[(checkpoint_ns, channel, version)] = (
+                    self.serde.dumps_typed(values[channel]) if channel in values else ("empty", b"")
+                )
+            thread.checkpoints[checkpoint_ns][checkpoint["id"]] = (
+                self.serde.dumps_typed(stored),
+                self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+                config["configurable"].get("checkpoint_id")
+            )
+            thread.refs[(checkpoint_ns, checkpoint["id"])] = set(checkpoint["channel_versions"].items())
+
+            if self._conn:
+                self._persist_checkpoint(thread, thread_id, checkpoint_ns, checkpoint["id"], new_versions)
+            self._prune(thread, thread_id, checkpoint_ns)
+            self._evict()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"]
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """Save the pending writes of a task."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        with self._lock:
+            thread = self._thread(thread_id, create=True)
+            saved = thread.writes[(checkpoint_ns, checkpoint_id)]
+            written = []
+            for idx, (channel, value) in enumerate(writes):
+                key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                # Special writes are stored once, regular writes overwrite
+                if key[1] >= 0 and key in saved:
+                    continue
+                saved[key] = (task_id, channel, self.serde.dumps_typed(value), task_path)
+                written.append(key)
+
+            if self._conn:
+                rows = []
+                for key in written:
+                    write_task, channel, value, path = saved[key]
+                    rows.append((thread_id, checkpoint_ns, checkpoint_id, write_task, key[1], channel, *value, path))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._touch_row(thread_id, thread)
+                self._conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints and writes of a thread."""
+        with self._lock:
+            self._threads.pop(thread_id, None)
+            if self._conn:
+                self._delete_rows([thread_id])
+                self._conn.commit()
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Asynchronous version of get_tuple."""
+        return await self._run(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Asynchronous version of list."""
+        results = await self._run(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in results:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Asynchronous version of put."""
+        return await self._run(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """Asynchronous version of put_writes."""
+        await self._run(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Asynchronous version of delete_thread."""
+        await self._run(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """
+        Return the channel version after ``current``.
+
+        Versions are a zero-padded counter with a random suffix, so they
+        sort as strings, like those of LangGraph's own savers.
+        """
+        if current is None:
+            number = 0
+        elif isinstance(current, int):
+            number = current
+        else:
+            number = int(current.split(".")[0])
+        return f"{number + 1:032}.{random.random():016}"
+
+    def close(self) -> None:
+        """Close the database, if any."""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return thread and checkpoint counts and the memory and disk footprint."""
+        with self._lock:
+            checkpoints = 0
+            memory_bytes = 0
+            for thread in self._threads.values():
+                for saved in thread.checkpoints.values():
+                    checkpoints += len(saved)
+                    memory_bytes += sum(
+                        len(checkpoint[1]) + len(metadata[1])
+                        for checkpoint, metadata, _ in saved.values()
+                    )
+                memory_bytes += sum(
+                    len(value[1]) for writes in thread.writes.values() for _, _, value, _ in writes.values()
+                )
+                memory_bytes += sum(len(value[1]) for value in thread.blobs.values())
+
+            disk_bytes = None
+            if self.path:
+                disk_bytes = sum(
+                    os.path.getsize(self.path + suffix)
+                    for suffix in ("", "-wal", "-shm")
+                    if os.path.exists(self.path + suffix)
+                )
+
+            return {
+                "threads": len(self._threads),
+                "max_threads": self.max_threads,
+                "checkpoints": checkpoints,
+                "max_checkpoints_per_thread": self.max_checkpoints,
+                "ttl_seconds": self.ttl_seconds,
+                "memory_bytes": memory_bytes,
+                "disk_bytes": disk_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "pruned_checkpoints": self.pruned,
+                "loaded_from_disk": self.loads
+            }
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a method in a worker thread if it may use the database."""
+        if self._conn is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _tuple(
+        self,
+        thread_id: str,
+        thread: _Thread,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        metadata: Optional[CheckpointMetadata] = None
+    ) -> CheckpointTuple:
+        """Deserialize a stored checkpoint with its channel values and writes."""
+        checkpoint, metadata_b, parent_id = thread.checkpoints[checkpoint_ns][checkpoint_id]
+        checkpoint = self.serde.loads_typed(checkpoint)
+
+        values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            value = thread.blobs.get((checkpoint_ns, channel, version))
+            if value is not None and value[0] != "empty":
+                values[channel] = self.serde.loads_typed(value)
+
+        def checkpoint_config(checkpoint_id: str) -> RunnableConfig:
+            return {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id
+                }
+            }
+
+        writes = thread.writes.get((checkpoint_ns, checkpoint_id), {}).values()
+        return CheckpointTuple(
+            config=checkpoint_config(checkpoint_id),
+            checkpoint={**checkpoint, "channel_values": values},
+            metadata=metadata if metadata is not None else self.serde.loads_typed(metadata_b),
+            parent_config=checkpoint_config(parent_id) if parent_id else None,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(value))
+                for task_id, channel, value, _ in writes
+            ]
+        )
+
+    def _thread(self, thread_id: str, create: bool) -> Optional[_Thread]:
+        """Get a thread from memory or disk, marking it as recently used."""
+        thread = self._threads.get(thread_id)
+        if thread is not None and time.time() - thread.last_used > self.ttl_seconds:
+            self._expire([thread_id])
+            thread = None
+
+        if thread is None and self._conn:
+            thread = self._load(thread_id)
+        if thread is None and create:
+            thread = _Thread()
+        if thread is None:
+            return None
+
+        self._threads[thread_id] = thread
+        self._threads.move_to_end(thread_id)
+        thread.last_used = time.time()
+        return thread
+
+    def _prune(self, thread: _Thread, thread_id: str, checkpoint_ns: str) -> None:
+        """Drop the oldest checkpoints of a namespace beyond the per-thread cap."""
+        saved = thread.checkpoints[checkpoint_ns]
+        if len(saved) <= self.max_checkpoints:
+            return
+
+        # Checkpoint IDs are time-ordered
+        dropped = sorted(saved)[:len(saved) - self.max_checkpoints]
+        for checkpoint_id in dropped:
+            del saved[checkpoint_id]
+            thread.writes.pop((checkpoint_ns, checkpoint_id), None)
+            thread.refs.pop((checkpoint_ns, checkpoint_id), None)
+
+        # Keep only channel values some remaining checkpoint still reads
+        live = set().union(*(refs for (ns, _), refs in thread.refs.items() if ns == checkpoint_ns))
+        dead_blobs = [
+            key for key in thread.blobs
+            if key[0] == checkpoint_ns and (key[1], key[2]) not in live
+        ]
+        for key in dead_blobs:
+            del thread.blobs[key]
+        self.pruned += len(dropped)
+
+        if self._conn:
+            self._conn.executemany(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                [(thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id in dropped]
+            )
+            self._conn.executemany(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                [(thread_id, checkpoint_ns, checkpoint_id) for checkpoint_id in dropped]
+            )
+            self._conn.executemany(
+                "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                [(thread_id, ns, channel, json.dumps(version)) for ns, channel, version in dead_blobs]
+            )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Expire idle threads and evict the least recently used beyond the cap."""
+        now = time.time()
+        expired = [
+            thread_id for thread_id, thread in self._threads.items()
+            if now - thread.last_used > self.ttl_seconds
+        ]
+        if expired:
+            self._expire(expired)
+
+        while len(self._threads) > self.max_threads:
+            # Persisted threads stay on disk and are reloaded when used again
+            self._threads.popitem(last=False)
+            self.evictions += 1
+
+        if self._conn and now - self._last_purge > PURGE_INTERVAL:
+            self._last_purge = now
+            stale = [
+                row[0] for row in self._conn.execute(
+                    "SELECT thread_id FROM threads WHERE last_used < ?",
+                    (now - self.ttl_seconds,)
+                )
+            ]
+            if stale:
+                self._delete_rows(stale)
+                self._conn.commit()
+                self.expirations += len(stale)
+
+    def _expire(self, thread_ids: Sequence[str]) -> None:
+        """Delete idle threads from memory and disk."""
+        for thread_id in thread_ids:
+            self._threads.pop(thread_id, None)
+        if self._conn:
+            self._delete_rows(thread_ids)
+            self._conn.commit()
+        self.expirations += len(thread_ids)
+        logger.debug("checkpoint_threads_expired", threads=len(thread_ids))
+
+    def _persist_checkpoint(
+        self,
+        thread: _Thread,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        new_versions: ChannelVersions
+    ) -> None:
+        """Write a new checkpoint and the channel values it introduced."""
+        checkpoint, metadata, parent_id = thread.checkpoints[checkpoint_ns][checkpoint_id]
+        self._conn.execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (thread_id, checkpoint_ns, checkpoint_id, *checkpoint, *metadata, parent_id)
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (thread_id, checkpoint_ns, channel, json.dumps(version),
+                 *thread.blobs[(checkpoint_ns, channel, version)])
+                for channel, version in new_versions.items()
+            ]
+        )
+        self._touch_row(thread_id, thread)
+        self._conn.commit()
+
+    def _touch_row(self, thread_id: str, thread: _Thread) -> None:
+        """Record when a thread was last used."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO threads VALUES (?, ?)",
+            (thread_id, thread.last_used)
+        )
+
+    def _load(self, thread_id: str) -> Optional[_Thread]:
+        """Rebuild a thread from the database, None if it is not stored or expired."""
+        row = self._conn.execute(
+            "SELECT last_used FROM threads WHERE thread_id = ?",
+            (thread_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[0] > self.ttl_seconds:
+            self._expire([thread_id])
+            return None
+
+        thread = _Thread()
+        for ns, checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata, parent_id in self._conn.execute(
+            "SELECT checkpoint_ns, checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata, parent_id "
+            "FROM checkpoints WHERE thread_id = ?",
+            (thread_id,)
+        ):
+            thread.checkpoints[ns][checkpoint_id] = (
+                (checkpoint_type, checkpoint),
+                (metadata_type, metadata),
+                parent_id
+            )
+            versions = self.serde.loads_typed((checkpoint_type, checkpoint))["channel_versions"]
+            thread.refs[(ns, checkpoint_id)] = set(versions.items())
+
+        for ns, checkpoint_id, task_id, idx, channel, value_type, value, task_path in self._conn.execute(
+            "SELECT checkpoint_ns, checkpoint_id, task_id, idx, channel, value_type, value, task_path "
+            "FROM writes WHERE thread_id = ?",
+            (thread_id,)
+        ):
+            thread.writes[(ns, checkpoint_id)][(task_id, idx)] = (
+                task_id, channel, (value_type, value), task_path
+            )
+
+        for ns, channel, version, value_type, value in self._conn.execute(
+            "SELECT checkpoint_ns, channel, version, value_type, value FROM blobs WHERE thread_id = ?",
+            (thread_id,)
+        ):
+            thread.blobs[(ns, channel, json.loads(version))] = (value_type, value)
+
+        self.loads += 1
+        return thread
+
+    def _delete_rows(self, thread_ids: Sequence[str]) -> None:
+        """Delete the stored rows of threads, without committing."""
+        rows = [(thread_id,) for thread_id in thread_ids]
+        for statement in _DELETE_THREAD:
+            self._conn.executemany(statement, rows)
+
+
+_checkpointer: Optional[BoundedCheckpointSaver] = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> BoundedCheckpointSaver:
+    """Get the process-wide conversation checkpointer."""
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            _checkpointer = BoundedCheckpointSaver(
+                max_threads=settings.checkpoint_max_threads,
+                ttl_seconds=settings.checkpoint_ttl_seconds,
+                max_checkpoints=settings.checkpoint_max_per_thread,
+                path=settings.checkpoint_db_path or None
+            )
+        return _checkpointer
+
+
+def close_checkpointer() -> None:
+    """Close the process-wide checkpointer's database, if open."""
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is not None:
+            _checkpointer.close()
+            _checkpointer = None
@@ -0,0 +1,77 @@
+"""Token-budgeted conversation history for prompts."""
+
+from typing import List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from src.utils import count_tokens
+
+# Chat model whose tokenizer history is measured with
+CHAT_MODEL = "gpt-4o-mini"
+
+
+def conversation_turns(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """Return the user and assistant messages of a conversation."""
+    return [m for m in messages if isinstance(m, (HumanMessage, AIMessage))]
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """Count the tokens of a message's text."""
+    return count_tokens(message.text(), CHAT_MODEL)
+
+
+def history_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Count the tokens of a list of messages."""
+    return sum(message_tokens(m) for m in messages)
+
+
+def split_history(
+    messages: Sequence[BaseMessage],
+    max_tokens: int
+) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """
+    Split a conversation into older turns and a recent window.
+
+    The window is the longest run of latest messages within the budget
+    that starts with a user message, so no answer is separated from its
+    question.
+
+    Args:
+        messages: Conversation turns, oldest first
+        max_tokens: Token budget of the window
+
+    Returns:
+        Tuple of (older messages, recent messages)
+    """
+    start = len(messages)
+    used = 0
+    for i in range(len(messages) - 1, -1, -1):
+        used += message_tokens(messages[i])
+        if used > max_tokens:
+            break
+        start = i
+
+    while start < len(messages) and not isinstance(messages[start], HumanMessage):
+        start += 1
+
+    return list(messages[:start]), list(messages[start:])
+
+
+def format_history(summary: Optional[str], messages: Sequence[BaseMessage]) -> str:
+    """
+    Format a summary and recent turns for a prompt.
+
+    Args:
+        summary: Summary of the turns before the window, if any
+        messages: Recent turns
+
+    Returns:
+        Conversation text, empty if there is no history
+    """
+    parts = []
+    if summary:
+        parts.append(f"Summary of earlier conversation: {summary}")
+    for message in messages:
+        role = "Visitor" if isinstance(message, HumanMessage) else "You"
+        parts.append(f"{role}: {message.text()}")
+    return "\n".join(parts)
@@ -1,119 +1,229 @@
 """LangGraph nodes for processing logic."""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import time
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage
+)
 import structlog
 from src.services import FirebaseVectorStore
 from src.config import settings
+from .history import (
+    CHAT_MODEL,
+    conversation_turns,
+    format_history,
+    history_tokens,
+    split_history
+)
+from .router import RetrievalRouter, Route, get_retrieval_router
 from .state import AgentState
 
 logger = structlog.get_logger()
 
 
+class SpeculationStats:
+    """Counters for retrieval started before the retrieve/skip decision."""
+    
+    def __init__(self):
+        self.started = 0
+        self.used = 0
+        self.wasted = 0
+        self.failed = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return the counters and the share of speculation that was wasted."""
+        finished = self.used + self.wasted
+        return {
+            "enabled": settings.speculative_retrieval,
+            "started": self.started,
+            "used": self.used,
+            "wasted": self.wasted,
+            "failed": self.failed,
+            "waste_rate": self.wasted / finished if finished else None
+        }
+
+
+_speculation_stats = SpeculationStats()
+
+
+def get_speculation_stats() -> SpeculationStats:
+    """Get the process-wide speculative retrieval counters."""
+    return _speculation_stats
+
+
 class Nodes:
     """Collection of nodes for the LangGraph agent."""
     
-    def __init__(self):
-        """Initialize nodes with required services."""
-        self.llm = ChatOpenAI(
+    def __init__(
+        self,
+        vector_store: Optional[FirebaseVectorStore] = None,
+        llm: Optional[ChatOpenAI] = None,
+        router: Optional[RetrievalRouter] = None
+    ):
+        """
+        Initialize nodes with required services.
+        
+        Args:
+            vector_store: Shared vector store, a new one by default
+            llm: Shared chat model, a new one by default
+            router: Local retrieve/skip router, the process-wide one by default
+        """
+        self.llm = llm or ChatOpenAI(
             openai_api_key=settings.openai_api_key,
-            model="gpt-4o-mini",
+            model=CHAT_MODEL,
             temperature=0.7
         )
-        self.vector_store = FirebaseVectorStore()
+        self.vector_store = vector_store or FirebaseVectorStore()
+        self.router = router or get_retrieval_router()
     
     async def analyze_query(self, state: AgentState) -> Dict[str, Any]:
         """
         Analyze the user query to determine if retrieval is needed.
         
         This node examines the query and decides whether to search
-        the knowledge base or answer directly.
+        the knowledge base or answer directly. The local router decides
+        when it is confident; otherwise the LLM is asked.
         """
         try:
             query = state["query"]
             
-            # System prompt for query analysis
-            system_prompt = """You are analyzing queries for Peter's personal AI assistant.
-            Users will ask questions directly to Peter using "you", "your", etc.
-            
-            Return "yes" if the query is about:
-            - Personal details (age, location, background, family) - e.g. "How old are you?", "Where do you live?"
-            - Skills, experience, or work history - e.g. "What's your experience?", "What do you do?"
-            - Education, projects, achievements - e.g. "What did you study?", "Your projects?"
-            - CV or resume information - e.g. "Your qualifications?"
-            - Contact information - e.g. "How can I contact you?"
-            - Any specific facts, preferences, or characteristics
-            - Questions using "you", "your", "yours" referring to personal information
-            - Questions mentioning Peter by name or "him"
-            
-            Return "no" ONLY if the query is:
-            - General knowledge questions not about personal information
-            - Pure greetings like "hello" or "hi"
-            - Questions about how the AI system works
-            - Requests for general help not related to personal information
-            
-            When in doubt, return "yes" - it's better to search than miss information.
-            
-            Only respond with "yes" or "no"."""
-            
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Query: {query}")
-            ]
-            
-            response = await self.llm.ainvoke(messages)
-            should_retrieve = response.content.strip().lower() == "yes"
+            # The embedding is only computed if the keyword rules don't decide
+            route = await self.router.route(
+                query,
+                lambda text: self.vector_store.embedding_service.embed_text(text)
+            )
+            update = {}
+            if route.should_retrieve is not None and not self.router.should_check(route):
+                should_retrieve = route.should_retrieve
+            elif settings.speculative_retrieval:
+                should_retrieve, update = await self._analyze_speculatively(state, route)
+            else:
+                should_retrieve = await self._analyze_with_llm(query, route)
             
             logger.info(
                 "query_analyzed",
                 query=query[:100],
-                should_retrieve=should_retrieve
+                should_retrieve=should_retrieve,
+                source=route.source
             )
             
             return {
                 "should_retrieve": should_retrieve,
-                "messages": state["messages"] + [
-                    {"role": "system", "content": f"Query analysis: {'retrieve' if should_retrieve else 'direct answer'}"}
-                ]
+                **update
             }
             
         except Exception as e:
             logger.error("query_analysis_failed", error=str(e))
             return {"error": str(e)}
     
+    async def _analyze_speculatively(
+        self,
+        state: AgentState,
+        route: Route
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Ask the LLM while already retrieving, in case the answer is yes.
+        
+        The search, including the query embedding, runs concurrently with
+        the LLM call and its results are dropped if the LLM says skip.
+        
+        Returns:
+            Tuple of (should retrieve, state update with the retrieved
+            context, empty if the speculative search is not used)
+        """
+        stats = get_speculation_stats()
+        stats.started += 1
+        search = asyncio.create_task(self._search(state))
+        
+        try:
+            should_retrieve = await self._analyze_with_llm(state["query"], route)
+        except BaseException:
+            search.cancel()
+            raise
+        
+        if not should_retrieve:
+            if not search.cancel() and not search.cancelled():
+                # Already finished; mark a failure as retrieved
+                search.exception()
+            stats.wasted += 1
+            return False, {}
+        
+        try:
+            results = await search
+        except Exception as e:
+            # retrieve_context searches again
+            stats.failed += 1
+            logger.warning("speculative_retrieval_failed", error=str(e))
+            return True, {}
+        
+        stats.used += 1
+        return True, self._retrieved(state, results)
+    
+    async def _analyze_with_llm(self, query: str, route: Route) -> bool:
+        """Ask the LLM whether a query needs retrieval and record its answer."""
+        # System prompt for query analysis
+        system_prompt = """You are analyzing queries for Peter's personal AI assistant.
+        Users will ask questions directly to Peter using "you", "your", etc.
+        
+        Return "yes" if the query is about:
+        - Personal details (age, location, background, family) - e.g. "How old are you?", "Where do you live?"
+        - Skills, experience, or work history - e.g. "What's your experience?", "What do you do?"
+        - Education, projects, achievements - e.g. "What did you study?", "Your projects?"
+        - CV or resume information - e.g. "Your qualifications?"
+        - Contact information - e.g. "How can I contact you?"
+        - Any specific facts, preferences, or characteristics
+        - Questions using "you", "your", "yours" referring to personal information
+        - Questions mentioning Peter by name or "him"
+        
+        Return "no" ONLY if the query is:
+        - General knowledge questions not about personal information
+        - Pure greetings like "hello" or "hi"
+        - Questions about how the AI system works
+        - Requests for general help not related to personal information
+        
+        When in doubt, return "yes" - it's better to search than miss information.
+        
+        Only respond with "yes" or "no"."""
+        
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Query: {query}")
+        ]
+        
+        started = time.perf_counter()
+        response = await self.llm.ainvoke(messages)
+        should_retrieve = response.content.strip().lower() == "yes"
+        
+        # Agreement metrics, and training data for the classifier
+        await asyncio.to_thread(
+            self.router.record,
+            query,
+            route,
+            should_retrieve,
+            time.perf_counter() - started
+        )
+        
+        return should_retrieve
+    
     async def retrieve_context(self, state: AgentState) -> Dict[str, Any]:
         """
         Retrieve relevant context from Firebase vector store.
         
-        This node searches for relevant information based on the query.
+        This node searches for relevant information based on the query,
+        unless analyze_query already retrieved it speculatively.
         """
+        if state.get("retrieval_complete"):
+            return {}
+        
         try:
-            query = state["query"]
-            
-            # Search for relevant documents
-            results = await self.vector_store.search(
-                query=query,
-                top_k=settings.max_search_results,
-                threshold=settings.similarity_threshold
-            )
-            
-            logger.info(
-                "context_retrieved",
-                query=query[:100],
-                results_count=len(results)
-            )
-            
-            return {
-                "retrieved_context": results,
-                "retrieval_complete": True,
-                "messages": state["messages"] + [
-                    {
-                        "role": "system",
-                        "content": f"Retrieved {len(results)} relevant documents from knowledge base"
-                    }
-                ]
-            }
+            results = await self._search(state)
+            return self._retrieved(state, results)
             
         except Exception as e:
             logger.error("context_retrieval_failed", error=str(e))
@@ -123,6 +233,24 @@ class Nodes:
                 "retrieved_context": []
             }
     
+    async def _search(self, state: AgentState) -> List[Dict[str, Any]]:
+        """Search the knowledge base for the query."""
+        return await self.vector_store.search(
+            query=state["query"],
+            top_k=settings.max_search_results,
+            threshold=settings.similarity_threshold,
+            filters=state.get("search_filters")
+        )
+    
+    def _retrieved(self, state: AgentState, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the state update for retrieved documents."""
+        logger.info(
+            "context_retrieved",
+            query=state["query"][:100],
+            results_count=len(results)
+        )
+        return {"retrieved_context": results, "retrieval_complete": True}
+    
     async def plan_response(self, state: AgentState) -> Dict[str, Any]:
         """
         Plan the response based on query and retrieved context.
@@ -155,7 +283,7 @@ class Nodes:
             
             messages = [
                 SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Query: {query}{context_str}")
+                HumanMessage(content=f"{_history_prompt(state)}Query: {query}{context_str}")
             ]
             
             response = await self.llm.ainvoke(messages)
@@ -167,12 +295,7 @@ class Nodes:
                 plan_length=len(plan)
             )
             
-            return {
-                "response_plan": plan,
-                "messages": state["messages"] + [
-                    {"role": "system", "content": f"Response plan created: {plan[:200]}..."}
-                ]
-            }
+            return {"response_plan": plan}
             
         except Exception as e:
             logger.error("response_planning_failed", error=str(e))
@@ -224,11 +347,18 @@ class Nodes:
             
             Language: Respond in the same language as the question (Swedish or English)"""
             
-            user_prompt = f"""Query: {query}
+            # Without a planning step, plan as part of this call
+            if plan:
+                plan_str = f"Response plan: {plan}"
+            else:
+                plan_str = """Before answering, decide which points the query asks about,
+            which of the information above is relevant to them and what is missing."""
+            
+            user_prompt = f"""{_history_prompt(state)}Query: {query}
             
             {context_str}
             
-            Response plan: {plan}
+            {plan_str}
             
             Please provide a helpful response to the user's query."""
             
@@ -248,7 +378,7 @@ class Nodes:
             
             return {
                 "final_response": final_response,
-                "messages": state["messages"] + [
+                "messages": [
                     HumanMessage(content=query),
                     AIMessage(content=final_response)
                 ]
@@ -269,8 +399,95 @@ class Nodes:
         """
         return {
             "retrieval_complete": True,
-            "retrieved_context": [],
-            "messages": state["messages"] + [
-                {"role": "system", "content": "Skipping retrieval - answering directly"}
-            ]
-        }
\ No newline at end of file
+            "retrieved_context": []
+        }
+    
+    async def compact_history(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Keep the conversation history within its token budget.
+        
+        Once the turns outgrow HISTORY_MAX_TOKENS, the oldest of them are
+        folded into the running summary and removed from the state, leaving
+        half the budget of recent turns. Summarizing only then, rather than
+        every turn, keeps the extra model call rare.
+        """
+        messages = state["messages"]
+        turns = conversation_turns(messages)
+        # System notes kept by conversations from before they were dropped
+        removed = [m for m in messages if not isinstance(m, (HumanMessage, AIMessage))]
+        
+        if history_tokens(turns) > settings.history_max_tokens:
+            older, recent = split_history(turns, settings.history_max_tokens // 2)
+            try:
+                summary = await self._summarize(state.get("history_summary"), older)
+                logger.info(
+                    "history_compacted",
+                    conversation_id=state.get("conversation_id"),
+                    summarized_messages=len(older),
+                    kept_messages=len(recent)
+                )
+                return {
+                    "history_summary": summary,
+                    "messages": [RemoveMessage(id=m.id) for m in removed + older]
+                }
+            except Exception as e:
+                # Prompts still use the recent window; retried next turn
+                logger.warning("history_compaction_failed", error=str(e))
+        
+        return {"messages": [RemoveMessage(id=m.id) for m in removed]}
+    
+    async def trim_history(self, state: AgentState) -> Dict[str, Any]:
+        """
+        Keep the conversation history within its token budget without a model call.
+        
+        Used by the "fast" profile in place of compact_history: once the turns
+        outgrow HISTORY_MAX_TOKENS, the oldest of them are dropped, leaving
+        half the budget of recent turns. An existing summary is kept as is.
+        """
+        messages = state["messages"]
+        turns = conversation_turns(messages)
+        removed = [m for m in messages if not isinstance(m, (HumanMessage, AIMessage))]
+        
+        if history_tokens(turns) > settings.history_max_tokens:
+            older, recent = split_history(turns, settings.history_max_tokens // 2)
+            logger.info(
+                "history_trimmed",
+                conversation_id=state.get("conversation_id"),
+                dropped_messages=len(older),
+                kept_messages=len(recent)
+            )
+            removed += older
+        
+        return {"messages": [RemoveMessage(id=m.id) for m in removed]}
+    
+    async def _summarize(self, summary: Optional[str], messages: List[BaseMessage]) -> str:
+        """Fold conversation turns into the running summary."""
+        system_prompt = f"""You maintain a running summary of a conversation between a visitor
+        and Peter on Peter's portfolio website.
+        Update the existing summary with the new turns. Keep what the visitor
+        told about themselves, what they asked and what Peter answered, and
+        drop greetings and small talk.
+        
+        Write at most {settings.history_summary_max_tokens} tokens, in the
+        language of the conversation."""
+        
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(
+                content=f"Existing summary: {summary or 'None'}\n\n"
+                f"New turns:\n{format_history(None, messages)}"
+            )
+        ]
+        
+        response = await self.llm.ainvoke(messages)
+        return response.content
+
+
+def _history_prompt(state: AgentState) -> str:
+    """Format the summary and recent turns that fit the history budget."""
+    _, recent = split_history(
+        conversation_turns(state["messages"]),
+        settings.history_max_tokens
+    )
+    history = format_history(state.get("history_summary"), recent)
+    return f"Conversation so far:\n{history}\n\n" if history else ""
@@ -0,0 +1,250 @@
+"""Local retrieve/skip routing for the agent."""
+
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import structlog
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+# Small talk that never needs the knowledge base
+SMALL_TALK = re.compile(
+    r"^\s*(hi|hello|hey|hej|hejsan|hallå|tja|tjena|thanks|thank you|tack|tack så mycket"
+    r"|good (morning|afternoon|evening)|god (morgon|middag|kväll)|bye|hej då)\W*$",
+    re.IGNORECASE
+)
+
+# Questions addressed to Peter, which are answered from the knowledge base
+PERSONAL = re.compile(
+    r"\b(you|your|yours|yourself|du|dig|din|ditt|dina|dej|peter|peters|him)\b",
+    re.IGNORECASE
+)
+
+
+class Route(NamedTuple):
+    """A retrieve/skip decision and where it came from."""
+
+    should_retrieve: Optional[bool]
+    source: str
+    probability: Optional[float] = None
+
+
+class RetrievalRouter:
+    """
+    Decides whether a query needs retrieval without a model call.
+
+    Keyword rules are tried first. Otherwise a logistic regression over
+    the query embedding predicts the probability that retrieval is needed,
+    and its decision is used when the probability is far enough from 0.5.
+    Remaining queries are left to the LLM, whose decisions are logged as
+    training data for the classifier.
+    """
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        confidence: float = 0.85,
+        log_path: Optional[str] = None,
+        shadow_rate: float = 0.0
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            model_path: Classifier weights saved by ``save_model``, if any
+            confidence: Minimum classifier confidence to skip the LLM
+            log_path: JSONL file LLM decisions are appended to, if any
+            shadow_rate: Share of local decisions also checked by the LLM
+                to measure accuracy
+        """
+        self.confidence = confidence
+        self.log_path = log_path
+        self.shadow_rate = shadow_rate
+        self.weights: Optional[np.ndarray] = None
+        self.bias = 0.0
+        self._lock = threading.Lock()
+
+        if model_path and Path(model_path).exists():
+            self.weights, self.bias = load_model(model_path)
+            logger.info("retrieval_router_model_loaded", path=model_path, dimension=len(self.weights))
+
+        self.decisions: Dict[str, int] = {"rule": 0, "classifier": 0, "llm": 0}
+        self.checked = 0
+        self.agreed = 0
+        self._local_seconds = 0.0
+        self._llm_seconds = 0.0
+
+    async def route(
+        self,
+        query: str,
+        embed: Callable[[str], Awaitable[List[float]]]
+    ) -> Route:
+        """
+        Decide locally whether a query needs retrieval.
+
+        Args:
+            query: User query
+            embed: Returns the query embedding, normally from the query
+                embedding cache
+
+        Returns:
+            Route whose should_retrieve is None if the LLM has to decide
+        """
+        started = time.perf_counter()
+        route = self.rule(query)
+
+        if route is None and self.weights is not None:
+            embedding = await embed(query)
+            # Time the decision itself, not the embedding lookup
+            started = time.perf_counter()
+            probability = self.predict(embedding)
+            if probability is not None and max(probability, 1 - probability) >= self.confidence:
+                route = Route(bool(probability >= 0.5), "classifier", probability)
+            elif probability is not None:
+                route = Route(None, "llm", probability)
+
+        route = route or Route(None, "llm")
+        if route.should_retrieve is not None:
+            with self._lock:
+                self.decisions[route.source] += 1
+                self._local_seconds += time.perf_counter() - started
+        return route
+
+    def rule(self, query: str) -> Optional[Route]:
+        """Apply the keyword rules, None if none of them match."""
+        if SMALL_TALK.match(query):
+            return Route(False, "rule")
+        if PERSONAL.search(query):
+            return Route(True, "rule")
+        return None
+
+    def predict(self, embedding: List[float]) -> Optional[float]:
+        """Return the classifier's probability that retrieval is needed."""
+        if self.weights is None or len(embedding) != len(self.weights):
+            return None
+        score = float(np.dot(self.weights, np.asarray(embedding, dtype=np.float32))) + self.bias
+        return float(1.0 / (1.0 + np.exp(-score)))
+
+    def should_check(self, route: Route) -> bool:
+        """Whether to also ask the LLM about a local decision."""
+        return route.should_retrieve is not None and random.random() < self.shadow_rate
+
+    def record(self, query: str, route: Route, should_retrieve: bool, seconds: float) -> None:
+        """
+        Record an LLM decision.
+
+        Counts whether the local router agreed with it and appends it to
+        the training log.
+
+        Args:
+            query: User query
+            route: The local route for the query
+            should_retrieve: The LLM's decision
+            seconds: Duration of the LLM call
+        """
+        predicted = route.should_retrieve
+        if predicted is None and route.probability is not None:
+            predicted = route.probability >= 0.5
+
+        with self._lock:
+            if route.should_retrieve is None:
+                self.decisions["llm"] += 1
+                self._llm_seconds += seconds
+            if predicted is not None:
+                self.checked += 1
+                self.agreed += predicted == should_retrieve
+
+            if self.log_path:
+                Path(self.log_path).parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as log:
+                    log.write(json.dumps(
+                        {"query": query, "should_retrieve": should_retrieve, "ts": time.time()},
+                        ensure_ascii=False
+                    ) + "\n")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return decision counts, accuracy against the LLM and latency."""
+        local = self.decisions["rule"] + self.decisions["classifier"]
+        return {
+            "classifier_loaded": self.weights is not None,
+            "decisions": dict(self.decisions),
+            "local_rate": local / (local + self.decisions["llm"]) if local + self.decisions["llm"] else None,
+            "checked": self.checked,
+            # Without shadow checks only uncertain classifier decisions are checked
+            "shadow_rate": self.shadow_rate,
+            "accuracy": self.agreed / self.checked if self.checked else None,
+            "avg_local_us": self._local_seconds * 1e6 / local if local else None,
+            "avg_llm_ms": self._llm_seconds * 1000 / self.decisions["llm"] if self.decisions["llm"] else None
+        }
+
+
+def train_model(
+    embeddings: np.ndarray,
+    labels: np.ndarray,
+    epochs: int = 500,
+    learning_rate: float = 5.0,
+    l2: float = 1e-4
+) -> Tuple[np.ndarray, float]:
+    """
+    Fit a logistic regression with full-batch gradient descent.
+
+    Args:
+        embeddings: Query embeddings, one row per example
+        labels: 1 where retrieval was needed, else 0
+        epochs: Gradient descent steps
+        learning_rate: Step size; embeddings are unit length, so it is large
+        l2: L2 regularization strength
+
+    Returns:
+        Tuple of (weights, bias)
+    """
+    X = np.asarray(embeddings, dtype=np.float32)
+    y = np.asarray(labels, dtype=np.float32)
+    weights = np.zeros(X.shape[1], dtype=np.float32)
+    bias = 0.0
+
+    for _ in range(epochs):
+        probabilities = 1.0 / (1.0 + np.exp(-(X @ weights + bias)))
+        error = probabilities - y
+        weights -= learning_rate * (X.T @ error / len(y) + l2 * weights)
+        bias -= learning_rate * float(error.mean())
+
+    return weights, bias
+
+
+def save_model(path: str, weights: np.ndarray, bias: float) -> None:
+    """Save classifier weights."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, weights=weights, bias=np.float32(bias))
+
+
+def load_model(path: str) -> Tuple[np.ndarray, float]:
+    """Load classifier weights saved by ``save_model``."""
+    with np.load(path) as data:
+        return data["weights"].astype(np.float32), float(data["bias"])
+
+
+_router: Optional[RetrievalRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_retrieval_router() -> RetrievalRouter:
+    """Get the process-wide retrieval router."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = RetrievalRouter(
+                model_path=settings.router_model_path,
+                confidence=settings.router_confidence,
+                log_path=settings.router_log_path,
+                shadow_rate=settings.router_shadow_rate
+            )
+        return _router
@@ -8,15 +8,21 @@ from langgraph.graph import add_messages
 class AgentState(TypedDict):
     """State for the LangGraph agent."""
     
-    # Core conversation state
+    # Core conversation state: user and assistant turns
     messages: Annotated[List[Dict[str, Any]], add_messages]
     
+    # Summary of the turns compacted out of messages
+    history_summary: Optional[str]
+    
     # Current user query
     query: str
     
     # Retrieved context from Firebase
     retrieved_context: List[Dict[str, Any]]
     
+    # Metadata filters applied to retrieval
+    search_filters: Optional[Dict[str, Any]]
+    
     # Processing flags
     should_retrieve: bool
     retrieval_complete: bool
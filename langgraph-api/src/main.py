@@ -8,6 +8,7 @@ import uvicorn
 from contextlib import asynccontextmanager
 from src.api.routes import chat, documents, search, health
 from src.config import settings
+from src.services.container import ServiceContainer
 from src.utils import setup_logging
 
 # Setup logging
@@ -25,9 +26,15 @@ async def lifespan(app: FastAPI):
         host=settings.api_host,
         port=settings.api_port
     )
+    
+    # Build the shared services once and hand them out through dependencies
+    app.state.services = ServiceContainer()
+    await app.state.services.start()
+    
     yield
     # Shutdown
     logger.info("application_shutting_down")
+    await app.state.services.close()
 
 
 # Create FastAPI app
@@ -1,15 +1,24 @@
 """Data models for API requests and responses."""
 
-from .requests import ChatRequest, DocumentRequest, SearchRequest
-from .responses import ChatResponse, DocumentResponse, SearchResponse, SearchResult, ErrorResponse
+from .requests import ChatRequest, DocumentRequest, SearchRequest, BatchSearchRequest
+from .responses import (
+    ChatResponse,
+    DocumentResponse,
+    SearchResponse,
+    SearchResult,
+    BatchSearchResponse,
+    ErrorResponse
+)
 
 __all__ = [
     "ChatRequest",
     "DocumentRequest", 
     "SearchRequest",
+    "BatchSearchRequest",
     "ChatResponse",
     "DocumentResponse",
     "SearchResponse",
     "SearchResult",
+    "BatchSearchResponse",
     "ErrorResponse"
 ]
\ No newline at end of file
@@ -1,16 +1,19 @@
 """Request models for API endpoints."""
 
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, constr
+from typing import Optional, Dict, Any, List, Literal
+import uuid
 
 
 class ChatRequest(BaseModel):
     """Request model for chat endpoint."""
     
     query: str = Field(..., min_length=1, description="User query")
-    conversation_id: Optional[str] = Field(
-        default="default",
-        description="Conversation thread ID"
+    conversation_id: str = Field(
+        default_factory=lambda: uuid.uuid4().hex,
+        min_length=1,
+        description="Conversation thread ID; a new conversation is started if "
+                    "omitted, and its ID is returned with the response"
     )
     user_id: Optional[str] = Field(
         default="anonymous",
@@ -20,6 +23,15 @@ class ChatRequest(BaseModel):
         default=None,
         description="Additional context for the query"
     )
+    filters: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Metadata filters applied when retrieving context"
+    )
+    profile: Optional[Literal["quality", "fast"]] = Field(
+        default=None,
+        description="Agent profile: quality (analyze, plan, generate) or fast (one model call), "
+                    "the configured AGENT_PROFILE by default"
+    )
     
     class Config:
         json_schema_extra = {
@@ -72,12 +84,66 @@ class SearchRequest(BaseModel):
         le=1.0,
         description="Minimum similarity threshold"
     )
+    filters: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description=(
+            "Metadata filters: key to required value, or to a list of accepted "
+            "values. Keys are combined with AND."
+        )
+    )
+    mode: Optional[Literal["vector", "lexical", "hybrid"]] = Field(
+        default=None,
+        description=(
+            "vector, lexical (ranked by BM25) or hybrid (BM25 fused with vector "
+            "search); the configured default if omitted. similarity is the "
+            "cosine similarity and the threshold applies in every mode"
+        )
+    )
     
     class Config:
         json_schema_extra = {
             "example": {
                 "query": "Python experience",
                 "top_k": 5,
+                "threshold": 0.7,
+                "filters": {"category": "experience", "tags": ["python"]}
+            }
+        }
+
+class BatchSearchRequest(BaseModel):
+    """Request model for batch search endpoint."""
+    
+    queries: List[constr(strip_whitespace=True, min_length=1)] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Search queries, none of them blank"
+    )
+    top_k: Optional[int] = Field(
+        default=5,
+        ge=1,
+        le=20,
+        description="Number of results to return per query"
+    )
+    threshold: Optional[float] = Field(
+        default=0.7,
+        ge=0.0,
+        le=1.0,
+        description="Minimum similarity threshold"
+    )
+    filters: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description=(
+            "Metadata filters: key to required value, or to a list of accepted "
+            "values. Keys are combined with AND."
+        )
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": ["Python experience", "Hur gammal är du?"],
+                "top_k": 5,
                 "threshold": 0.7
             }
-        }
\ No newline at end of file
+        }
@@ -14,6 +14,10 @@ class ChatResponse(BaseModel):
         default_factory=list,
         description="Retrieved documents used for response"
     )
+    cached: bool = Field(
+        default=False,
+        description="Whether the answer was served from the response cache"
+    )
     timestamp: datetime = Field(
         default_factory=datetime.utcnow,
         description="Response timestamp"
@@ -96,6 +100,16 @@ class SearchResponse(BaseModel):
         }
 
 
+class BatchSearchResponse(BaseModel):
+    """Response model for batch search endpoint."""
+    
+    results: List[SearchResponse] = Field(
+        default_factory=list,
+        description="Search response per query, in request order"
+    )
+    total_queries: int = Field(..., description="Number of queries searched")
+
+
 class ErrorResponse(BaseModel):
     """Error response model."""
     
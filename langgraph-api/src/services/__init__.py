@@ -2,5 +2,7 @@
 
 from .firebase_vector_store import FirebaseVectorStore
 from .embeddings import EmbeddingService
+from .embedding_index import EmbeddingIndex
+from .index_sync import IndexSynchronizer
 
-__all__ = ["FirebaseVectorStore", "EmbeddingService"]
\ No newline at end of file
+__all__ = ["FirebaseVectorStore", "EmbeddingService", "EmbeddingIndex", "IndexSynchronizer"]
@@ -0,0 +1,230 @@
+"""Streaming bulk ingestion of NDJSON documents."""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import structlog
+from pydantic import ValidationError
+
+from src.config import settings
+from src.models import DocumentRequest
+from src.services.firebase_vector_store import MAX_BATCH_WRITES, FirebaseVectorStore
+from src.utils import count_tokens
+
+logger = structlog.get_logger()
+
+# OpenAI rejects embedding inputs longer than this
+MAX_INPUT_TOKENS = 8191
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Split a byte stream into numbered, non-empty lines.
+
+    Lines are left undecoded, so an invalid line is reported on its own
+    instead of ending the stream.
+
+    Args:
+        chunks: Raw request body chunks
+
+    Yields:
+        Tuples of (line number, raw line)
+    """
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+class BulkIngestor:
+    """
+    Ingests a stream of documents in embedding-sized batches.
+
+    Documents are grouped into batches bounded by item count and total
+    tokens, each batch is embedded with one request and written with one
+    Firestore batched write, and a bounded number of batches run
+    concurrently. Progress and per-item errors are reported as events
+    while the input is still being read.
+    """
+
+    def __init__(
+        self,
+        vector_store: FirebaseVectorStore,
+        max_batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ):
+        """
+        Initialize the ingestor.
+
+        Args:
+            vector_store: Store to write documents to
+            max_batch_size: Maximum documents per batch
+            max_batch_tokens: Maximum total tokens per embedding request
+            concurrency: Maximum batches in flight
+        """
+        self.vector_store = vector_store
+        self.max_batch_size = min(
+            max_batch_size or settings.bulk_max_batch_size,
+            MAX_BATCH_WRITES
+        )
+        self.max_batch_tokens = max_batch_tokens or settings.bulk_max_batch_tokens
+        self.concurrency = concurrency or settings.bulk_embed_concurrency
+
+        self.received = 0
+        self.written = 0
+        self.failed = 0
+
+    async def ingest(self, lines: AsyncIterator[Tuple[int, bytes]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Ingest NDJSON lines, yielding progress and error events.
+
+        Each line is a JSON object in the DocumentRequest shape.
+
+        Args:
+            lines: Numbered NDJSON lines
+
+        Yields:
+            Event dicts: "error" per failed item, "progress" per finished
+            batch and a final "done" summary
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        producer = asyncio.create_task(self._produce(lines, events))
+
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+        await producer
+
+    async def _produce(self, lines: AsyncIterator[Tuple[int, bytes]], events: asyncio.Queue) -> None:
+        """Read, batch and dispatch documents, then emit the summary."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks: List[asyncio.Task] = []
+        batch: List[Tuple[int, DocumentRequest]] = []
+        batch_tokens = 0
+
+        async def dispatch(items: List[Tuple[int, DocumentRequest]]) -> None:
+            await semaphore.acquire()
+            task = asyncio.create_task(self._process(items, events))
+            task.add_done_callback(lambda _: semaphore.release())
+            tasks.append(task)
+
+        try:
+            async for line_number, line in lines:
+                self.received += 1
+                try:
+                    document = DocumentRequest.model_validate_json(line.decode("utf-8"))
+                except UnicodeDecodeError as e:
+                    self._fail(events, line_number, None, f"Line is not valid UTF-8: {e.reason}")
+                    continue
+                except ValidationError as e:
+                    self._fail(events, line_number, None, _validation_message(e))
+                    continue
+
+                tokens = count_tokens(document.text)
+                # Chunked texts are embedded in windows well below the limit
+                if tokens > MAX_INPUT_TOKENS and not settings.chunk_size_tokens:
+                    self._fail(
+                        events,
+                        line_number,
+                        document.document_id,
+                        f"Text has {tokens} tokens, the limit is {MAX_INPUT_TOKENS}"
+                    )
+                    continue
+
+                if batch and (
+                    len(batch) >= self.max_batch_size
+                    or batch_tokens + tokens > self.max_batch_tokens
+                ):
+                    await dispatch(batch)
+                    batch, batch_tokens = [], 0
+
+                batch.append((line_number, document))
+                batch_tokens += tokens
+
+            if batch:
+                await dispatch(batch)
+
+            await asyncio.gather(*tasks)
+
+            logger.info(
+                "bulk_ingest_completed",
+                received=self.received,
+                written=self.written,
+                failed=self.failed
+            )
+            events.put_nowait({"event": "done", **self._counts()})
+
+        except Exception as e:
+            logger.error("bulk_ingest_failed", error=str(e), received=self.received)
+            events.put_nowait({"event": "aborted", "error": str(e), **self._counts()})
+
+        finally:
+            events.put_nowait(None)
+
+    async def _process(self, items: List[Tuple[int, DocumentRequest]], events: asyncio.Queue) -> None:
+        """Embed and write one batch."""
+        try:
+            document_ids = await self.vector_store.add_documents([
+                {
+                    "text": document.text,
+                    "metadata": document.metadata,
+                    "document_id": document.document_id
+                }
+                for _, document in items
+            ])
+            self.written += len(document_ids)
+
+        except Exception as e:
+            logger.error("bulk_batch_failed", error=str(e), batch_size=len(items))
+            for line_number, document in items:
+                self._fail(events, line_number, document.document_id, str(e))
+
+        events.put_nowait({"event": "progress", **self._counts()})
+
+    def _fail(
+        self,
+        events: asyncio.Queue,
+        line_number: int,
+        document_id: Optional[str],
+        error: str
+    ) -> None:
+        """Record a failed item."""
+        self.failed += 1
+        events.put_nowait({
+            "event": "error",
+            "line": line_number,
+            "document_id": document_id,
+            "error": error
+        })
+
+    def _counts(self) -> Dict[str, int]:
+        """Return the running totals."""
+        return {
+            "received": self.received,
+            "written": self.written,
+            "failed": self.failed
+        }
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Summarize a validation error in one line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'body'}: {detail['msg']}"
+        for detail in error.errors()
+    )
@@ -0,0 +1,101 @@
+"""Application-scoped service container."""
+
+from typing import Any, Dict, Optional
+
+import structlog
+from langgraph.graph.state import CompiledStateGraph
+
+from src.config import settings
+from src.core.agent import get_agent_graph
+from src.core.checkpointer import close_checkpointer, get_checkpointer
+from src.core.nodes import get_speculation_stats
+from src.core.router import get_retrieval_router
+from src.services.embedding_cache import close_document_embedding_cache
+from src.services.embeddings import EmbeddingService
+from src.services.firebase_vector_store import FirebaseVectorStore
+from src.services.index_sync import IndexSynchronizer
+from src.services.response_cache import ResponseCache
+
+logger = structlog.get_logger()
+
+
+class ServiceContainer:
+    """
+    Holds the long-lived services shared by all requests.
+
+    The embedding client, Firestore client, vector store and compiled agent
+    graph are built once per process, so requests reuse their keep-alive
+    connections and conversation memory instead of rebuilding them.
+    """
+
+    def __init__(self):
+        """Build the shared services."""
+        self.embedding_service = EmbeddingService()
+        self.vector_store = FirebaseVectorStore(embedding_service=self.embedding_service)
+        self.agent_graph = get_agent_graph(self.vector_store)
+        self.response_cache = ResponseCache(
+            max_size=settings.response_cache_size,
+            ttl_seconds=settings.response_cache_ttl,
+            similarity_threshold=settings.response_cache_similarity
+        )
+        self.vector_store.add_write_listener(self.response_cache.invalidate)
+        self.index_sync: Optional[IndexSynchronizer] = None
+
+    async def start(self) -> None:
+        """Warm the services and start background synchronization."""
+        # Load the index before serving, so no request pays for the first load
+        await self.vector_store.load_index()
+
+        # Keep the shared embedding index in sync with Firestore; the listener
+        # only reconciles the index loaded above
+        if settings.index_sync_enabled:
+            self.index_sync = IndexSynchronizer(
+                self.vector_store.listener_collection(),
+                self.vector_store.index
+            )
+            self.index_sync.start()
+
+        logger.info(
+            "services_started",
+            index_loaded=self.vector_store.index.loaded,
+            index_sync_enabled=self.index_sync is not None
+        )
+
+    async def close(self) -> None:
+        """Stop background work, persist the index and close connections."""
+        if self.index_sync:
+            self.index_sync.stop()
+
+        try:
+            await self.vector_store.save_index_snapshot()
+        finally:
+            await self.vector_store.aclose()
+            close_document_embedding_cache()
+            close_checkpointer()
+
+        logger.info("services_closed")
+
+    def agent(self, profile: Optional[str] = None) -> CompiledStateGraph:
+        """
+        Get the shared agent graph of a profile.
+
+        Args:
+            profile: Graph profile, the configured AGENT_PROFILE by default
+
+        Returns:
+            Compiled agent graph
+        """
+        if profile is None:
+            return self.agent_graph
+        return get_agent_graph(self.vector_store, profile)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state of the shared index, its synchronizer, caches, router and checkpointer."""
+        return {
+            "index": self.vector_store.index.stats(),
+            "index_sync": self.index_sync.stats() if self.index_sync else None,
+            "response_cache": self.response_cache.stats(),
+            "retrieval_router": get_retrieval_router().stats(),
+            "speculative_retrieval": get_speculation_stats().stats(),
+            "checkpointer": get_checkpointer().stats()
+        }
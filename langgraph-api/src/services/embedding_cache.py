@@ -0,0 +1,309 @@
+"""Caches for query and document embeddings."""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize a query for cache lookups.
+
+    Applies Unicode NFKC normalization, collapses whitespace and folds case,
+    so "How old are you?" and " how  old are YOU? " share an entry.
+
+    Args:
+        text: Query text
+
+    Returns:
+        Normalized text
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU cache of query embeddings with time-based expiry.
+
+    Entries are keyed by (embedding model, text). The least recently used
+    entry is evicted when the cache is full, and entries older than the TTL
+    are treated as misses.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600, normalize: bool = True):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached embeddings, 0 disables caching
+            ttl_seconds: Seconds an entry stays valid
+            normalize: Normalize Unicode, whitespace and case of keys
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.normalize = normalize
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, model: str, text: str) -> Tuple[str, str]:
+        """Build the cache key for a model and text."""
+        return model, normalize_query(text) if self.normalize else text
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """
+        Look up a cached embedding.
+
+        Args:
+            model: Embedding model name
+            text: Query text
+
+        Returns:
+            Cached embedding or None
+        """
+        if self.max_size <= 0:
+            return None
+
+        key = self.key(model, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, embedding = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, model: str, text: str, embedding: List[float]) -> None:
+        """
+        Store an embedding.
+
+        Args:
+            model: Embedding model name
+            text: Query text
+            embedding: Embedding to cache
+        """
+        if self.max_size <= 0:
+            return
+
+        key = self.key(model, text)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else None
+        }
+
+
+_query_cache: Optional[QueryEmbeddingCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Get the process-wide query embedding cache."""
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            _query_cache = QueryEmbeddingCache(
+                max_size=settings.query_embedding_cache_size,
+                ttl_seconds=settings.query_embedding_cache_ttl,
+                normalize=settings.query_embedding_cache_normalize
+            )
+        return _query_cache
+
+
+class PersistentEmbeddingCache:
+    """
+    SQLite-backed cache of document embeddings keyed by content hash.
+
+    Entries are keyed by (embedding model, sha256 of the exact text), so
+    re-ingesting unchanged text never calls the embedding API again. The
+    database runs in WAL mode and can be shared by several worker
+    processes and by offline re-embedding tools.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open or create the cache database.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Return the sha256 hex digest of a text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+
+        Returns:
+            Embedding or None for each text, in input order
+        """
+        hashes = [self.text_hash(text) for text in texts]
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "  # noqa: S608
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall()
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=np.float64).tolist()
+
+            results = [found.get(text_hash) for text_hash in hashes]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+
+        return results
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]) -> None:
+        """
+        Store embeddings.
+
+        Args:
+            model: Embedding model name
+            texts: Embedded texts
+            embeddings: Embeddings in the same order as the texts
+        """
+        now = time.time()
+        rows = [
+            (
+                model,
+                self.text_hash(text),
+                len(embedding),
+                np.asarray(embedding, dtype=np.float64).tobytes(),
+                now
+            )
+            for text, embedding in zip(texts, embeddings)
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model, text_hash, dimension, vector, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and hit/miss counters."""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return {
+            "path": self.path,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+_document_cache: Optional[PersistentEmbeddingCache] = None
+_document_cache_lock = threading.Lock()
+
+
+def get_document_embedding_cache() -> Optional[PersistentEmbeddingCache]:
+    """Get the process-wide document embedding cache, if configured."""
+    global _document_cache
+    if not settings.embedding_cache_path:
+        return None
+
+    with _document_cache_lock:
+        if _document_cache is None:
+            _document_cache = PersistentEmbeddingCache(settings.embedding_cache_path)
+            logger.info(
+                "document_embedding_cache_opened",
+                path=settings.embedding_cache_path
+            )
+        return _document_cache
+
+
+def close_document_embedding_cache() -> None:
+    """Close the process-wide document embedding cache, if open."""
+    global _document_cache
+    with _document_cache_lock:
+        if _document_cache is not None:
+            _document_cache.close()
+            _document_cache = None
@@ -0,0 +1,991 @@
+"""Resident in-memory embedding index for semantic search."""
+
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import structlog
+
+from src.config import settings
+from src.services.lexical_index import BM25Index
+from src.services.metadata_index import MetadataIndex
+from src.services.vector_index import ExactIndex, VectorIndex, create_vector_index
+
+logger = structlog.get_logger()
+
+# Field names used by the different ingestion tools writing to the collection
+EMBEDDING_FIELDS = ("embedding", "embeddings", "vector")
+TEXT_FIELDS = ("text", "content", "chunk", "document")
+
+# Fields read when loading the index; text is hydrated lazily
+INDEX_FIELDS = EMBEDDING_FIELDS + (
+    "embedding_norm", "metadata", "parent_id", "created_at", "updated_at"
+)
+
+# Candidates fetched per result when chunks of one parent must be collapsed
+CHUNK_OVERFETCH = 4
+
+# Fields read when hydrating the payload of a search result
+PAYLOAD_FIELDS = TEXT_FIELDS + ("data", "metadata")
+
+
+def extract_embedding(doc_data: Dict[str, Any]) -> Optional[List[float]]:
+    """Return the embedding stored in a Firestore document, if any."""
+    for field in EMBEDDING_FIELDS:
+        if field in doc_data:
+            embedding = doc_data[field]
+            return embedding if embedding is not None and len(embedding) else None
+    return None
+
+
+def extract_text(doc_data: Dict[str, Any]) -> str:
+    """Return the text content stored in a Firestore document."""
+    for field in TEXT_FIELDS:
+        if doc_data.get(field):
+            return doc_data[field]
+    return str(doc_data.get("data", ""))
+
+
+def collapse_chunks(results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    """
+    Keep the best-ranked chunk of each parent document.
+
+    Args:
+        results: Ranked results, chunks carrying their parent's ID in ``parent_id``
+        top_k: Maximum results to keep
+
+    Returns:
+        At most top_k results with at most one per parent
+    """
+    seen = set()
+    collapsed = []
+    for result in results:
+        key = result.get("parent_id") or result["id"]
+        if key in seen:
+            continue
+        seen.add(key)
+        collapsed.append(result)
+        if len(collapsed) == top_k:
+            break
+    return collapsed
+
+
+class SnapshotMatrix:
+    """
+    Read-only rows of a mapped snapshot followed by a writable tail.
+
+    Restored rows stay in the shared memory map and are never written, so
+    their pages are shared by every worker. Rows inserted afterwards go to
+    a private tail buffer that grows on its own. The class implements the
+    subset of the ndarray interface the backends use: ``shape``, slicing
+    from the start, row and fancy indexing, ``matrix @ query`` and
+    ``queries @ matrix.T``.
+    """
+
+    # Make ndarray operators defer to __rmatmul__ instead of converting us
+    __array_ufunc__ = None
+
+    def __init__(self, base: np.ndarray, tail: np.ndarray):
+        self.base = base
+        self.tail = tail
+
+    @property
+    def base_rows(self) -> int:
+        return self.base.shape[0]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self.base_rows + self.tail.shape[0], self.base.shape[1])
+
+    @property
+    def nbytes(self) -> int:
+        return self.base.nbytes + self.tail.nbytes
+
+    @property
+    def T(self) -> "_TransposedSnapshotMatrix":
+        return _TransposedSnapshotMatrix(self)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if start != 0 or step != 1:
+                raise IndexError("Only leading slices of a snapshot matrix are supported")
+            if stop <= self.base_rows:
+                return self.base[:stop]
+            return SnapshotMatrix(self.base, self.tail[:stop - self.base_rows])
+
+        if isinstance(key, (int, np.integer)):
+            if key < self.base_rows:
+                return self.base[key]
+            return self.tail[key - self.base_rows]
+
+        rows = np.asarray(key, dtype=np.int64)
+        in_base = rows < self.base_rows
+        result = np.empty((len(rows), self.base.shape[1]), dtype=np.float32)
+        result[in_base] = self.base[rows[in_base]]
+        result[~in_base] = self.tail[rows[~in_base] - self.base_rows]
+        return result
+
+    def __setitem__(self, row: int, value: Any) -> None:
+        if row < self.base_rows:
+            raise ValueError(f"Row {row} belongs to the read-only snapshot")
+        self.tail[row - self.base_rows] = value
+
+    def __matmul__(self, other: np.ndarray) -> np.ndarray:
+        return np.concatenate([self.base @ other, self.tail @ other])
+
+    def writable(self, row: int) -> bool:
+        """Whether a row lives in the tail buffer."""
+        return row >= self.base_rows
+
+
+class _TransposedSnapshotMatrix:
+    """Right-hand side of ``queries @ matrix.T`` for a SnapshotMatrix."""
+
+    __array_ufunc__ = None
+
+    def __init__(self, matrix: SnapshotMatrix):
+        self.matrix = matrix
+
+    def __rmatmul__(self, queries: np.ndarray) -> np.ndarray:
+        return np.concatenate(
+            [queries @ self.matrix.base.T, queries @ self.matrix.tail.T],
+            axis=-1
+        )
+
+
+class EmbeddingIndex:
+    """
+    Contiguous float32 matrix of pre-normalized embeddings.
+
+    Each document occupies one row of the matrix. Rows are normalized on
+    insert so cosine similarity is a dot product. Candidate rows are found
+    by a pluggable VectorIndex backend, exact brute force by default. Deleted rows are
+    tombstoned and reused by later inserts, so row numbers stay stable for
+    the lifetime of a document. The exception are rows restored from a
+    snapshot: they are read-only, so an update moves the document to a new
+    row in the writable tail (see SnapshotMatrix).
+
+    Documents can be loaded from a projection holding only the embedding,
+    metadata and timestamps. Their text is then hydrated on demand, once
+    they appear in search results, and cached from then on. Metadata is
+    kept in an inverted index so filtered searches only score matching rows.
+    Backends that only re-rank a few rows, like int8 quantization, get the
+    matrix in a disk-backed memory map instead, so the operating system
+    can page it out.
+    An optional BM25 index over the text of hydrated documents serves
+    lexical and hybrid search. Chunks of a longer document carry the ID of
+    their parent, and results keep only the best chunk per parent.
+
+    The index is shared by every store in the process and may be mutated
+    from background threads, so all access goes through an internal lock.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        initial_capacity: int = 1024,
+        vector_index: Optional[VectorIndex] = None,
+        recall_sample_size: int = 100,
+        lexical_index: Optional[BM25Index] = None
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            dimension: Embedding dimension
+            initial_capacity: Number of rows to preallocate
+            vector_index: Nearest-neighbour backend, exact search by default
+            recall_sample_size: Queries used to measure approximate recall
+            lexical_index: BM25 index kept alongside the vectors, None to disable
+        """
+        self.dimension = dimension
+        self.vector_index = vector_index or ExactIndex()
+        self.recall_sample_size = recall_sample_size
+        self._recall: Optional[float] = None
+        self._lock = threading.RLock()
+        self._matrix = self._new_matrix(initial_capacity)
+        self._live = np.zeros(initial_capacity, dtype=bool)
+        self._ids: List[Optional[str]] = [None] * initial_capacity
+        self._rows: Dict[str, int] = {}
+        self._payloads: Dict[str, Dict[str, Any]] = {}
+        self.metadata_index = MetadataIndex()
+        self.lexical_index = lexical_index
+        self._chunks: Set[str] = set()
+        self._free: List[int] = []
+        self._size = 0
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index has been populated from the collection."""
+        return self._loaded
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, document_id: str) -> bool:
+        return document_id in self._rows
+
+    def document_ids(self) -> List[str]:
+        """Return the IDs of all indexed documents."""
+        with self._lock:
+            return list(self._rows)
+
+    def payload(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored payload of an indexed document, if any."""
+        with self._lock:
+            payload = self._payloads.get(document_id)
+            return dict(payload) if payload is not None else None
+
+    def load(
+        self,
+        documents: Iterable[Tuple[str, Dict[str, Any]]],
+        hydrated: bool = True
+    ) -> int:
+        """
+        Replace the index contents with the given documents.
+
+        Args:
+            documents: Iterable of (document_id, document_data) pairs
+            hydrated: False if the documents are projected to INDEX_FIELDS,
+                leaving their payloads to be hydrated later
+
+        Returns:
+            Number of documents indexed
+        """
+        with self._lock:
+            self._loaded = False
+            if isinstance(self._matrix, SnapshotMatrix):
+                self._matrix = self._new_matrix(len(self._ids))
+            self._live[:] = False
+            self._ids = [None] * len(self._ids)
+            self._rows.clear()
+            self._payloads.clear()
+            self._chunks.clear()
+            self._free.clear()
+            self._size = 0
+
+            skipped = 0
+            for document_id, doc_data in documents:
+                if not self.upsert(document_id, doc_data, hydrated=hydrated):
+                    skipped += 1
+
+            self._build_payload_indexes()
+            self._build_vector_index()
+            self._loaded = True
+
+        logger.info(
+            "embedding_index_loaded",
+            documents=len(self._rows),
+            skipped=skipped,
+            dimension=self.dimension
+        )
+        return len(self._rows)
+
+    def reconcile(self, documents: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """
+        Bring the index in line with a full listing of the collection.
+
+        Documents whose ``updated_at`` matches the indexed copy are left
+        untouched, so rows restored from a memory-mapped snapshot stay
+        shared with other processes. The lock is taken per document, so
+        searches are not held up for the whole listing.
+
+        Args:
+            documents: Iterable of (document_id, document_data) pairs
+
+        Returns:
+            Number of documents inserted, updated or removed
+
+        Raises:
+            RuntimeError: If the index has not been loaded yet
+        """
+        if not self._loaded:
+            raise RuntimeError("The index must be loaded before it is reconciled")
+
+        seen = set()
+        changed = 0
+        for document_id, doc_data in documents:
+            seen.add(document_id)
+            if extract_embedding(doc_data) is None:
+                # E.g. a document that has since been split into chunks
+                if self.remove(document_id):
+                    changed += 1
+                continue
+            with self._lock:
+                payload = self._payloads.get(document_id)
+                updated_at = doc_data.get("updated_at")
+                if (
+                    payload is not None
+                    and updated_at is not None
+                    and payload.get("updated_at") == updated_at
+                ):
+                    continue
+                self.upsert(document_id, doc_data)
+            changed += 1
+
+        for document_id in [d for d in self.document_ids() if d not in seen]:
+            if self.remove(document_id):
+                changed += 1
+
+        return changed
+
+    def export(self) -> Tuple[np.ndarray, List[str], List[Dict[str, Any]]]:
+        """
+        Return a compact copy of the indexed documents.
+
+        Returns:
+            Tuple of (normalized embedding matrix, document IDs, payloads)
+        """
+        with self._lock:
+            rows = np.flatnonzero(self._live[:self._size])
+            ids = [self._ids[row] for row in rows]
+            return (
+                np.ascontiguousarray(self._matrix[rows]),
+                ids,
+                [dict(self._payloads[document_id]) for document_id in ids]
+            )
+
+    def restore(
+        self,
+        matrix: np.ndarray,
+        ids: List[str],
+        payloads: List[Dict[str, Any]]
+    ) -> int:
+        """
+        Replace the index contents with previously exported data.
+
+        The matrix is used as-is and never written, so a read-only memory
+        map keeps its pages shared between processes. Later inserts and
+        updates go to a separate tail buffer.
+
+        Args:
+            matrix: Normalized float32 embedding matrix, one row per ID
+            ids: Document IDs
+            payloads: Payloads in the same order as the IDs
+
+        Returns:
+            Number of documents indexed
+        """
+        if matrix.shape != (len(ids), self.dimension):
+            raise ValueError(
+                f"Matrix shape {matrix.shape} does not match "
+                f"{len(ids)} documents of dimension {self.dimension}"
+            )
+
+        with self._lock:
+            self._matrix = SnapshotMatrix(matrix, self._new_matrix(0))
+            self._live = np.ones(len(ids), dtype=bool)
+            self._ids = list(ids)
+            self._rows = {document_id: row for row, document_id in enumerate(ids)}
+            self._payloads = dict(zip(ids, payloads))
+            self._chunks = {
+                document_id for document_id, payload in self._payloads.items()
+                if payload.get("parent_id")
+            }
+            self._free = []
+            self._size = len(ids)
+            self._build_payload_indexes()
+            self._build_vector_index()
+            self._loaded = True
+
+        logger.info(
+            "embedding_index_restored",
+            documents=len(ids),
+            dimension=self.dimension
+        )
+        return len(ids)
+
+    def upsert(
+        self,
+        document_id: str,
+        doc_data: Dict[str, Any],
+        hydrated: bool = True
+    ) -> bool:
+        """
+        Insert or update a document.
+
+        Partial updates without an embedding only refresh the stored
+        payload of an already indexed document.
+
+        Args:
+            document_id: Document ID
+            doc_data: Full or partial Firestore document data
+            hydrated: False if doc_data is projected to INDEX_FIELDS
+
+        Returns:
+            True if the document is present in the index afterwards
+        """
+        embedding = extract_embedding(doc_data)
+
+        with self._lock:
+            if embedding is None:
+                payload = self._payloads.get(document_id)
+                if payload is None:
+                    return False
+                payload.update(self._payload(doc_data, partial=True))
+                self._track_chunk(document_id, payload)
+                if self._loaded:
+                    self._index_payload(self._rows[document_id], payload)
+                return True
+
+            vector = np.asarray(embedding, dtype=np.float32)
+            if vector.shape != (self.dimension,):
+                logger.warning(
+                    "embedding_index_dimension_mismatch",
+                    document_id=document_id,
+                    expected=self.dimension,
+                    actual=vector.shape[-1] if vector.ndim else 0
+                )
+                return False
+
+            # Documents carrying embedding_norm were normalized when written
+            norm = 1.0 if doc_data.get("embedding_norm") else np.linalg.norm(vector)
+            if norm == 0:
+                return False
+
+            row = self._rows.get(document_id)
+            exists = row is not None
+            if exists and not self._writable(row):
+                # Keep the snapshot row shared and move the document to the tail
+                self._release_row(row)
+                row = None
+            if row is None:
+                row = self._allocate_row()
+                self._rows[document_id] = row
+                self._ids[row] = document_id
+                self._live[row] = True
+
+            self._matrix[row] = vector / norm
+            self.vector_index.add(row, self._matrix[row])
+            payload = self._payloads.setdefault(document_id, {})
+            payload.update(self._payload(doc_data, partial=exists or not hydrated))
+            self._track_chunk(document_id, payload)
+            # Loads build the payload indexes in one pass at the end
+            if self._loaded:
+                self._index_payload(row, payload)
+
+            if self._loaded and self.vector_index.needs_rebuild(len(self._rows)):
+                self._build_vector_index()
+            return True
+
+    def unhydrated(self, document_ids: Iterable[str]) -> List[str]:
+        """
+        Return the indexed documents whose text has not been fetched yet.
+
+        Args:
+            document_ids: Document IDs to check
+
+        Returns:
+            IDs of indexed documents without a cached payload
+        """
+        with self._lock:
+            return [
+                document_id
+                for document_id in dict.fromkeys(document_ids)
+                if document_id in self._payloads
+                and "text" not in self._payloads[document_id]
+            ]
+
+    def hydrate(self, document_id: str, doc_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Cache the text and metadata of an indexed document.
+
+        Args:
+            document_id: Document ID
+            doc_data: Document data projected to PAYLOAD_FIELDS
+
+        Returns:
+            Copy of the complete payload, or None if the document is not indexed
+        """
+        with self._lock:
+            payload = self._payloads.get(document_id)
+            if payload is None:
+                return None
+            # Timestamps stay as indexed, they track the indexed embedding
+            payload["text"] = extract_text(doc_data)
+            payload["metadata"] = doc_data.get("metadata") or {}
+            if self._loaded:
+                self._index_payload(self._rows[document_id], payload)
+            return dict(payload)
+
+    def remove(self, document_id: str) -> bool:
+        """
+        Remove a document from the index.
+
+        Args:
+            document_id: Document ID
+
+        Returns:
+            True if the document was indexed
+        """
+        with self._lock:
+            row = self._rows.pop(document_id, None)
+            if row is None:
+                return False
+
+            self._release_row(row)
+            self._payloads.pop(document_id, None)
+            self._chunks.discard(document_id)
+            return True
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        threshold: float,
+        filters: Optional[Dict[str, Any]] = None,
+        **search_params: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the most similar documents to a query embedding.
+
+        Args:
+            query_embedding: Query embedding
+            top_k: Number of results to return
+            threshold: Minimum similarity threshold
+            filters: Metadata key to required value or list of values
+            **search_params: Backend parameters such as ``nprobe``
+
+        Returns:
+            List of matching documents with similarity scores
+        """
+        return self.search_many(
+            [query_embedding],
+            top_k,
+            threshold,
+            filters=filters,
+            **search_params
+        )[0]
+
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        threshold: float,
+        filters: Optional[Dict[str, Any]] = None,
+        **search_params: Any
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Find the most similar documents for several query embeddings.
+
+        All queries are scored together, which the exact backend turns
+        into a single matrix-matrix product. With filters, the matching
+        rows are looked up in the metadata index first and only those rows
+        are scored, exactly.
+
+        Args:
+            query_embeddings: Query embeddings
+            top_k: Number of results to return per query
+            threshold: Minimum similarity threshold
+            filters: Metadata key to required value or list of values
+
+        Returns:
+            One list of matching documents per query
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(
+            len(query_embeddings), self.dimension
+        )
+        norms = np.linalg.norm(queries, axis=1)
+        valid = norms > 0
+        queries[valid] /= norms[valid, None]
+
+        with self._lock:
+            k = min(top_k * (CHUNK_OVERFETCH if self._chunks else 1), len(self._rows))
+            if k <= 0 or not valid.any():
+                return [[] for _ in query_embeddings]
+
+            if filters:
+                matches = self._search_filtered(queries[valid], k, filters)
+            else:
+                matches = self.vector_index.search_batch(
+                    self._matrix[:self._size],
+                    self._live[:self._size],
+                    queries[valid],
+                    k,
+                    **search_params
+                )
+
+            results: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+            for position, (rows, scores) in zip(np.flatnonzero(valid), matches):
+                results[position] = self._results(rows, scores, threshold, top_k)
+            return results
+
+    def _search_filtered(
+        self,
+        queries: np.ndarray,
+        k: int,
+        filters: Dict[str, Any]
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Score only the rows whose metadata matches the filters."""
+        rows = np.flatnonzero(self._filter_mask(filters))
+
+        matches = ExactIndex().search_batch(
+            self._matrix[rows],
+            np.ones(len(rows), dtype=bool),
+            queries,
+            k
+        )
+        return [(rows[positions], scores) for positions, scores in matches]
+
+    def _filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Return the mask of live rows matching metadata filters."""
+        bitmap = self.metadata_index.match(filters)
+        return MetadataIndex.to_mask(bitmap, self._size) & self._live[:self._size]
+
+    def lexical_search(
+        self,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank documents by BM25.
+
+        Results carry the BM25 score as ``lexical_score`` and the
+        idf-weighted fraction of query terms the document contains as
+        ``coverage``. With a query embedding, ``similarity`` is the cosine
+        similarity like in vector results; without one, the query need not
+        be embedded and ``similarity`` is the coverage. No threshold is
+        applied.
+
+        Args:
+            query: Query text
+            top_k: Number of results to return
+            filters: Metadata key to required value or list of values
+            query_embedding: Query embedding, if already computed
+
+        Returns:
+            List of matching documents, empty if lexical search is disabled
+        """
+        if self.lexical_index is None:
+            return []
+
+        with self._lock:
+            mask = self._filter_mask(filters) if filters else None
+            k = top_k * (CHUNK_OVERFETCH if self._chunks else 1)
+            matches = self.lexical_index.search(query, k, mask)
+            if query_embedding is not None:
+                similarities = self._cosines(query_embedding, [row for row, _, _ in matches])
+            else:
+                similarities = [coverage for _, _, coverage in matches]
+
+            results = []
+            for (row, score, coverage), similarity in zip(matches, similarities):
+                result = self._result(row, float(similarity))
+                result["lexical_score"] = score
+                result["coverage"] = coverage
+                results.append(result)
+            return collapse_chunks(results, top_k)
+
+    @staticmethod
+    def fuse(
+        vector_results: List[Dict[str, Any]],
+        lexical_results: List[Dict[str, Any]],
+        top_k: int,
+        threshold: float,
+        rrf_k: int = 60
+    ) -> List[Dict[str, Any]]:
+        """
+        Combine vector and lexical rankings with reciprocal rank fusion.
+
+        Each document scores the sum of 1 / (rrf_k + rank) over the lists it
+        appears in. The threshold applies to the cosine similarity of every
+        fused result, so documents found only lexically must reach it too.
+
+        Args:
+            vector_results: Results ranked by similarity
+            lexical_results: Results ranked by BM25
+            top_k: Number of results to return
+            threshold: Minimum cosine similarity
+            rrf_k: Rank offset damping the weight of top ranks
+
+        Returns:
+            Fused results with the fusion score in ``score``
+        """
+        fused: Dict[str, float] = {}
+        merged: Dict[str, Dict[str, Any]] = {}
+        for ranking in (vector_results, lexical_results):
+            for rank, result in enumerate(ranking, 1):
+                fused[result["id"]] = fused.get(result["id"], 0.0) + 1.0 / (rrf_k + rank)
+                merged.setdefault(result["id"], dict(result))
+
+        ranked = sorted(fused, key=fused.get, reverse=True)
+        results = []
+        for document_id in ranked:
+            result = merged[document_id]
+            if result["similarity"] < threshold:
+                continue
+            result["score"] = fused[document_id]
+            results.append(result)
+        return collapse_chunks(results, top_k)
+
+    def similarities(self, query_embedding: List[float], document_ids: List[str]) -> Dict[str, float]:
+        """
+        Compute the cosine similarity of a query to specific documents.
+
+        Args:
+            query_embedding: Query embedding
+            document_ids: Document IDs
+
+        Returns:
+            Similarity per indexed document ID
+        """
+        with self._lock:
+            present = [document_id for document_id in document_ids if document_id in self._rows]
+            scores = self._cosines(query_embedding, [self._rows[d] for d in present])
+        return {document_id: float(score) for document_id, score in zip(present, scores)}
+
+    def _cosines(self, query_embedding: List[float], rows: List[int]) -> np.ndarray:
+        """Return the clamped cosine similarity of a query to some rows."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not rows or norm == 0:
+            return np.zeros(len(rows), dtype=np.float32)
+        # Match the clamping of EmbeddingService.calculate_similarity
+        return np.clip(self._matrix[rows] @ (query / norm), 0.0, 1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index size and memory usage."""
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "documents": len(self._rows),
+                "capacity": len(self._ids),
+                "dimension": self.dimension,
+                "matrix_bytes": int(self._matrix.nbytes),
+                "matrix_mapped": isinstance(
+                    self._matrix.base if isinstance(self._matrix, SnapshotMatrix) else self._matrix,
+                    np.memmap
+                ),
+                "vector_index": self.vector_index.stats(),
+                "metadata_index": self.metadata_index.stats(),
+                "lexical_index": (
+                    self.lexical_index.stats() if self.lexical_index is not None else None
+                ),
+                "recall_at_10": self._recall
+            }
+
+    def measure_recall(self, k: int = 10, sample_size: int = 100, seed: int = 0) -> Optional[float]:
+        """
+        Measure recall@k of the backend against exact search.
+
+        Queries are midpoints of random pairs of indexed documents, which
+        behave like real queries falling between stored chunks.
+
+        Args:
+            k: Number of results compared per query
+            sample_size: Number of sample queries
+            seed: Random seed for sampling
+
+        Returns:
+            Fraction of the exact top-k rows found by the backend
+        """
+        with self._lock:
+            rows = np.flatnonzero(self._live[:self._size])
+            if len(rows) == 0:
+                return None
+
+            rng = np.random.default_rng(seed)
+            matrix = self._matrix[:self._size]
+            live = self._live[:self._size]
+            exact = ExactIndex()
+
+            hits = 0
+            total = 0
+            for _ in range(sample_size):
+                first, second = rng.choice(rows, 2)
+                query = matrix[first] + matrix[second]
+                norm = np.linalg.norm(query)
+                if norm == 0:
+                    continue
+                query = query / norm
+
+                expected, _ = exact.search(matrix, live, query, k)
+                found, _ = self.vector_index.search(matrix, live, query, k)
+                hits += len(np.intersect1d(expected, found))
+                total += len(expected)
+
+            self._recall = hits / total if total else None
+
+        logger.info(
+            "embedding_index_recall_measured",
+            backend=self.vector_index.name,
+            k=k,
+            recall=self._recall
+        )
+        return self._recall
+
+    def _results(
+        self,
+        rows: np.ndarray,
+        scores: np.ndarray,
+        threshold: float,
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        """Convert ranked rows to result dicts, applying the threshold."""
+        results = []
+        for row, score in zip(rows, scores):
+            # Match the clamping of EmbeddingService.calculate_similarity
+            similarity = float(max(0.0, min(1.0, score)))
+            if similarity < threshold:
+                break
+
+            results.append(self._result(row, similarity))
+        return collapse_chunks(results, top_k)
+
+    def _result(self, row: int, similarity: float) -> Dict[str, Any]:
+        """Build the result dict of a row."""
+        document_id = self._ids[row]
+        payload = self._payloads[document_id]
+        return {
+            "id": document_id,
+            "text": payload.get("text", ""),
+            "metadata": payload.get("metadata", {}),
+            "similarity": similarity,
+            "parent_id": payload.get("parent_id"),
+            "created_at": payload.get("created_at"),
+            "updated_at": payload.get("updated_at")
+        }
+
+    def _track_chunk(self, document_id: str, payload: Dict[str, Any]) -> None:
+        """Remember whether a document is a chunk of a parent document."""
+        if payload.get("parent_id"):
+            self._chunks.add(document_id)
+        else:
+            self._chunks.discard(document_id)
+
+    def _index_payload(self, row: int, payload: Dict[str, Any]) -> None:
+        """Update the metadata and lexical indexes of a row."""
+        self.metadata_index.add(row, payload.get("metadata") or {})
+        if self.lexical_index is not None and "text" in payload:
+            self.lexical_index.add(row, payload["text"])
+
+    def _build_payload_indexes(self) -> None:
+        """Rebuild the metadata and lexical indexes over the live rows."""
+        self.metadata_index.build(
+            (row, self._payloads[document_id].get("metadata") or {})
+            for document_id, row in self._rows.items()
+        )
+        if self.lexical_index is not None:
+            self.lexical_index.build(
+                (row, self._payloads[document_id]["text"])
+                for document_id, row in self._rows.items()
+                if "text" in self._payloads[document_id]
+            )
+
+    def _build_vector_index(self) -> None:
+        """Rebuild the nearest-neighbour backend over the live rows."""
+        self.vector_index.build(
+            self._matrix[:self._size],
+            self._live[:self._size]
+        )
+        if self.vector_index.approximate and self.recall_sample_size:
+            self.measure_recall(sample_size=self.recall_sample_size)
+
+    def _writable(self, row: int) -> bool:
+        """Whether a row can be written in place."""
+        return not isinstance(self._matrix, SnapshotMatrix) or self._matrix.writable(row)
+
+    def _release_row(self, row: int) -> None:
+        """Tombstone a row, making it reusable unless it is read-only."""
+        self.vector_index.delete(row)
+        self.metadata_index.remove(row)
+        if self.lexical_index is not None:
+            self.lexical_index.remove(row)
+        self._live[row] = False
+        self._ids[row] = None
+        if self._writable(row):
+            self._matrix[row] = 0.0
+            self._free.append(row)
+
+    def _allocate_row(self) -> int:
+        """Return a free row, growing the matrix if needed."""
+        if self._free:
+            return self._free.pop()
+
+        if self._size == len(self._ids):
+            if isinstance(self._matrix, SnapshotMatrix):
+                # Grow only the tail, the snapshot rows stay mapped
+                base_rows = self._matrix.base_rows
+                tail_rows = self._size - base_rows
+                tail = self._new_matrix(max(16, tail_rows * 2))
+                tail[:tail_rows] = self._matrix.tail[:tail_rows]
+                matrix = SnapshotMatrix(self._matrix.base, tail)
+                capacity = base_rows + len(tail)
+            else:
+                capacity = max(1, len(self._ids) * 2)
+                matrix = self._new_matrix(capacity)
+                matrix[:self._size] = self._matrix[:self._size]
+            live = np.zeros(capacity, dtype=bool)
+            live[:self._size] = self._live[:self._size]
+            self._matrix = matrix
+            self._live = live
+            self._ids.extend([None] * (capacity - len(self._ids)))
+
+        row = self._size
+        self._size += 1
+        return row
+
+    def _new_matrix(self, capacity: int) -> np.ndarray:
+        """Allocate a zeroed matrix, disk-backed if the backend allows it."""
+        if self.vector_index.resident_vectors:
+            return np.zeros((capacity, self.dimension), dtype=np.float32)
+
+        # The mapping keeps the unlinked file alive
+        with tempfile.TemporaryFile(dir=settings.index_vector_dir or None) as file:
+            return np.memmap(
+                file,
+                dtype=np.float32,
+                mode="w+",
+                shape=(max(1, capacity), self.dimension)
+            )
+
+    @staticmethod
+    def _payload(doc_data: Dict[str, Any], partial: bool) -> Dict[str, Any]:
+        """Extract the fields returned with search results."""
+        payload = {}
+        if not partial or any(field in doc_data for field in TEXT_FIELDS):
+            payload["text"] = extract_text(doc_data)
+        if not partial or "metadata" in doc_data:
+            payload["metadata"] = doc_data.get("metadata") or {}
+        if not partial or "parent_id" in doc_data:
+            payload["parent_id"] = doc_data.get("parent_id")
+        for field in ("created_at", "updated_at"):
+            if not partial or field in doc_data:
+                payload[field] = doc_data.get(field)
+        return payload
+
+
+_indexes: Dict[str, EmbeddingIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_embedding_index(collection_name: str, dimension: int) -> EmbeddingIndex:
+    """
+    Get the process-wide index for a collection.
+
+    Args:
+        collection_name: Firestore collection name
+        dimension: Embedding dimension
+
+    Returns:
+        Shared embedding index
+    """
+    with _indexes_lock:
+        index = _indexes.get(collection_name)
+        if index is None:
+            index = EmbeddingIndex(
+                dimension,
+                vector_index=create_vector_index(),
+                recall_sample_size=settings.index_recall_sample_size,
+                lexical_index=BM25Index() if settings.lexical_index_enabled else None
+            )
+            _indexes[collection_name] = index
+        return index
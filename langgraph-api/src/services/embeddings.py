@@ -1,9 +1,17 @@
 """Embedding service for text vectorization."""
 
-from typing import List, Union
+from typing import List, Optional, Tuple, Union
+import asyncio
 import numpy as np
 from langchain_openai import OpenAIEmbeddings
+from openai import AsyncOpenAI, OpenAI
 from src.config import settings
+from src.services.embedding_cache import (
+    PersistentEmbeddingCache,
+    QueryEmbeddingCache,
+    get_document_embedding_cache,
+    get_query_embedding_cache
+)
 import structlog
 
 logger = structlog.get_logger()
@@ -12,30 +20,62 @@ logger = structlog.get_logger()
 class EmbeddingService:
     """Service for creating text embeddings using OpenAI."""
     
-    def __init__(self):
-        """Initialize the embedding service."""
+    def __init__(
+        self,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        document_cache: Optional[PersistentEmbeddingCache] = None
+    ):
+        """
+        Initialize the embedding service.
+        
+        Args:
+            query_cache: Cache for query embeddings, the process-wide cache by default
+            document_cache: Content-hash cache for document embeddings,
+                the configured persistent cache by default
+        """
+        # The OpenAI clients are owned here so their connection pools can be closed
+        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.async_client = AsyncOpenAI(api_key=settings.openai_api_key)
         self.embeddings = OpenAIEmbeddings(
             openai_api_key=settings.openai_api_key,
-            model=settings.embedding_model
+            model=settings.embedding_model,
+            client=self.client.embeddings,
+            async_client=self.async_client.embeddings
         )
+        self.query_cache = query_cache or get_query_embedding_cache()
+        self.document_cache = document_cache or get_document_embedding_cache()
         logger.info(
             "embedding_service_initialized",
             model=settings.embedding_model,
             dimension=settings.vector_dimension
         )
     
+    async def aclose(self) -> None:
+        """Close the HTTP connection pools of the OpenAI clients."""
+        await self.async_client.close()
+        self.client.close()
+        logger.info("embedding_service_closed")
+    
     async def embed_text(self, text: str) -> List[float]:
         """
         Create embedding for a single text.
         
+        Repeated texts are served from the query embedding cache.
+        
         Args:
             text: Text to embed
             
         Returns:
             List of floats representing the embedding
         """
+        cached = self.query_cache.get(settings.embedding_model, text)
+        if cached is not None:
+            logger.debug("text_embedding_cache_hit", text_length=len(text))
+            return cached
+        
         try:
             embedding = await self.embeddings.aembed_query(text)
+            self.query_cache.put(settings.embedding_model, text, embedding)
             logger.debug("text_embedded", text_length=len(text))
             return embedding
         except Exception as e:
@@ -60,6 +100,116 @@ class EmbeddingService:
             logger.error("batch_embedding_failed", error=str(e), count=len(texts))
             raise
     
+    async def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Create embeddings for document texts, reusing cached embeddings.
+        
+        Texts already embedded with the current model are read from the
+        persistent content-hash cache; only the remaining texts are sent to
+        the embedding API, in a single batch.
+        
+        Args:
+            texts: Document texts to embed
+            
+        Returns:
+            List of embeddings in input order
+        """
+        if self.document_cache is None:
+            return await self.embed_texts(texts)
+        
+        model = settings.embedding_model
+        embeddings = await asyncio.to_thread(self.document_cache.get_many, model, texts)
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            # Embed each distinct missing text once
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            new_embeddings = await self.embed_texts(unique_texts)
+            by_text = dict(zip(unique_texts, new_embeddings))
+            for i in missing:
+                embeddings[i] = by_text[texts[i]]
+            await asyncio.to_thread(
+                self.document_cache.put_many,
+                model,
+                unique_texts,
+                new_embeddings
+            )
+        
+        logger.debug(
+            "documents_embedded",
+            count=len(texts),
+            cache_hits=len(texts) - len(missing)
+        )
+        return embeddings
+    
+    async def embed_document(self, text: str) -> List[float]:
+        """
+        Create embedding for a single document text, reusing cached embeddings.
+        
+        Args:
+            text: Document text to embed
+            
+        Returns:
+            List of floats representing the embedding
+        """
+        return (await self.embed_documents([text]))[0]
+    
+    @staticmethod
+    def normalize(
+        embeddings: Union[List[float], List[List[float]], np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scale embeddings to unit length.
+        
+        Stored embeddings are normalized once at write time, so cosine
+        similarity against them is a plain dot product.
+        
+        Args:
+            embeddings: One embedding or a matrix with one embedding per row
+            
+        Returns:
+            Tuple of (float32 unit vectors in the input shape, original norms);
+            zero vectors are left as zeros
+        """
+        vectors = np.array(embeddings, dtype=np.float32, ndmin=1)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors, norms[..., 0]
+    
+    def similarities(
+        self,
+        queries: Union[List[float], List[List[float]], np.ndarray],
+        matrix: Union[List[List[float]], np.ndarray],
+        normalized: bool = False
+    ) -> np.ndarray:
+        """
+        Calculate cosine similarities of queries against many embeddings.
+        
+        The scores are computed with one float32 matrix product.
+        
+        Args:
+            queries: One query embedding or a matrix of query embeddings
+            matrix: Candidate embeddings, one per row, or a single embedding
+            normalized: Whether both inputs are already unit length
+            
+        Returns:
+            Similarities between 0 and 1, shaped (candidates,) for a single
+            query or (queries, candidates) for several
+        """
+        if normalized:
+            queries = np.asarray(queries, dtype=np.float32)
+            matrix = np.asarray(matrix, dtype=np.float32)
+        else:
+            queries, _ = self.normalize(queries)
+            matrix, _ = self.normalize(matrix)
+        
+        # A single candidate, or an empty list, becomes a matrix of rows
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(-1, queries.shape[-1])
+        
+        scores = matrix @ queries.T
+        return np.clip(scores.T, 0.0, 1.0)
+    
     def calculate_similarity(
         self,
         embedding1: Union[List[float], np.ndarray],
@@ -68,6 +218,8 @@ class EmbeddingService:
         """
         Calculate cosine similarity between two embeddings.
         
+        Use similarities() to rank many candidates at once.
+        
         Args:
             embedding1: First embedding
             embedding2: Second embedding
@@ -75,19 +227,4 @@ class EmbeddingService:
         Returns:
             Similarity score between 0 and 1
         """
-        # Convert to numpy arrays if needed
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
-        
-        # Calculate cosine similarity
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        
-        similarity = dot_product / (norm1 * norm2)
-        
-        # Ensure the result is between 0 and 1
-        return float(max(0, min(1, similarity)))
\ No newline at end of file
+        return float(self.similarities(embedding1, [embedding2])[0])
\ No newline at end of file
@@ -1,31 +1,67 @@
 """Firebase vector store implementation for semantic search."""
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple
+import asyncio
+import base64
+import inspect
+import json
 import firebase_admin
-from firebase_admin import credentials, firestore
-from google.cloud.firestore_v1 import FieldFilter
+from firebase_admin import credentials, firestore, firestore_async
+from google.cloud.firestore_v1 import DELETE_FIELD, FieldFilter
 import numpy as np
 from datetime import datetime
 import structlog
 from src.config import settings
 from src.services.embeddings import EmbeddingService
+from src.services.embedding_index import INDEX_FIELDS, PAYLOAD_FIELDS, get_embedding_index
+from src.services.index_snapshot import load_snapshot, save_snapshot
+from src.services.lexical_index import tokenize
+from src.utils import chunk_text
 
 logger = structlog.get_logger()
 
+# Guards the one-time load of the shared embedding index
+_index_load_lock = asyncio.Lock()
+
+# Background fetch of document text for the lexical index, and whether it
+# completed for the current load
+_text_load_task: Optional[asyncio.Task] = None
+_texts_loaded = False
+
+# Search modes ranking with BM25, which needs the text of every document
+LEXICAL_MODES = ("lexical", "hybrid")
+
+# Documents read per get_all while fetching text
+TEXT_LOAD_BATCH = 500
+
+# Firestore rejects batched writes with more operations than this
+MAX_BATCH_WRITES = 500
+
 
 class FirebaseVectorStore:
     """Firebase-based vector store for storing and searching embeddings."""
     
-    def __init__(self):
-        """Initialize Firebase connection and services."""
+    def __init__(self, embedding_service: Optional[EmbeddingService] = None):
+        """
+        Initialize Firebase connection and services.
+        
+        Args:
+            embedding_service: Shared embedding service, a new one by default
+        """
         # Initialize Firebase Admin SDK
         if not firebase_admin._apps:
             cred = credentials.Certificate(settings.get_firebase_credentials())
             firebase_admin.initialize_app(cred)
         
-        self.db = firestore.client()
+        # Async client so Firestore round trips never block the event loop
+        self.db = firestore_async.client()
         self.collection_name = settings.firebase_collection_name
-        self.embedding_service = EmbeddingService()
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.index = get_embedding_index(
+            self.collection_name,
+            settings.vector_dimension
+        )
+        self._write_listeners: List[Callable[[List[str], List[List[float]]], None]] = []
         
         logger.info(
             "firebase_vector_store_initialized",
@@ -33,6 +69,58 @@ class FirebaseVectorStore:
             project_id=settings.firebase_project_id
         )
     
+    def listener_collection(self):
+        """
+        Get a collection reference that supports snapshot listeners.
+        
+        The async client has no ``on_snapshot``; listeners run on their own
+        background thread, so the synchronous client is used for them.
+        """
+        return firestore.client().collection(self.collection_name)
+    
+    def add_write_listener(
+        self,
+        callback: Callable[[List[str], List[List[float]]], None]
+    ) -> None:
+        """
+        Register a callback run after documents are written through this store.
+        
+        The callback receives the IDs of the added, updated or deleted
+        documents and chunks, and the embeddings of the written ones.
+        
+        Args:
+            callback: Function of (document IDs, embeddings)
+        """
+        self._write_listeners.append(callback)
+    
+    def document_version(self, document_id: str) -> Optional[Any]:
+        """
+        Get the ``updated_at`` of an indexed document.
+        
+        Args:
+            document_id: Document ID
+            
+        Returns:
+            Last update time, or None if the document is not indexed
+        """
+        payload = self.index.payload(document_id)
+        return payload.get("updated_at") if payload else None
+    
+    async def aclose(self) -> None:
+        """Stop fetching text and close the Firestore and embedding connections."""
+        if _text_load_task is not None:
+            _text_load_task.cancel()
+        await self.embedding_service.aclose()
+        
+        # close() only releases the HTTP transport; the gRPC channel of the
+        # async client is created on first use and closes asynchronously
+        self.db.close()
+        transport = getattr(self.db, "_transport", None)
+        if transport is not None:
+            closed = transport.close()
+            if inspect.isawaitable(closed):
+                await closed
+    
     async def add_document(
         self,
         text: str,
@@ -42,6 +130,9 @@ class FirebaseVectorStore:
         """
         Add a document with its embedding to the store.
         
+        Texts longer than the configured chunk size are stored as a parent
+        record plus embedded chunks referencing it.
+        
         Args:
             text: Text content to store
             metadata: Optional metadata to associate with the document
@@ -51,25 +142,9 @@ class FirebaseVectorStore:
             Document ID
         """
         try:
-            # Generate embedding
-            embedding = await self.embedding_service.embed_text(text)
-            
-            # Prepare document data
-            doc_data = {
-                "text": text,
-                "embedding": embedding,
-                "metadata": metadata or {},
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-            
-            # Add to Firestore
-            if document_id:
-                doc_ref = self.db.collection(self.collection_name).document(document_id)
-                doc_ref.set(doc_data)
-            else:
-                doc_ref = self.db.collection(self.collection_name).add(doc_data)[1]
-                document_id = doc_ref.id
+            (document_id,) = await self.add_documents([
+                {"text": text, "metadata": metadata, "document_id": document_id}
+            ])
             
             logger.info(
                 "document_added",
@@ -84,19 +159,181 @@ class FirebaseVectorStore:
             logger.error("document_add_failed", error=str(e))
             raise
     
+    async def add_documents(
+        self,
+        documents: List[Dict[str, Any]]
+    ) -> List[str]:
+        """
+        Add several documents using one embedding request and batched writes.
+        
+        Long texts are split into token windows first; all chunks of all
+        documents are embedded in the same request.
+        
+        Args:
+            documents: Dicts with "text" and optional "metadata" and "document_id"
+            
+        Returns:
+            Document IDs in input order
+        """
+        try:
+            collection = self.db.collection(self.collection_name)
+            now = datetime.utcnow()
+            
+            document_ids = []
+            records = []
+            for document in documents:
+                document_id = document.get("document_id") or collection.document().id
+                document_ids.append(document_id)
+                records.extend(_document_records(
+                    document_id,
+                    document["text"],
+                    document.get("metadata") or {},
+                    now
+                ))
+            
+            await self._embed_records(records)
+            
+            # Re-adding a document must not leave chunks of its old text behind
+            stale = await self._stale_chunk_ids(
+                [document["document_id"] for document in documents if document.get("document_id")],
+                records
+            )
+            
+            await self._write(
+                [("set", document_id, doc_data) for document_id, doc_data in records]
+                + [("delete", document_id, None) for document_id in stale]
+            )
+            self._apply_writes(records, stale)
+            
+            logger.info(
+                "documents_added",
+                count=len(document_ids),
+                records=len(records)
+            )
+            
+            return document_ids
+            
+        except Exception as e:
+            logger.error("documents_add_failed", error=str(e), count=len(documents))
+            raise
+    
+    async def _embed_records(self, records: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Embed every record except chunked parents, in one request."""
+        embedded = [doc_data for _, doc_data in records if "chunk_count" not in doc_data]
+        embeddings = await self.embedding_service.embed_documents(
+            [doc_data["text"] for doc_data in embedded]
+        )
+        for doc_data, embedding in zip(embedded, embeddings):
+            doc_data.update(_embedding_fields(embedding))
+    
+    async def _stale_chunk_ids(
+        self,
+        document_ids: List[str],
+        records: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[str]:
+        """Find chunks of the previous version of documents being rewritten."""
+        if not document_ids:
+            return []
+        
+        new_counts = {
+            document_id: doc_data.get("chunk_count", 0)
+            for document_id, doc_data in records
+            if "parent_id" not in doc_data
+        }
+        
+        collection = self.db.collection(self.collection_name)
+        stale = []
+        async for doc in self.db.get_all(
+            [collection.document(document_id) for document_id in document_ids],
+            field_paths=["chunk_count"]
+        ):
+            if doc.exists:
+                old_count = (doc.to_dict() or {}).get("chunk_count") or 0
+                stale.extend(
+                    chunk_id(doc.id, index)
+                    for index in range(new_counts.get(doc.id, 0), old_count)
+                )
+        return stale
+    
+    async def _write(self, operations: List[Tuple[str, str, Optional[Dict[str, Any]]]]) -> None:
+        """
+        Apply set, update and delete operations with batched writes.
+        
+        Operations are split into batches of at most 500 writes, the
+        Firestore limit, so they are atomic per batch only.
+        """
+        collection = self.db.collection(self.collection_name)
+        for start in range(0, len(operations), MAX_BATCH_WRITES):
+            batch = self.db.batch()
+            for operation, document_id, doc_data in operations[start:start + MAX_BATCH_WRITES]:
+                doc_ref = collection.document(document_id)
+                if operation == "set":
+                    batch.set(doc_ref, doc_data)
+                elif operation == "update":
+                    batch.update(doc_ref, doc_data)
+                else:
+                    batch.delete(doc_ref)
+            await batch.commit()
+    
+    def _apply_writes(
+        self,
+        records: List[Tuple[str, Dict[str, Any]]],
+        removed: List[str]
+    ) -> None:
+        """Mirror written records in the index and notify write listeners."""
+        self._notify_writes(
+            [document_id for document_id, _ in records] + removed,
+            [doc_data["embedding"] for _, doc_data in records if "embedding" in doc_data]
+        )
+        if not self.index.loaded:
+            return
+        for document_id, doc_data in records:
+            # Chunked parents have no embedding of their own
+            if "chunk_count" in doc_data:
+                self.index.remove(document_id)
+            else:
+                self.index.upsert(document_id, doc_data)
+        for document_id in removed:
+            self.index.remove(document_id)
+    
+    def _notify_writes(self, document_ids: List[str], embeddings: List[List[float]]) -> None:
+        """Run the write listeners, never failing the write itself."""
+        for callback in self._write_listeners:
+            try:
+                callback(document_ids, embeddings)
+            except Exception as e:
+                logger.error("write_listener_failed", error=str(e))
+    
     async def search(
         self,
         query: str,
         top_k: Optional[int] = None,
-        threshold: Optional[float] = None
+        threshold: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
-        Search for similar documents using semantic similarity.
+        Search for similar documents.
+        
+        Modes:
+            vector: semantic similarity only
+            lexical: ranked by BM25 only
+            hybrid: BM25 first; a short query fully matched lexically is
+                ranked by BM25 alone, otherwise the BM25 and vector
+                rankings are combined with reciprocal rank fusion
+        
+        ``similarity`` is the cosine similarity to the query and results
+        below the threshold are dropped, except for results ranked by BM25
+        alone: lexical mode and the hybrid fast path answer without
+        embedding the query, so their ``similarity`` is the fraction of
+        query terms matched and no threshold applies.
         
         Args:
             query: Query text
             top_k: Number of results to return
             threshold: Minimum similarity threshold
+            filters: Metadata key to required value or list of values
+            mode: Search mode, the configured default if not provided
             
         Returns:
             List of matching documents with similarity scores
@@ -105,59 +342,62 @@ class FirebaseVectorStore:
             # Use settings defaults if not provided
             top_k = top_k or settings.max_search_results
             threshold = threshold or settings.similarity_threshold
+            mode = mode or settings.search_mode
             
-            # Generate query embedding
-            query_embedding = await self.embedding_service.embed_text(query)
+            await self.load_index()
             
-            # Fetch all documents (Firebase doesn't support vector similarity natively)
-            docs = self.db.collection(self.collection_name).stream()
-            
-            # Calculate similarities
-            results = []
-            for doc in docs:
-                doc_data = doc.to_dict()
+            lexical_results = []
+            if mode in LEXICAL_MODES:
+                self._start_text_load()
+                candidates = max(top_k, settings.hybrid_candidates)
+                lexical_results = self.index.lexical_search(query, candidates, filters=filters)
                 
-                # Try different embedding field names
-                embedding_field = None
-                if "embedding" in doc_data:
-                    embedding_field = "embedding"
-                elif "embeddings" in doc_data:
-                    embedding_field = "embeddings"
-                elif "vector" in doc_data:
-                    embedding_field = "vector"
-                
-                if embedding_field and doc_data[embedding_field]:
-                    similarity = self.embedding_service.calculate_similarity(
-                        query_embedding,
-                        doc_data[embedding_field]
+                # Answered by BM25 alone, without an embedding request
+                if mode == "lexical" or _lexically_answered(query, lexical_results):
+                    results = lexical_results[:top_k]
+                    logger.info(
+                        "search_completed",
+                        mode=mode,
+                        path="lexical",
+                        query_length=len(query),
+                        filtered=bool(filters),
+                        results_count=len(results)
                     )
-                    
-                    if similarity >= threshold:
-                        # Try different text field names
-                        text_content = (
-                            doc_data.get("text") or 
-                            doc_data.get("content") or 
-                            doc_data.get("chunk") or 
-                            doc_data.get("document") or
-                            str(doc_data.get("data", ""))
-                        )
-                        
-                        results.append({
-                            "id": doc.id,
-                            "text": text_content,
-                            "metadata": doc_data.get("metadata", {}),
-                            "similarity": similarity,
-                            "created_at": doc_data.get("created_at"),
-                            "updated_at": doc_data.get("updated_at")
-                        })
-            
-            # Sort by similarity and return top k
-            results.sort(key=lambda x: x["similarity"], reverse=True)
-            results = results[:top_k]
+                    return results
+            
+            # Generate query embedding
+            query_embedding = await self.embedding_service.embed_text(query)
+            
+            # Score against the resident index, no Firestore reads needed
+            if lexical_results:
+                similarities = self.index.similarities(
+                    query_embedding, [result["id"] for result in lexical_results]
+                )
+                for result in lexical_results:
+                    result["similarity"] = similarities.get(result["id"], 0.0)
+                vector_results = self.index.search(
+                    query_embedding,
+                    max(top_k, settings.hybrid_candidates),
+                    threshold,
+                    filters=filters
+                )
+                results = self.index.fuse(
+                    vector_results,
+                    lexical_results,
+                    top_k,
+                    threshold,
+                    rrf_k=settings.rrf_k
+                )
+            else:
+                results = self.index.search(query_embedding, top_k, threshold, filters=filters)
+            await self.hydrate_results([results])
             
             logger.info(
                 "search_completed",
+                mode=mode,
+                path="hybrid" if lexical_results else "vector",
                 query_length=len(query),
+                filtered=bool(filters),
                 results_count=len(results),
                 top_similarity=results[0]["similarity"] if results else 0
             )
@@ -178,6 +418,261 @@ class FirebaseVectorStore:
             logger.error("search_failed", error=str(e), query=query[:100])
             raise
     
+    async def search_batch(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        threshold: Optional[float] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries at once.
+        
+        All queries are embedded in one embedding request and scored
+        together against the index.
+        
+        Args:
+            queries: Query texts
+            top_k: Number of results to return per query
+            threshold: Minimum similarity threshold
+            filters: Metadata filters applied to every query
+            
+        Returns:
+            One list of matching documents per query
+        """
+        try:
+            top_k = top_k or settings.max_search_results
+            threshold = threshold or settings.similarity_threshold
+            
+            await self.load_index()
+            
+            query_embeddings = await self.embedding_service.embed_texts(queries)
+            results = self.index.search_many(
+                query_embeddings,
+                top_k,
+                threshold,
+                filters=filters
+            )
+            await self.hydrate_results(results)
+            
+            logger.info(
+                "batch_search_completed",
+                query_count=len(queries),
+                results_count=sum(len(result) for result in results)
+            )
+            
+            return results
+            
+        except Exception as e:
+            logger.error("batch_search_failed", error=str(e), query_count=len(queries))
+            raise
+    
+    async def hydrate_results(self, results: List[List[Dict[str, Any]]]) -> None:
+        """
+        Fill in text and metadata of search results loaded without them.
+        
+        The payloads of all winners not yet cached in the index are read
+        with one batched get_all, projected to the payload fields, and
+        cached in the index for later searches.
+        
+        Args:
+            results: Lists of search results, updated in place
+        """
+        missing = self.index.unhydrated(
+            result["id"] for query_results in results for result in query_results
+        )
+        if not missing:
+            return
+        
+        collection = self.db.collection(self.collection_name)
+        payloads = {}
+        async for doc in self.db.get_all(
+            [collection.document(document_id) for document_id in missing],
+            field_paths=list(PAYLOAD_FIELDS)
+        ):
+            if doc.exists:
+                payload = self.index.hydrate(doc.id, doc.to_dict())
+                if payload is not None:
+                    payloads[doc.id] = payload
+        
+        for query_results in results:
+            for result in query_results:
+                payload = payloads.get(result["id"])
+                if payload is not None:
+                    result["text"] = payload["text"]
+                    result["metadata"] = payload["metadata"]
+        
+        logger.debug(
+            "search_results_hydrated",
+            requested=len(missing),
+            hydrated=len(payloads)
+        )
+    
+    async def load_index(self, force: bool = False) -> int:
+        """
+        Load the collection into the shared in-memory embedding index.
+        
+        The collection is loaded once per process; later calls return
+        immediately unless a reload is forced. When a snapshot directory is
+        configured, the index is restored from the memory-mapped snapshot and
+        only documents changed since its watermark are read from Firestore.
+        
+        The full load reads only the embedding, metadata and timestamp fields;
+        text is fetched later for the documents that win a search. BM25 needs
+        the text of every document, so when the default search mode is
+        lexical or hybrid it is fetched in the background after the load,
+        otherwise on the first lexical or hybrid search. Until then lexical
+        search covers the documents fetched so far.
+        
+        Args:
+            force: Reload even if the index is already populated
+            
+        Returns:
+            Number of indexed documents
+        """
+        if self.index.loaded and not force:
+            return len(self.index)
+        
+        async with _index_load_lock:
+            if self.index.loaded and not force:
+                return len(self.index)
+            
+            try:
+                snapshot_dir = settings.index_snapshot_dir
+                if snapshot_dir and not force:
+                    watermark = await asyncio.to_thread(
+                        load_snapshot,
+                        self.index,
+                        snapshot_dir,
+                        self.collection_name
+                    )
+                    if watermark is not None:
+                        await self.catch_up_index(watermark)
+                        self._index_loaded()
+                        return len(self.index)
+                
+                query = self.db.collection(self.collection_name) \
+                    .select(list(INDEX_FIELDS))
+                docs = [(doc.id, doc.to_dict()) async for doc in query.stream()]
+                # Normalizing every row is CPU work, keep it off the event loop
+                count = await asyncio.to_thread(self.index.load, docs, False)
+                
+                if snapshot_dir:
+                    await self.save_index_snapshot()
+                self._index_loaded()
+                
+                return count
+                
+            except Exception as e:
+                logger.error("index_load_failed", error=str(e))
+                raise
+    
+    def _index_loaded(self) -> None:
+        """Reset the text load for a new index load, starting it if BM25 is the default."""
+        global _texts_loaded
+        if _text_load_task is not None:
+            _text_load_task.cancel()
+        _texts_loaded = False
+        if settings.search_mode in LEXICAL_MODES:
+            self._start_text_load()
+    
+    def _start_text_load(self) -> None:
+        """Start fetching the text of unhydrated documents for the lexical index."""
+        global _text_load_task
+        if self.index.lexical_index is None or _texts_loaded:
+            return
+        if _text_load_task is not None and not _text_load_task.done():
+            return
+        _text_load_task = asyncio.create_task(self._load_texts())
+    
+    async def _load_texts(self) -> None:
+        """
+        Hydrate every indexed document that has no text yet.
+        
+        Documents are read in batches projected to the payload fields, and
+        the snapshot is saved afterwards so the next restore has the text.
+        """
+        global _texts_loaded
+        try:
+            missing = self.index.unhydrated(self.index.document_ids())
+            if not missing:
+                _texts_loaded = True
+                return
+            
+            collection = self.db.collection(self.collection_name)
+            hydrated = 0
+            for start in range(0, len(missing), TEXT_LOAD_BATCH):
+                batch = missing[start:start + TEXT_LOAD_BATCH]
+                async for doc in self.db.get_all(
+                    [collection.document(document_id) for document_id in batch],
+                    field_paths=list(PAYLOAD_FIELDS)
+                ):
+                    if doc.exists and self.index.hydrate(doc.id, doc.to_dict()) is not None:
+                        hydrated += 1
+            
+            logger.info("index_texts_loaded", requested=len(missing), hydrated=hydrated)
+            _texts_loaded = True
+            await self.save_index_snapshot()
+            
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("index_text_load_failed", error=str(e))
+    
+    async def catch_up_index(self, watermark: datetime) -> int:
+        """
+        Apply changes made after a snapshot was written.
+        
+        Reads only documents updated after the watermark, plus the bare
+        document IDs of the collection to detect deletions.
+        
+        Args:
+            watermark: Newest update time contained in the snapshot
+            
+        Returns:
+            Number of documents updated or removed
+        """
+        collection = self.db.collection(self.collection_name)
+        
+        changed = 0
+        query = collection.where(filter=FieldFilter("updated_at", ">", watermark))
+        async for doc in query.stream():
+            doc_data = doc.to_dict()
+            # Chunked parents are searched through their chunks
+            if "chunk_count" in doc_data:
+                self.index.remove(doc.id)
+            else:
+                self.index.upsert(doc.id, doc_data)
+            changed += 1
+        
+        existing_ids = {doc_ref.id async for doc_ref in collection.list_documents()}
+        for document_id in self.index.document_ids():
+            if document_id not in existing_ids:
+                self.index.remove(document_id)
+                changed += 1
+        
+        logger.info(
+            "index_caught_up",
+            watermark=watermark.isoformat(),
+            changed=changed
+        )
+        return changed
+    
+    async def save_index_snapshot(self) -> None:
+        """Write the shared index to the configured snapshot directory."""
+        if not settings.index_snapshot_dir or not self.index.loaded:
+            return
+        
+        try:
+            await asyncio.to_thread(
+                save_snapshot,
+                self.index,
+                settings.index_snapshot_dir,
+                self.collection_name
+            )
+        except Exception as e:
+            logger.error("index_snapshot_save_failed", error=str(e))
+    
     async def update_document(
         self,
         document_id: str,
@@ -187,29 +682,70 @@ class FirebaseVectorStore:
         """
         Update an existing document.
         
+        New text is re-chunked and re-embedded; new metadata is copied to
+        the document's chunks so filters keep matching them.
+        
         Args:
             document_id: Document ID to update
             text: New text content (will regenerate embedding)
             metadata: New or updated metadata
             
         Returns:
-            True if successful
+            True if successful, False if the document does not exist
         """
         try:
-            doc_ref = self.db.collection(self.collection_name).document(document_id)
+            doc = await self.db.collection(self.collection_name).document(document_id).get(
+                field_paths=["metadata", "chunk_count", "created_at"]
+            )
+            if not doc.exists:
+                return False
             
-            update_data = {"updated_at": datetime.utcnow()}
+            current = doc.to_dict() or {}
+            old_count = current.get("chunk_count") or 0
+            now = datetime.utcnow()
             
             if text is not None:
-                # Regenerate embedding for new text
-                embedding = await self.embedding_service.embed_text(text)
-                update_data["text"] = text
-                update_data["embedding"] = embedding
-            
-            if metadata is not None:
-                update_data["metadata"] = metadata
+                records = _document_records(
+                    document_id,
+                    text,
+                    metadata if metadata is not None else current.get("metadata") or {},
+                    current.get("created_at") or now
+                )
+                for _, doc_data in records:
+                    doc_data["updated_at"] = now
+                await self._embed_records(records)
+                
+                new_count = records[0][1].get("chunk_count", 0)
+                stale = [chunk_id(document_id, index) for index in range(new_count, old_count)]
+                
+                # Merge into the parent so fields written by other tools survive
+                parent = dict(records[0][1])
+                if new_count:
+                    parent.update({"embedding": DELETE_FIELD, "embedding_norm": DELETE_FIELD})
+                else:
+                    parent["chunk_count"] = DELETE_FIELD
+                
+                operations = [("update", document_id, parent)]
+                operations += [("set", chunk, doc_data) for chunk, doc_data in records[1:]]
+                operations += [("delete", chunk, None) for chunk in stale]
+                await self._write(operations)
+                self._apply_writes(records, stale)
             
-            doc_ref.update(update_data)
+            else:
+                update_data = {"updated_at": now}
+                if metadata is not None:
+                    update_data["metadata"] = metadata
+                
+                document_ids = [document_id] + [
+                    chunk_id(document_id, index) for index in range(old_count)
+                ]
+                await self._write([
+                    ("update", target, dict(update_data)) for target in document_ids
+                ])
+                self._notify_writes(document_ids, [])
+                if self.index.loaded:
+                    for target in document_ids:
+                        self.index.upsert(target, update_data)
             
             logger.info(
                 "document_updated",
@@ -230,7 +766,7 @@ class FirebaseVectorStore:
     
     async def delete_document(self, document_id: str) -> bool:
         """
-        Delete a document from the store.
+        Delete a document, and its chunks, from the store.
         
         Args:
             document_id: Document ID to delete
@@ -239,8 +775,20 @@ class FirebaseVectorStore:
             True if successful
         """
         try:
-            self.db.collection(self.collection_name).document(document_id).delete()
-            logger.info("document_deleted", document_id=document_id)
+            doc = await self.db.collection(self.collection_name).document(document_id).get(
+                field_paths=["chunk_count"]
+            )
+            chunk_count = (doc.to_dict() or {}).get("chunk_count") or 0 if doc.exists else 0
+            
+            document_ids = [document_id] + [
+                chunk_id(document_id, index) for index in range(chunk_count)
+            ]
+            await self._write([("delete", target, None) for target in document_ids])
+            self._notify_writes(document_ids, [])
+            for target in document_ids:
+                self.index.remove(target)
+            
+            logger.info("document_deleted", document_id=document_id, chunks=chunk_count)
             return True
             
         except Exception as e:
@@ -262,12 +810,13 @@ class FirebaseVectorStore:
             Document data or None if not found
         """
         try:
-            doc = self.db.collection(self.collection_name).document(document_id).get()
+            doc = await self.db.collection(self.collection_name).document(document_id).get()
             
             if doc.exists:
                 doc_data = doc.to_dict()
                 # Remove embedding from response (too large)
                 doc_data.pop("embedding", None)
+                doc_data.pop("embedding_norm", None)
                 doc_data["id"] = doc.id
                 return doc_data
             
@@ -281,49 +830,196 @@ class FirebaseVectorStore:
             )
             raise
     
+    async def count_documents(self) -> int:
+        """
+        Count the documents in the collection, not counting chunks.
+        
+        Uses server-side aggregations, which read index entries instead of
+        downloading the documents: all records minus those with a parent.
+        
+        Returns:
+            Number of documents
+        """
+        collection = self.db.collection(self.collection_name)
+        records, chunks = await asyncio.gather(
+            collection.count().get(),
+            collection.where(filter=FieldFilter("parent_id", "!=", None)).count().get()
+        )
+        return int(records[0][0].value) - int(chunks[0][0].value)
+    
     async def list_documents(
         self,
         limit: int = 100,
+        cursor: Optional[str] = None,
         offset: int = 0
-    ) -> Tuple[List[Dict[str, Any]], int]:
+    ) -> Tuple[List[Dict[str, Any]], int, Optional[str]]:
         """
-        List documents with pagination.
+        List documents, newest first, with cursor pagination.
+        
+        Each page starts after the last document of the previous page, so
+        every page costs the same number of reads regardless of its depth.
+        Chunks are stored next to their parent but not listed; reads
+        continue past them until the page is full.
+        
+        An offset is still honored for older clients, but the skipped
+        documents are read and billed, so deep pages get slower; use the
+        cursor instead.
         
         Args:
             limit: Maximum number of documents to return
-            offset: Number of documents to skip
+            cursor: Opaque cursor from a previous page, None for the first page
+            offset: Deprecated, number of documents to skip after the cursor
             
         Returns:
-            Tuple of (documents, total_count)
+            Tuple of (documents, total_count, next_cursor), where next_cursor
+            is None on the last page
+            
+        Raises:
+            ValueError: If the cursor is malformed
         """
         try:
-            # Get total count
-            total_count = len(list(self.db.collection(self.collection_name).stream()))
-            
-            # Get paginated results
-            query = self.db.collection(self.collection_name) \
+            ordered = self.db.collection(self.collection_name) \
                 .order_by("created_at", direction=firestore.Query.DESCENDING) \
-                .limit(limit) \
-                .offset(offset)
+                .order_by("__name__", direction=firestore.Query.DESCENDING)
+            start_after = _decode_cursor(cursor) if cursor else None
             
             docs = []
-            for doc in query.stream():
-                doc_data = doc.to_dict()
-                # Remove embedding from response
-                doc_data.pop("embedding", None)
-                doc_data["id"] = doc.id
-                docs.append(doc_data)
+            last_doc = None
+            skip = offset
+            exhausted = False
+            while len(docs) < limit and not exhausted:
+                requested = limit - len(docs) + skip
+                query = ordered.limit(requested)
+                if start_after is not None:
+                    query = query.start_after(start_after)
+                
+                fetched = 0
+                async for doc in query.stream():
+                    fetched += 1
+                    start_after = doc
+                    doc_data = doc.to_dict()
+                    if doc_data.get("parent_id"):
+                        continue
+                    if skip:
+                        skip -= 1
+                        continue
+                    # Remove embedding from response
+                    doc_data.pop("embedding", None)
+                    doc_data.pop("embedding_norm", None)
+                    doc_data["id"] = doc.id
+                    docs.append(doc_data)
+                    last_doc = doc
+                exhausted = fetched < requested
+            
+            total_count = await self.count_documents()
+            
+            next_cursor = None
+            if last_doc is not None and len(docs) == limit:
+                next_cursor = _encode_cursor(last_doc.get("created_at"), last_doc.id)
             
             logger.info(
                 "documents_listed",
                 count=len(docs),
                 total_count=total_count,
                 limit=limit,
-                offset=offset
+                has_cursor=bool(cursor),
+                offset=offset,
+                has_more=next_cursor is not None
             )
             
-            return docs, total_count
+            return docs, total_count, next_cursor
             
         except Exception as e:
             logger.error("document_list_failed", error=str(e))
-            raise
\ No newline at end of file
+            raise
+
+
+def _lexically_answered(query: str, lexical_results: List[Dict[str, Any]]) -> bool:
+    """
+    Whether BM25 alone ranks a query well enough to skip vector search.
+    
+    True for short keyword queries, such as a name or a technology, whose
+    every term is found in the top lexical result.
+    """
+    if not lexical_results:
+        return False
+    terms = set(tokenize(query))
+    return (
+        len(terms) <= settings.lexical_fast_path_max_terms
+        and lexical_results[0]["coverage"] >= settings.lexical_fast_path_coverage
+    )
+
+
+def chunk_id(parent_id: str, index: int) -> str:
+    """Return the document ID of a chunk of a parent document."""
+    return f"{parent_id}__chunk{index:04d}"
+
+
+def _document_records(
+    document_id: str,
+    text: str,
+    metadata: Dict[str, Any],
+    now: datetime
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Plan the Firestore records of a document, before embedding.
+    
+    A text that fits in one chunk is a single record. A longer text becomes
+    a parent record holding the full text and chunk count, followed by one
+    record per chunk with the parent ID and character offsets.
+    
+    Returns:
+        List of (document ID, document data), the parent first
+    """
+    base = {"metadata": metadata, "created_at": now, "updated_at": now}
+    
+    chunks = []
+    if settings.chunk_size_tokens > 0:
+        chunks = chunk_text(text, settings.chunk_size_tokens, settings.chunk_overlap_tokens)
+    if len(chunks) <= 1:
+        return [(document_id, {"text": text, **base})]
+    
+    records = [(document_id, {"text": text, "chunk_count": len(chunks), **base})]
+    for chunk in chunks:
+        records.append((
+            chunk_id(document_id, chunk.index),
+            {
+                "text": chunk.text,
+                "parent_id": document_id,
+                "chunk_index": chunk.index,
+                "start_offset": chunk.start,
+                "end_offset": chunk.end,
+                **base
+            }
+        ))
+    return records
+
+
+def _embedding_fields(embedding: List[float]) -> Dict[str, Any]:
+    """
+    Build the stored embedding fields of a document.
+    
+    The embedding is stored normalized to unit length, with its original
+    norm alongside, so readers can score it with a plain dot product.
+    """
+    vector, norm = EmbeddingService.normalize(embedding)
+    return {"embedding": vector.tolist(), "embedding_norm": float(norm)}
+
+
+def _encode_cursor(created_at: datetime, document_id: str) -> str:
+    """Encode the sort key of a document as an opaque page cursor."""
+    payload = json.dumps({"created_at": created_at.isoformat(), "id": document_id})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a page cursor into start_after values for the list query."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return {
+            "created_at": datetime.fromisoformat(payload["created_at"]),
+            "__name__": str(payload["id"])
+        }
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,243 @@
+"""Versioned on-disk snapshots of the embedding index."""
+
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import structlog
+
+from src.services.embedding_index import EmbeddingIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = structlog.get_logger()
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".lock"
+
+
+@contextmanager
+def _snapshot_lock(snapshot_dir: Path, exclusive: bool) -> Iterator[None]:
+    """
+    Hold the inter-process lock of a snapshot directory.
+
+    Writers hold it exclusively for the whole save, readers hold it shared
+    while they map the matrix named by the manifest, so no worker deletes a
+    matrix another one is about to open. Without fcntl, i.e. on Windows
+    development setups running a single worker, the lock is a no-op.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(snapshot_dir / LOCK_FILE, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _as_utc(value: Any) -> Optional[datetime]:
+    """Interpret a stored timestamp as an aware UTC datetime."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _file_checksum(path: Path) -> str:
+    """Compute the sha256 checksum of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def _serialize_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert payload timestamps to ISO strings for the manifest."""
+    data = dict(payload)
+    for field in ("created_at", "updated_at"):
+        timestamp = _as_utc(data.get(field))
+        data[field] = timestamp.isoformat() if timestamp else None
+    return data
+
+
+def _deserialize_payload(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore payload timestamps from the manifest."""
+    payload = dict(data)
+    for field in ("created_at", "updated_at"):
+        payload[field] = _as_utc(payload.get(field))
+    return payload
+
+
+def save_snapshot(index: EmbeddingIndex, directory: str, collection_name: str) -> Path:
+    """
+    Write the index to disk.
+
+    The snapshot is a raw float32 ``.npy`` matrix plus a JSON manifest
+    mapping each document ID to its row. The manifest records a checksum of
+    the matrix file and a watermark, the newest ``updated_at`` in the
+    snapshot, so a reader can catch up with only later changes. Files are
+    written under a new version and swapped in atomically. Workers sharing
+    the directory save one at a time under a file lock, so snapshots land
+    in the order they were exported and old matrices are only removed by
+    the writer that replaced them.
+
+    Args:
+        index: Index to persist
+        directory: Root snapshot directory
+        collection_name: Firestore collection name
+
+    Returns:
+        Path to the written manifest
+    """
+    snapshot_dir = Path(directory) / collection_name
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    with _snapshot_lock(snapshot_dir, exclusive=True):
+        matrix, ids, payloads = index.export()
+        version = time.time_ns()
+        matrix_file = f"embeddings-{version}.npy"
+
+        matrix_path = snapshot_dir / matrix_file
+        with open(matrix_path, "wb") as f:
+            np.save(f, matrix.astype(np.float32, copy=False))
+            f.flush()
+            os.fsync(f.fileno())
+
+        timestamps = [_as_utc(payload.get("updated_at")) for payload in payloads]
+        timestamps = [timestamp for timestamp in timestamps if timestamp]
+        watermark = max(timestamps) if timestamps else None
+
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "version": version,
+            "collection": collection_name,
+            "dimension": index.dimension,
+            "count": len(ids),
+            "dtype": "float32",
+            "matrix_file": matrix_file,
+            "checksum": _file_checksum(matrix_path),
+            "watermark": watermark.isoformat() if watermark else None,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "documents": [
+                {"id": document_id, "row": row, **_serialize_payload(payload)}
+                for row, (document_id, payload) in enumerate(zip(ids, payloads))
+            ]
+        }
+
+        manifest_path = snapshot_dir / MANIFEST_FILE
+        tmp_path = snapshot_dir / f"{MANIFEST_FILE}.{version}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, manifest_path)
+
+        # Readers that already mapped an older matrix keep their open handle
+        for old_file in snapshot_dir.glob("embeddings-*.npy"):
+            if old_file.name != matrix_file:
+                old_file.unlink(missing_ok=True)
+
+    logger.info(
+        "index_snapshot_saved",
+        path=str(manifest_path),
+        documents=len(ids),
+        version=version
+    )
+    return manifest_path
+
+
+def load_snapshot(
+    index: EmbeddingIndex,
+    directory: str,
+    collection_name: str,
+    verify_checksum: bool = True
+) -> Optional[datetime]:
+    """
+    Restore the index from a snapshot, memory-mapping the matrix.
+
+    The matrix is mapped read-only, so every worker reading the same
+    snapshot shares its pages through the OS page cache. Rows written
+    afterwards go to a separate buffer owned by the worker.
+
+    Args:
+        index: Index to restore into
+        directory: Root snapshot directory
+        collection_name: Firestore collection name
+        verify_checksum: Verify the matrix checksum before using it
+
+    Returns:
+        Snapshot watermark, or None if no usable snapshot was found
+    """
+    snapshot_dir = Path(directory) / collection_name
+    manifest_path = snapshot_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+
+    try:
+        # The mapping keeps the matrix alive once the lock is released
+        with _snapshot_lock(snapshot_dir, exclusive=False):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+
+            if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+                logger.warning(
+                    "index_snapshot_unsupported",
+                    format_version=manifest.get("format_version")
+                )
+                return None
+
+            if manifest["dimension"] != index.dimension:
+                logger.warning(
+                    "index_snapshot_dimension_mismatch",
+                    expected=index.dimension,
+                    actual=manifest["dimension"]
+                )
+                return None
+
+            matrix_path = snapshot_dir / manifest["matrix_file"]
+            if verify_checksum and _file_checksum(matrix_path) != manifest["checksum"]:
+                logger.warning("index_snapshot_checksum_mismatch", path=str(matrix_path))
+                return None
+
+            matrix = np.load(matrix_path, mmap_mode="r")
+
+        documents: List[Dict[str, Any]] = sorted(
+            manifest["documents"],
+            key=lambda document: document["row"]
+        )
+        ids = [document.pop("id") for document in documents]
+        payloads = []
+        for document in documents:
+            document.pop("row")
+            payloads.append(_deserialize_payload(document))
+
+        index.restore(matrix, ids, payloads)
+
+        logger.info(
+            "index_snapshot_loaded",
+            path=str(manifest_path),
+            documents=len(ids),
+            version=manifest["version"]
+        )
+        return _as_utc(manifest.get("watermark"))
+
+    except Exception as e:
+        logger.error("index_snapshot_load_failed", error=str(e))
+        return None
@@ -0,0 +1,168 @@
+"""Live synchronization of the embedding index from Firestore snapshots."""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from src.services.embedding_index import EmbeddingIndex
+
+logger = structlog.get_logger()
+
+
+class IndexSynchronizer:
+    """
+    Keeps an EmbeddingIndex in sync with a Firestore collection.
+
+    Subscribes to collection snapshots with ``on_snapshot`` and applies
+    added, modified and removed documents to the index as they arrive.
+    The index is loaded first, by ``FirebaseVectorStore.load_index``, and
+    the first snapshot, which contains the whole collection, is only
+    reconciled against it: documents deleted in the meantime are dropped
+    and unchanged documents are not rewritten. Attaching still downloads
+    every document with its embedding and text, once per process.
+
+    Snapshots arrive on the Firestore listener thread. The index lock is
+    taken per document, so requests on the event loop wait for at most
+    one document rather than a whole snapshot.
+
+    The collection only needs to provide ``on_snapshot(callback)``
+    returning a watch with ``unsubscribe()``, so the synchronizer works
+    against the Firestore emulator or an in-memory fake.
+    """
+
+    def __init__(self, collection: Any, index: EmbeddingIndex):
+        """
+        Initialize the synchronizer.
+
+        Args:
+            collection: Firestore collection (or query) reference to watch
+            index: Index to keep up to date
+        """
+        self.collection = collection
+        self.index = index
+        self._watch = None
+        self._lock = threading.Lock()
+        self._initial_sync_done = threading.Event()
+        self._snapshots = 0
+        self._changes_applied = 0
+        self._lag_seconds: Optional[float] = None
+        self._last_sync_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the snapshot listener is active."""
+        return self._watch is not None
+
+    @property
+    def lag_seconds(self) -> Optional[float]:
+        """Delay between the latest applied write and its arrival in the index."""
+        return self._lag_seconds
+
+    def start(self) -> None:
+        """
+        Subscribe to collection snapshots.
+
+        Raises:
+            RuntimeError: If the index has not been loaded yet
+        """
+        if self._watch is not None:
+            return
+        if not self.index.loaded:
+            raise RuntimeError("Load the index before starting synchronization")
+
+        self._watch = self.collection.on_snapshot(self._on_snapshot)
+        logger.info("index_sync_started")
+
+    def stop(self) -> None:
+        """Unsubscribe from collection snapshots."""
+        if self._watch is None:
+            return
+
+        self._watch.unsubscribe()
+        self._watch = None
+        logger.info("index_sync_stopped", snapshots=self._snapshots)
+
+    def wait_until_synced(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the initial snapshot has been applied.
+
+        Args:
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            True if the index is in sync
+        """
+        return self._initial_sync_done.wait(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return synchronization metrics."""
+        return {
+            "running": self.running,
+            "synced": self._initial_sync_done.is_set(),
+            "snapshots": self._snapshots,
+            "changes_applied": self._changes_applied,
+            "lag_seconds": self._lag_seconds,
+            "seconds_since_last_sync": (
+                time.monotonic() - self._last_sync_at
+                if self._last_sync_at is not None else None
+            )
+        }
+
+    def _on_snapshot(self, col_snapshot: List[Any], changes: List[Any], read_time: Any) -> None:
+        """Apply a snapshot delivered by the Firestore listener thread."""
+        try:
+            with self._lock:
+                if not self._initial_sync_done.is_set():
+                    applied = self.index.reconcile(
+                        (doc.id, doc.to_dict()) for doc in col_snapshot
+                    )
+                    # Initial documents can be arbitrarily old
+                    changes = []
+                else:
+                    applied = self._apply_changes(changes)
+
+                self._snapshots += 1
+                self._changes_applied += applied
+                self._last_sync_at = time.monotonic()
+                self._lag_seconds = self._measure_lag(changes, read_time)
+                self._initial_sync_done.set()
+
+            logger.debug(
+                "index_sync_applied",
+                changes=applied,
+                lag_seconds=self._lag_seconds
+            )
+
+        except Exception as e:
+            logger.error("index_sync_failed", error=str(e))
+
+    def _apply_changes(self, changes: List[Any]) -> int:
+        """Apply document changes to the index."""
+        for change in changes:
+            doc = change.document
+            doc_data = doc.to_dict() or {}
+            # Chunked parents are searched through their chunks
+            if change.type.name == "REMOVED" or "chunk_count" in doc_data:
+                self.index.remove(doc.id)
+            else:
+                self.index.upsert(doc.id, doc_data)
+        return len(changes)
+
+    @staticmethod
+    def _measure_lag(changes: List[Any], read_time: Any) -> Optional[float]:
+        """Seconds between the oldest write in the snapshot and now."""
+        timestamps = [
+            change.document.update_time
+            for change in changes
+            if change.type.name != "REMOVED"
+            and getattr(change.document, "update_time", None) is not None
+        ]
+        oldest = min(timestamps) if timestamps else read_time
+        if oldest is None:
+            return None
+
+        lag = datetime.now(timezone.utc) - oldest
+        return max(0.0, lag.total_seconds())
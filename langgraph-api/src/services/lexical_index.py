@@ -0,0 +1,159 @@
+"""In-process BM25 index over document text."""
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase word tokens.
+
+    Unicode-aware, so Swedish words such as "ålder" stay whole.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Tokens in order of appearance
+    """
+    return _TOKEN.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the text of embedding matrix rows.
+
+    Postings map each term to the rows containing it and their term
+    frequencies, so a query only touches the rows sharing a term with it.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._row_terms: Dict[int, List[str]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def build(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """
+        Replace the index contents.
+
+        Args:
+            rows: Iterable of (row, text) pairs
+        """
+        self._postings.clear()
+        self._row_terms.clear()
+        self._lengths.clear()
+        self._total_length = 0
+        for row, text in rows:
+            self.add(row, text)
+
+    def add(self, row: int, text: str) -> None:
+        """
+        Index the text of a row, replacing what it held before.
+
+        Args:
+            row: Row number in the embedding matrix
+            text: Document text
+        """
+        self.remove(row)
+        counts = Counter(tokenize(text))
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[row] = count
+        length = sum(counts.values())
+        self._row_terms[row] = list(counts)
+        self._lengths[row] = length
+        self._total_length += length
+
+    def remove(self, row: int) -> None:
+        """
+        Drop a row from the index.
+
+        Args:
+            row: Row number in the embedding matrix
+        """
+        length = self._lengths.pop(row, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._row_terms.pop(row):
+            postings = self._postings[term]
+            del postings[row]
+            if not postings:
+                del self._postings[term]
+
+    def idf(self, term: str) -> float:
+        """Return the BM25 inverse document frequency of a term."""
+        count = len(self._lengths)
+        frequency = len(self._postings.get(term, ()))
+        return math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float, float]]:
+        """
+        Rank rows by BM25 score.
+
+        Args:
+            query: Query text
+            k: Number of rows to return
+            mask: Optional boolean mask of rows allowed in the results
+
+        Returns:
+            List of (row, BM25 score, coverage) sorted by descending score.
+            Coverage is the idf-weighted fraction of query terms the row
+            contains, 1.0 when it contains all of them.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._lengths or k <= 0:
+            return []
+
+        average_length = self._total_length / len(self._lengths)
+        weights = {term: self.idf(term) for term in terms}
+        total_weight = sum(weights.values())
+
+        scores: Dict[int, float] = {}
+        matched: Dict[int, float] = {}
+        for term in terms:
+            idf = weights[term]
+            for row, frequency in self._postings.get(term, {}).items():
+                if mask is not None and (row >= len(mask) or not mask[row]):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[row] / average_length)
+                scores[row] = scores.get(row, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+                matched[row] = matched.get(row, 0.0) + idf
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [
+            (row, score, matched[row] / total_weight if total_weight else 0.0)
+            for row, score in ranked
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return document and term counts."""
+        return {
+            "documents": len(self._lengths),
+            "terms": len(self._postings),
+            "average_length": self._total_length / len(self._lengths) if self._lengths else 0.0
+        }
@@ -0,0 +1,164 @@
+"""Inverted index from document metadata to bitmaps of embedding rows."""
+
+import json
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# A term is a metadata key with one of its JSON-encoded values
+Term = Tuple[str, str]
+
+
+def metadata_terms(metadata: Dict[str, Any]) -> List[Term]:
+    """
+    Return the terms of a metadata dict.
+
+    List values such as tags produce one term per element, so a filter on
+    one tag matches every document carrying it.
+
+    Args:
+        metadata: Document metadata
+
+    Returns:
+        Distinct (key, encoded value) terms
+    """
+    terms = []
+    for key, value in (metadata or {}).items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        for item in values:
+            terms.append((key, _encode(item)))
+    return list(dict.fromkeys(terms))
+
+
+def _encode(value: Any) -> str:
+    """Encode a value so that equal JSON values give equal keys."""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class MetadataIndex:
+    """
+    Posting bitmaps of embedding rows per metadata (key, value) term.
+
+    Bitmaps are Python integers with bit ``row`` set for every row whose
+    document carries the term, so filters combine with plain ``&`` and
+    ``|`` before any similarity is computed.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._postings: Dict[Term, int] = {}
+        self._row_terms: Dict[int, List[Term]] = {}
+
+    def __len__(self) -> int:
+        return len(self._postings)
+
+    def build(self, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> None:
+        """
+        Replace the index contents in one pass.
+
+        Args:
+            rows: Iterable of (row, metadata) pairs
+        """
+        self._postings.clear()
+        self._row_terms.clear()
+
+        members: Dict[Term, List[int]] = {}
+        for row, metadata in rows:
+            terms = metadata_terms(metadata)
+            if terms:
+                self._row_terms[row] = terms
+            for term in terms:
+                members.setdefault(term, []).append(row)
+
+        for term, term_rows in members.items():
+            self._postings[term] = _bitmap(term_rows)
+
+    def add(self, row: int, metadata: Dict[str, Any]) -> None:
+        """
+        Index the metadata of a row, replacing what it held before.
+
+        Args:
+            row: Row number in the embedding matrix
+            metadata: Document metadata
+        """
+        self.remove(row)
+        terms = metadata_terms(metadata)
+        if not terms:
+            return
+
+        bit = 1 << row
+        self._row_terms[row] = terms
+        for term in terms:
+            self._postings[term] = self._postings.get(term, 0) | bit
+
+    def remove(self, row: int) -> None:
+        """
+        Drop a row from every posting.
+
+        Args:
+            row: Row number in the embedding matrix
+        """
+        mask = ~(1 << row)
+        for term in self._row_terms.pop(row, []):
+            bitmap = self._postings[term] & mask
+            if bitmap:
+                self._postings[term] = bitmap
+            else:
+                del self._postings[term]
+
+    def match(self, filters: Dict[str, Any]) -> int:
+        """
+        Find the rows matching metadata filters.
+
+        Keys are combined with AND. A list value matches documents with
+        any of the listed values, and a document whose metadata value is a
+        list matches if any element equals a filter value.
+
+        Args:
+            filters: Metadata key to required value or list of values
+
+        Returns:
+            Bitmap of matching rows
+        """
+        bitmap = -1
+        for key, value in filters.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            any_of = 0
+            for item in values:
+                any_of |= self._postings.get((key, _encode(item)), 0)
+            bitmap &= any_of
+            if not bitmap:
+                return 0
+        return bitmap
+
+    @staticmethod
+    def to_mask(bitmap: int, size: int) -> np.ndarray:
+        """
+        Expand a bitmap into a boolean mask over the first ``size`` rows.
+
+        Args:
+            bitmap: Bitmap from match()
+            size: Number of rows
+
+        Returns:
+            Boolean array of length size
+        """
+        if bitmap < 0:
+            return np.ones(size, dtype=bool)
+        data = bitmap.to_bytes((size + 7) // 8, "little")
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little")
+        return bits[:size].astype(bool)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return term count and bitmap memory."""
+        return {
+            "terms": len(self._postings),
+            "bitmap_bytes": sum((bitmap.bit_length() + 7) // 8 for bitmap in self._postings.values())
+        }
+
+
+def _bitmap(rows: List[int]) -> int:
+    """Build a bitmap with the given rows set."""
+    mask = np.zeros(max(rows) + 1, dtype=bool)
+    mask[rows] = True
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
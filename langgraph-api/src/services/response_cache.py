@@ -0,0 +1,291 @@
+"""Semantic cache of agent responses."""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+
+class CachedResponse:
+    """A stored agent answer and the document versions it was based on."""
+
+    __slots__ = ("stored_at", "embedding", "scope", "response", "cited")
+
+    def __init__(
+        self,
+        embedding: np.ndarray,
+        scope: str,
+        response: Dict[str, Any],
+        cited: Dict[str, Any]
+    ):
+        self.stored_at = time.monotonic()
+        self.embedding = embedding
+        self.scope = scope
+        self.response = response
+        self.cited = cited
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of agent responses, keyed by query embedding.
+
+    A lookup returns the stored response of the most similar cached query
+    if the cosine similarity reaches the threshold, the entry is younger
+    than the TTL and every document the answer cited is still at the
+    version it had when the answer was generated. Entries are only
+    compared within the same scope: the same metadata filters, agent
+    profile and chat model.
+
+    Document writes invalidate the entries that cited a written document,
+    and entries whose query is similar enough to a new document that the
+    document would have been retrieved for it.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 512,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float = 0.95,
+        retrieval_threshold: Optional[float] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached responses, 0 disables caching
+            ttl_seconds: Seconds an entry stays valid
+            similarity_threshold: Minimum cosine similarity between queries
+            retrieval_threshold: Similarity at which a new document counts
+                as relevant to a cached query, the search threshold by default
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.retrieval_threshold = (
+            settings.similarity_threshold if retrieval_threshold is None else retrieval_threshold
+        )
+        self._entries: "OrderedDict[int, CachedResponse]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        # Stacked query embeddings, rebuilt lazily after changes
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[int] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lookup_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether responses are cached at all."""
+        return self.max_size > 0
+
+    @staticmethod
+    def scope(filters: Optional[Dict[str, Any]], profile: str, model: str) -> str:
+        """
+        Build the scope key of a request.
+
+        Args:
+            filters: Metadata filters of the request
+            profile: Agent profile that generates the answer
+            model: Chat model that generates the answer
+
+        Returns:
+            Key that only matches requests answered the same way
+        """
+        return json.dumps(
+            {"filters": filters or {}, "profile": profile, "model": model},
+            sort_keys=True,
+            default=str
+        )
+
+    def get(
+        self,
+        embedding: List[float],
+        scope: str,
+        version: Callable[[str], Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up the response of a similar query.
+
+        Args:
+            embedding: Query embedding
+            scope: Scope key of the request
+            version: Returns the current updated_at of a document ID,
+                None if it no longer exists
+
+        Returns:
+            Cached response or None
+        """
+        if not self.enabled:
+            return None
+
+        started = time.perf_counter()
+        with self._lock:
+            try:
+                entry_id, similarity = self._nearest(embedding, scope)
+                if entry_id is None:
+                    self.misses += 1
+                    return None
+
+                entry = self._entries[entry_id]
+                if time.monotonic() - entry.stored_at > self.ttl_seconds:
+                    self._discard(entry_id)
+                    self.evictions += 1
+                    self.misses += 1
+                    return None
+
+                if any(version(doc_id) != updated_at for doc_id, updated_at in entry.cited.items()):
+                    self._discard(entry_id)
+                    self.stale += 1
+                    self.misses += 1
+                    return None
+
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                logger.debug("response_cache_hit", similarity=round(similarity, 4))
+                return entry.response
+
+            finally:
+                self._lookup_seconds += time.perf_counter() - started
+
+    def put(
+        self,
+        embedding: List[float],
+        scope: str,
+        response: Dict[str, Any],
+        cited: Dict[str, Any]
+    ) -> None:
+        """
+        Store a response.
+
+        Args:
+            embedding: Query embedding
+            scope: Scope key of the request
+            response: Response to return on later hits
+            cited: updated_at of each document the response is based on, by ID
+        """
+        if not self.enabled:
+            return
+
+        vector = _unit(embedding)
+        with self._lock:
+            # A near-identical query replaces the older answer
+            entry_id, _ = self._nearest(embedding, scope)
+            if entry_id is not None:
+                self._discard(entry_id)
+
+            self._entries[self._next_id] = CachedResponse(vector, scope, response, cited)
+            self._next_id += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._matrix = None
+
+    def invalidate(
+        self,
+        document_ids: List[str],
+        embeddings: Optional[List[List[float]]] = None
+    ) -> int:
+        """
+        Drop responses made stale by document writes.
+
+        Args:
+            document_ids: IDs of written or deleted documents
+            embeddings: Embeddings of the written documents, used to find
+                cached queries the documents are now relevant to
+
+        Returns:
+            Number of responses dropped
+        """
+        if not self._entries:
+            return 0
+
+        written = set(document_ids)
+        with self._lock:
+            dropped = {
+                entry_id for entry_id, entry in self._entries.items()
+                if written.intersection(entry.cited)
+            }
+
+            if embeddings:
+                matrix, entry_ids = self._stacked()
+                similarities = np.stack([_unit(e) for e in embeddings]) @ matrix.T
+                relevant = np.flatnonzero((similarities >= self.retrieval_threshold).any(axis=0))
+                dropped.update(entry_ids[i] for i in relevant)
+
+            for entry_id in dropped:
+                self._discard(entry_id)
+            self.invalidations += len(dropped)
+
+        if dropped:
+            logger.debug("response_cache_invalidated", responses=len(dropped))
+        return len(dropped)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size, hit/miss counters and lookup latency."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "similarity_threshold": self.similarity_threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "avg_lookup_ms": self._lookup_seconds * 1000 / lookups if lookups else None
+        }
+
+    def _nearest(self, embedding: List[float], scope: str) -> Tuple[Optional[int], float]:
+        """Find the most similar entry in a scope above the threshold."""
+        if not self._entries:
+            return None, 0.0
+
+        matrix, entry_ids = self._stacked()
+        similarities = matrix @ _unit(embedding)
+        for i in np.argsort(-similarities):
+            if similarities[i] < self.similarity_threshold:
+                break
+            if self._entries[entry_ids[i]].scope == scope:
+                return entry_ids[i], float(similarities[i])
+        return None, 0.0
+
+    def _stacked(self) -> Tuple[np.ndarray, List[int]]:
+        """Return the query embeddings of all entries as one matrix."""
+        if self._matrix is None:
+            self._matrix_ids = list(self._entries)
+            self._matrix = np.stack([self._entries[i].embedding for i in self._matrix_ids])
+        return self._matrix, self._matrix_ids
+
+    def _discard(self, entry_id: int) -> None:
+        """Remove an entry."""
+        self._entries.pop(entry_id, None)
+        self._matrix = None
+
+
+def _unit(embedding: List[float]) -> np.ndarray:
+    """Return an embedding as a float32 unit vector."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
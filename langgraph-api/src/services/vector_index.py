@@ -0,0 +1,557 @@
+"""Nearest-neighbour search backends for the embedding index."""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import structlog
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+
+class VectorIndex:
+    """
+    Interface for nearest-neighbour search over embedding matrix rows.
+
+    Backends do not own the vectors. The EmbeddingIndex keeps the
+    normalized float32 matrix and tells the backend which rows were built,
+    added or deleted, so any backend can be used on top of a
+    memory-mapped snapshot.
+    """
+
+    name = "base"
+
+    # Approximate backends may miss some of the exact top-k rows
+    approximate = False
+
+    # Whether search scans the full-precision matrix, or only reads a few
+    # of its rows so it can stay on disk
+    resident_vectors = True
+
+    def build(self, matrix: np.ndarray, live: np.ndarray) -> None:
+        """
+        Build the index from scratch.
+
+        Args:
+            matrix: Normalized embedding matrix
+            live: Boolean mask of rows holding a document
+        """
+        raise NotImplementedError
+
+    def add(self, row: int, vector: np.ndarray) -> None:
+        """
+        Add or replace a single row.
+
+        Args:
+            row: Row number in the embedding matrix
+            vector: Normalized embedding stored at that row
+        """
+        raise NotImplementedError
+
+    def delete(self, row: int) -> None:
+        """
+        Remove a row from the index.
+
+        Args:
+            row: Row number in the embedding matrix
+        """
+        raise NotImplementedError
+
+    def needs_rebuild(self, size: int) -> bool:
+        """
+        Whether the index should be rebuilt for the current row count.
+
+        Args:
+            size: Number of live rows
+        """
+        return False
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        live: np.ndarray,
+        query: np.ndarray,
+        k: int,
+        **params: Any
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the rows most similar to a normalized query.
+
+        Args:
+            matrix: Normalized embedding matrix
+            live: Boolean mask of rows holding a document
+            query: Normalized query vector
+            k: Number of rows to return
+            **params: Backend specific search parameters
+
+        Returns:
+            Tuple of (rows, scores) sorted by descending score
+        """
+        raise NotImplementedError
+
+    def search_batch(
+        self,
+        matrix: np.ndarray,
+        live: np.ndarray,
+        queries: np.ndarray,
+        k: int,
+        **params: Any
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Find the most similar rows for each of several normalized queries.
+
+        Args:
+            matrix: Normalized embedding matrix
+            live: Boolean mask of rows holding a document
+            queries: Normalized query matrix, one query per row
+            k: Number of rows to return per query
+            **params: Backend specific search parameters
+
+        Returns:
+            One (rows, scores) tuple per query
+        """
+        return [self.search(matrix, live, query, k, **params) for query in queries]
+
+    def memory_bytes(self) -> int:
+        """Return the memory held by the backend itself."""
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backend parameters and state."""
+        return {"backend": self.name, "memory_bytes": self.memory_bytes()}
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k highest scores with argpartition.
+
+    Args:
+        scores: Score per candidate
+        k: Number of candidates to keep
+
+    Returns:
+        Tuple of (positions, scores) sorted by descending score
+    """
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    positions = np.argpartition(-scores, k - 1)[:k]
+    positions = positions[np.argsort(-scores[positions])]
+    return positions, scores[positions]
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force search: one matrix-vector product over every row."""
+
+    name = "exact"
+
+    def build(self, matrix: np.ndarray, live: np.ndarray) -> None:
+        pass
+
+    def add(self, row: int, vector: np.ndarray) -> None:
+        pass
+
+    def delete(self, row: int) -> None:
+        pass
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        live: np.ndarray,
+        query: np.ndarray,
+        k: int,
+        **params: Any
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        scores = matrix @ query
+        scores[~live] = -np.inf
+        return top_k_rows(scores, k)
+
+    def search_batch(
+        self,
+        matrix: np.ndarray,
+        live: np.ndarray,
+        queries: np.ndarray,
+        k: int,
+        max_scores: int = 1 << 22,
+        **params: Any
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        results: List[Tuple[np.ndarray, np.ndarray]] = []
+        k = min(k, matrix.shape[0])
+        if k <= 0:
+            empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+            return [empty for _ in queries]
+
+        # Bound the score matrix to about 16 MB per block of queries
+        block_size = max(1, max_scores // max(1, matrix.shape[0]))
+        for start in range(0, len(queries), block_size):
+            scores = queries[start:start + block_size] @ matrix.T
+            scores[:, ~live] = -np.inf
+
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            results.extend(zip(top, top_scores))
+
+        return results
+
+
+class IVFFlatIndex(VectorIndex):
+    """
+    Inverted-file index with exact scoring inside the probed lists.
+
+    Rows are clustered around ``nlist`` spherical k-means centroids. A
+    query only scores the rows in the ``nprobe`` lists whose centroids are
+    closest to it, so query time grows with ``nprobe / nlist`` of the
+    collection instead of all of it. Collections smaller than
+    ``min_train_size`` are not clustered and are searched exhaustively.
+    """
+
+    name = "ivf"
+    approximate = True
+
+    def __init__(
+        self,
+        nlist: Optional[int] = None,
+        nprobe: int = 8,
+        min_train_size: int = 1024,
+        iterations: int = 10,
+        points_per_list: int = 64,
+        seed: int = 0
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            nlist: Number of lists, defaults to the square root of the row count
+            nprobe: Number of lists scanned per query
+            min_train_size: Minimum row count before clustering
+            iterations: k-means iterations
+            points_per_list: Training sample size per list
+            seed: Random seed for centroid initialization
+        """
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.iterations = iterations
+        self.points_per_list = points_per_list
+        self.seed = seed
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[Set[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self._assignments: Dict[int, int] = {}
+        self._unassigned: Set[int] = set()
+        self._trained_size = 0
+
+    @property
+    def trained(self) -> bool:
+        """Whether centroids have been computed."""
+        return self._centroids is not None
+
+    def build(self, matrix: np.ndarray, live: np.ndarray) -> None:
+        rows = np.flatnonzero(live)
+        self._centroids = None
+        self._lists = []
+        self._list_arrays = {}
+        self._assignments = {}
+        self._unassigned = set(rows.tolist())
+        self._trained_size = len(rows)
+
+        if len(rows) < self.min_train_size:
+            return
+
+        vectors = matrix[rows]
+        self._centroids = self._train(vectors)
+        self._lists = [set() for _ in range(len(self._centroids))]
+        self._unassigned = set()
+
+        # Assign in blocks to bound the size of the score matrix
+        for start in range(0, len(rows), 4096):
+            block = rows[start:start + 4096]
+            nearest = np.argmax(matrix[block] @ self._centroids.T, axis=1)
+            for row, list_id in zip(block.tolist(), nearest.tolist()):
+                self._lists[list_id].add(row)
+                self._assignments[row] = list_id
+
+        logger.info(
+            "ivf_index_built",
+            rows=len(rows),
+            nlist=len(self._centroids),
+            nprobe=self.nprobe
+        )
+
+    def add(self, row: int, vector: np.ndarray) -> None:
+        self.delete(row)
+        if self._centroids is None:
+            self._unassigned.add(row)
+            return
+
+        list_id = int(np.argmax(self._centroids @ vector))
+        self._lists[list_id].add(row)
+        self._list_arrays.pop(list_id, None)
+        self._assignments[row] = list_id
+
+    def delete(self, row: int) -> None:
+        self._unassigned.discard(row)
+        list_id = self._assignments.pop(row, None)
+        if list_id is not None:
+            self._lists[list_id].discard(row)
+            self._list_arrays.pop(list_id, None)
+
+    def needs_rebuild(self, size: int) -> bool:
+        if self._centroids is None:
+            return size >= self.min_train_size
+        return size > 2 * self._trained_size
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        live: np.ndarray,
+        query: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        **params: Any
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        candidates = [np.fromiter(self._unassigned, dtype=np.int64)]
+        if self._centroids is not None:
+            nprobe = min(nprobe or self.nprobe, len(self._centroids))
+            probed, _ = top_k_rows(self._centroids @ query, nprobe)
+            candidates.extend(self._list_array(int(list_id)) for list_id in probed)
+
+        rows = np.concatenate(candidates)
+        if rows.size == 0:
+            return rows, np.empty(0, dtype=np.float32)
+
+        scores = matrix[rows] @ query
+        positions, top_scores = top_k_rows(scores, k)
+        return rows[positions], top_scores
+
+    def memory_bytes(self) -> int:
+        return int(self._centroids.nbytes) if self._centroids is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "memory_bytes": self.memory_bytes(),
+            "trained": self.trained,
+            "nlist": len(self._lists),
+            "nprobe": self.nprobe,
+            "trained_size": self._trained_size,
+            "unassigned": len(self._unassigned)
+        }
+
+    def _list_array(self, list_id: int) -> np.ndarray:
+        """Return the rows of a list as a cached array."""
+        rows = self._list_arrays.get(list_id)
+        if rows is None:
+            rows = np.fromiter(self._lists[list_id], dtype=np.int64)
+            self._list_arrays[list_id] = rows
+        return rows
+
+    def _train(self, vectors: np.ndarray) -> np.ndarray:
+        """Run spherical k-means on a sample of the vectors."""
+        rng = np.random.default_rng(self.seed)
+        nlist = self.nlist or int(np.sqrt(len(vectors)))
+        nlist = max(1, min(nlist, len(vectors)))
+
+        sample_size = min(len(vectors), nlist * self.points_per_list)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            nearest = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, nearest, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            # Keep the previous centroid for lists that received no points
+            filled = norms > 0
+            centroids[filled] = sums[filled] / norms[filled, None]
+
+        return centroids.astype(np.float32)
+
+
+class ScalarQuantizedIndex(VectorIndex):
+    """
+    Int8 scalar quantization with exact re-ranking.
+
+    Every row is stored as int8 codes with one scale per dimension, a
+    quarter of the float32 size. Queries are scored against the codes,
+    and the best ``k * rerank_factor`` candidates are re-scored exactly
+    against the full-precision matrix. Only those candidate rows of the
+    float32 matrix are read per query, so the EmbeddingIndex keeps it in
+    a disk-backed memory map and only the codes stay resident.
+
+    The codes are scanned in blocks small enough for their float32
+    conversion to stay in the CPU cache, so a scan reads a quarter of the
+    bytes of an exact search at about the same speed.
+
+    The scales are fitted to the rows present at build time. A later
+    insert reaching outside them has its codes clipped, which only costs
+    candidate quality since candidates are re-scored exactly. Clipped
+    inserts are counted, and the index asks for a rebuild once they exceed
+    ``saturation_limit`` of the rows.
+    """
+
+    name = "sq8"
+    approximate = True
+    resident_vectors = False
+
+    def __init__(
+        self,
+        rerank_factor: int = 4,
+        block_size: int = 128,
+        saturation_limit: float = 0.01
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            rerank_factor: Candidates re-scored exactly per requested result
+            block_size: Rows converted to float32 at a time while scanning
+            saturation_limit: Fraction of clipped inserts that triggers a rebuild
+        """
+        self.rerank_factor = rerank_factor
+        self.block_size = block_size
+        self.saturation_limit = saturation_limit
+        self._saturated = 0
+        self._codes = np.zeros((0, 0), dtype=np.int8)
+        self._scale: Optional[np.ndarray] = None
+        self._buffer = np.zeros((0, 0), dtype=np.float32)
+
+    def build(self, matrix: np.ndarray, live: np.ndarray) -> None:
+        dimension = matrix.shape[1]
+        rows = np.flatnonzero(live)
+        # Large blocks keep the passes over a memory-mapped matrix sequential
+        read_size = max(self.block_size, 4096)
+
+        # Fit the scales to the built rows, later inserts may fall outside
+        max_abs = np.zeros(dimension, dtype=np.float32)
+        for start in range(0, len(rows), read_size):
+            block = matrix[rows[start:start + read_size]]
+            np.maximum(max_abs, np.abs(block).max(axis=0), out=max_abs)
+        max_abs[max_abs == 0] = 1.0
+        self._scale = (max_abs / 127.0).astype(np.float32)
+
+        self._saturated = 0
+        self._codes = np.zeros((matrix.shape[0], dimension), dtype=np.int8)
+        for start in range(0, len(rows), read_size):
+            block = rows[start:start + read_size]
+            self._codes[block] = self._quantize(matrix[block])
+
+    def add(self, row: int, vector: np.ndarray) -> None:
+        if self._scale is None:
+            # Components of normalized vectors never exceed 1
+            self._scale = np.full(vector.shape[0], 1.0 / 127.0, dtype=np.float32)
+            self._codes = np.zeros((0, vector.shape[0]), dtype=np.int8)
+
+        if row >= self._codes.shape[0]:
+            capacity = max(row + 1, self._codes.shape[0] * 2)
+            codes = np.zeros((capacity, self._codes.shape[1]), dtype=np.int8)
+            codes[:self._codes.shape[0]] = self._codes
+            self._codes = codes
+
+        if np.any(np.abs(vector) > self._scale * 127.5):
+            self._saturated += 1
+        self._codes[row] = self._quantize(vector)
+
+    def needs_rebuild(self, size: int) -> bool:
+        return self._saturated > self.saturation_limit * size
+
+    def delete(self, row: int) -> None:
+        if row < self._codes.shape[0]:
+            self._codes[row] = 0
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        live: np.ndarray,
+        query: np.ndarray,
+        k: int,
+        rerank_factor: Optional[int] = None,
+        **params: Any
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        return self.search_batch(matrix, live, query[None, :], k, rerank_factor)[0]
+
+    def search_batch(
+        self,
+        matrix: np.ndarray,
+        live: np.ndarray,
+        queries: np.ndarray,
+        k: int,
+        rerank_factor: Optional[int] = None,
+        **params: Any
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        size = matrix.shape[0]
+        if self._scale is None or size == 0:
+            empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+            return [empty for _ in queries]
+
+        # Fold the scales into the queries instead of dequantizing the codes
+        scaled = np.ascontiguousarray((queries * self._scale).T, dtype=np.float32)
+        approx = np.empty((size, len(queries)), dtype=np.float32)
+        if self._buffer.shape != (self.block_size, self._codes.shape[1]):
+            self._buffer = np.empty((self.block_size, self._codes.shape[1]), dtype=np.float32)
+        for start in range(0, size, self.block_size):
+            block = self._codes[start:min(start + self.block_size, size)]
+            buffer = self._buffer[:len(block)]
+            np.copyto(buffer, block, casting="unsafe")
+            np.matmul(buffer, scaled, out=approx[start:start + len(block)])
+        approx[~live] = -np.inf
+
+        candidates = k * (rerank_factor or self.rerank_factor)
+        results = []
+        for query, query_approx in zip(queries, approx.T):
+            rows, _ = top_k_rows(query_approx, candidates)
+            rows = np.sort(rows[np.isfinite(query_approx[rows])])
+            # Sorted rows read the memory-mapped matrix in file order
+            exact = np.asarray(matrix[rows] @ query, dtype=np.float32)
+            positions, scores = top_k_rows(exact, k)
+            results.append((rows[positions], scores))
+        return results
+
+    def memory_bytes(self) -> int:
+        scale_bytes = self._scale.nbytes if self._scale is not None else 0
+        return int(self._codes.nbytes + scale_bytes + self._buffer.nbytes)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "memory_bytes": self.memory_bytes(),
+            "rerank_factor": self.rerank_factor,
+            "saturated_inserts": self._saturated
+        }
+
+    def _quantize(self, vectors: np.ndarray) -> np.ndarray:
+        """Convert normalized vectors to int8 codes."""
+        codes = np.rint(vectors / self._scale)
+        return np.clip(codes, -127, 127).astype(np.int8)
+
+
+def create_vector_index(backend: Optional[str] = None) -> VectorIndex:
+    """
+    Create the configured nearest-neighbour backend.
+
+    Args:
+        backend: Backend name, defaults to ``settings.vector_index_backend``
+
+    Returns:
+        Vector index instance
+    """
+    backend = backend or settings.vector_index_backend
+
+    if backend == "exact":
+        return ExactIndex()
+    if backend == "ivf":
+        return IVFFlatIndex(
+            nlist=settings.ivf_nlist,
+            nprobe=settings.ivf_nprobe
+        )
+    if backend == "sq8":
+        return ScalarQuantizedIndex(
+            rerank_factor=settings.quantization_rerank_factor
+        )
+
+    raise ValueError(f"Unknown vector index backend: {backend}")
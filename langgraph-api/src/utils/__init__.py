@@ -1,5 +1,7 @@
 """Utilities module."""
 
 from .logging import setup_logging
+from .tokens import count_tokens
+from .chunking import Chunk, chunk_text
 
-__all__ = ["setup_logging"]
\ No newline at end of file
+__all__ = ["setup_logging", "count_tokens", "Chunk", "chunk_text"]
@@ -0,0 +1,104 @@
+"""Token-aware text chunking."""
+
+import re
+from typing import List, NamedTuple, Optional
+
+from src.config import settings
+from src.utils.tokens import CHARS_PER_TOKEN, get_encoding
+
+_BREAK = re.compile(r"\s+")
+
+
+class Chunk(NamedTuple):
+    """A window of a text, with character offsets into the original."""
+
+    index: int
+    text: str
+    start: int
+    end: int
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    model: Optional[str] = None
+) -> List[Chunk]:
+    """
+    Split a text into overlapping windows of at most max_tokens tokens.
+
+    Chunk boundaries are moved back to the nearest whitespace when one is
+    close, so words are not cut in half. Every chunk is an exact substring
+    of the input, located by its character offsets.
+
+    Args:
+        text: Text to split
+        max_tokens: Maximum tokens per chunk
+        overlap_tokens: Tokens repeated at the start of the next chunk
+        model: Model whose tokenizer to use, the embedding model by default
+
+    Returns:
+        Chunks in order; a single chunk if the text fits
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+
+    offsets = _token_offsets(text, model or settings.embedding_model)
+    if len(offsets) <= max_tokens:
+        return [Chunk(0, text, 0, len(text))]
+
+    chunks: List[Chunk] = []
+    first = 0
+    while first < len(offsets):
+        last = first + max_tokens
+        start = offsets[first]
+        if chunks:
+            # Start the overlap on a whole word, but before the previous end
+            start = _word_start(text, start, chunks[-1].end)
+        if last >= len(offsets):
+            end = len(text)
+        else:
+            end = _word_boundary(text, start, offsets[last])
+
+        chunks.append(Chunk(len(chunks), text[start:end], start, end))
+        if end >= len(text):
+            break
+
+        # Continue from the token containing the boundary, minus the overlap
+        next_first = first
+        while next_first + 1 < len(offsets) and offsets[next_first + 1] <= end:
+            next_first += 1
+        first = max(first + 1, next_first - overlap_tokens)
+
+    return chunks
+
+
+def _token_offsets(text: str, model: str) -> List[int]:
+    """Return the character offset where each token starts."""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return list(range(0, len(text), CHARS_PER_TOKEN))
+
+    tokens = encoding.encode(text)
+    decoded, offsets = encoding.decode_with_offsets(tokens)
+    if decoded != text:
+        # Tokens splitting multi-byte characters can shift offsets
+        return list(range(0, len(text), CHARS_PER_TOKEN))
+    return offsets
+
+
+def _word_start(text: str, start: int, limit: int) -> int:
+    """Move a chunk start forward to the next word, staying below limit."""
+    if start == 0 or text[start - 1].isspace():
+        return start
+    match = _BREAK.search(text, start, limit)
+    return match.end() if match else start
+
+
+def _word_boundary(text: str, start: int, end: int) -> int:
+    """Move a chunk end back to whitespace within its last fifth."""
+    floor = end - (end - start) // 5
+    for match in reversed(list(_BREAK.finditer(text, floor, end))):
+        return match.end()
+    return end
@@ -0,0 +1,57 @@
+"""Token counting helpers."""
+
+from functools import lru_cache
+from typing import Optional
+
+import structlog
+import tiktoken
+
+from src.config import settings
+
+logger = structlog.get_logger()
+
+# Rough characters per token for English and Swedish text
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str) -> Optional[tiktoken.Encoding]:
+    """
+    Get the tokenizer used by a model.
+
+    tiktoken downloads its vocabulary files on first use, so this returns
+    None when they are not cached and cannot be fetched.
+
+    Args:
+        model: OpenAI model name
+
+    Returns:
+        Tokenizer, cl100k_base for unknown models, or None if unavailable
+    """
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning("tokenizer_unavailable", model=model, error=str(e))
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens of a text.
+
+    Falls back to a character-based estimate if the tokenizer is unavailable.
+
+    Args:
+        text: Text to count
+        model: Model whose tokenizer to use, the embedding model by default
+
+    Returns:
+        Number of tokens
+    """
+    encoding = get_encoding(model or settings.embedding_model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
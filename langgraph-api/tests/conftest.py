@@ -0,0 +1,180 @@
+"""Shared test configuration and fixtures."""
+
+import os
+
+import numpy as np
+import pytest
+
+# Settings are read at import time, so required values must exist first
+for name, value in {
+    "OPENAI_API_KEY": "sk-test",
+    "FIREBASE_PROJECT_ID": "test-project",
+    "FIREBASE_PRIVATE_KEY_ID": "test",
+    "FIREBASE_PRIVATE_KEY": "test",
+    "FIREBASE_CLIENT_EMAIL": "test@test-project.iam.gserviceaccount.com",
+    "FIREBASE_CLIENT_ID": "test",
+    "FIREBASE_CLIENT_CERT_URL": "https://example.com/cert",
+}.items():
+    os.environ.setdefault(name, value)
+
+DIMENSION = 32
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    """Seeded random generator."""
+    return np.random.default_rng(0)
+
+
+@pytest.fixture
+def documents(rng):
+    """Random documents in the Firestore shape, with a category per document."""
+    vectors = rng.normal(size=(2000, DIMENSION)).astype(np.float32)
+    return [
+        (
+            f"doc-{i}",
+            {
+                "embedding": vectors[i].tolist(),
+                "text": f"document number {i}",
+                "metadata": {"category": "even" if i % 2 == 0 else "odd"}
+            }
+        )
+        for i in range(len(vectors))
+    ]
+
+
+def brute_force(documents, query, k, keep=lambda doc_id, data: True):
+    """Return the IDs of the exact top-k documents by cosine similarity."""
+    ids = [doc_id for doc_id, data in documents if keep(doc_id, data)]
+    matrix = np.array([data["embedding"] for doc_id, data in documents if keep(doc_id, data)])
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    scores = matrix @ (query / np.linalg.norm(query))
+    return [ids[i] for i in np.argsort(-scores)[:k]]
+
+
+class FakeEmbeddingService:
+    """Embedding service returning a fixed random vector per text, counting calls."""
+
+    def __init__(self, dimension: int = DIMENSION):
+        self.dimension = dimension
+        self.calls = 0
+        self.vectors = {}
+
+    def vector(self, text: str):
+        if text not in self.vectors:
+            seed = abs(hash(text)) % (2 ** 32)
+            self.vectors[text] = np.random.default_rng(seed).normal(size=self.dimension).tolist()
+        return self.vectors[text]
+
+    async def embed_text(self, text: str):
+        self.calls += 1
+        return self.vector(text)
+
+    async def embed_texts(self, texts):
+        self.calls += 1
+        return [self.vector(text) for text in texts]
+
+    async def embed_documents(self, texts):
+        return await self.embed_texts(texts)
+
+    async def aclose(self) -> None:
+        pass
+
+
+@pytest.fixture
+def embedding_service() -> FakeEmbeddingService:
+    return FakeEmbeddingService()
+
+
+@pytest.fixture
+def vector_store(monkeypatch, embedding_service):
+    """FirebaseVectorStore over a mocked Firestore client and a fresh index."""
+    from unittest.mock import MagicMock
+
+    import firebase_admin
+    from firebase_admin import firestore_async
+
+    from src.services.embedding_index import EmbeddingIndex
+    from src.services.firebase_vector_store import FirebaseVectorStore
+    from src.services.lexical_index import BM25Index
+
+    from src.services import firebase_vector_store
+
+    monkeypatch.setattr(firebase_admin, "_apps", {"[DEFAULT]": object()})
+    monkeypatch.setattr(firebase_vector_store, "_text_load_task", None)
+    monkeypatch.setattr(firebase_vector_store, "_texts_loaded", False)
+    monkeypatch.setattr(firestore_async, "client", lambda *args, **kwargs: MagicMock())
+    store = FirebaseVectorStore(embedding_service=embedding_service)
+    store.index = EmbeddingIndex(DIMENSION, lexical_index=BM25Index())
+    return store
+
+
+class FakeChatModel:
+    """Factory standing in for ChatOpenAI, counting model calls."""
+
+    def __init__(self, reply: str = "Peter has built several APIs with Python."):
+        self.reply = reply
+        self.calls = 0
+
+    def __call__(self, **kwargs):
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+
+        def replies():
+            while True:
+                self.calls += 1
+                yield AIMessage(content=self.reply)
+
+        return GenericFakeChatModel(messages=replies())
+
+
+@pytest.fixture
+def chat_model(monkeypatch) -> FakeChatModel:
+    from src.core import nodes
+
+    model = FakeChatModel()
+    monkeypatch.setattr(nodes, "ChatOpenAI", model)
+    return model
+
+
+class FakeServices:
+    """Service container over the test vector store, with one graph per profile."""
+
+    def __init__(self, vector_store, embedding_service):
+        from src.core.checkpointer import BoundedCheckpointSaver
+        from src.services.response_cache import ResponseCache
+
+        self.vector_store = vector_store
+        self.embedding_service = embedding_service
+        self.response_cache = ResponseCache(max_size=16, similarity_threshold=0.95)
+        self.checkpointer = BoundedCheckpointSaver()
+        self._graphs = {}
+
+    def agent(self, profile=None):
+        from src.config import settings
+        from src.core.agent import create_agent_graph
+
+        profile = profile or settings.agent_profile
+        if profile not in self._graphs:
+            self._graphs[profile] = create_agent_graph(self.vector_store, self.checkpointer, profile)
+        return self._graphs[profile]
+
+
+@pytest.fixture
+def services(vector_store, embedding_service, chat_model) -> FakeServices:
+    text = "Peter builds APIs with Python and FastAPI"
+    vector_store.index.load([
+        ("python", {"embedding": embedding_service.vector(text), "text": text})
+    ])
+    return FakeServices(vector_store, embedding_service)
+
+
+@pytest.fixture
+def client(services):
+    """Test client of the application, without running its lifespan."""
+    from fastapi.testclient import TestClient
+
+    from src.main import app
+
+    app.state.services = services
+    return TestClient(app)
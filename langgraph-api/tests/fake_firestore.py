@@ -0,0 +1,158 @@
+"""In-memory stand-in for a Firestore collection with snapshot listeners."""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from google.cloud.firestore_v1.watch import ChangeType
+
+
+class FakeDocument:
+    """Snapshot of a single document."""
+
+    def __init__(self, document_id: str, data: Optional[Dict[str, Any]], update_time: datetime):
+        self.id = document_id
+        self._data = data
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeChange(NamedTuple):
+    """Document change delivered with a collection snapshot."""
+
+    type: ChangeType
+    document: FakeDocument
+
+
+class FakeWatch:
+    """Handle returned by ``on_snapshot``."""
+
+    def __init__(self, collection: "FakeCollection", callback: Callable[..., None]):
+        self._collection = collection
+        self.callback = callback
+
+    def unsubscribe(self) -> None:
+        self._collection.watches.remove(self)
+
+
+class FakeCollection:
+    """
+    Collection whose writes are pushed to snapshot listeners.
+
+    Like Firestore, a new listener first receives the whole collection
+    with every document as ADDED, then one snapshot per write. Snapshots
+    are delivered synchronously on the writing thread, so tests can assert
+    right after a write.
+    """
+
+    def __init__(self):
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.watches: List[FakeWatch] = []
+
+    def on_snapshot(self, callback: Callable[..., None]) -> FakeWatch:
+        watch = FakeWatch(self, callback)
+        self.watches.append(watch)
+        now = datetime.now(timezone.utc)
+        docs = [FakeDocument(d, data, now) for d, data in self.documents.items()]
+        callback(docs, [FakeChange(ChangeType.ADDED, doc) for doc in docs], now)
+        return watch
+
+    def set(self, document_id: str, data: Dict[str, Any]) -> None:
+        change_type = ChangeType.MODIFIED if document_id in self.documents else ChangeType.ADDED
+        self.documents[document_id] = dict(data)
+        self._notify(FakeChange(change_type, self._document(document_id)))
+
+    def delete(self, document_id: str) -> None:
+        data = self.documents.pop(document_id)
+        document = FakeDocument(document_id, data, datetime.now(timezone.utc))
+        self._notify(FakeChange(ChangeType.REMOVED, document))
+
+    def _document(self, document_id: str) -> FakeDocument:
+        return FakeDocument(document_id, self.documents[document_id], datetime.now(timezone.utc))
+
+    def _notify(self, change: FakeChange) -> None:
+        now = datetime.now(timezone.utc)
+        docs = [FakeDocument(d, data, now) for d, data in self.documents.items()]
+        for watch in list(self.watches):
+            watch.callback(docs, [change], now)
+
+
+class FakeQuery:
+    """Async query streaming every document, projected to the selected fields."""
+
+    def __init__(self, documents: Dict[str, Dict[str, Any]], fields: Optional[List[str]] = None):
+        self._documents = documents
+        self._fields = fields
+        self.streamed = 0
+
+    def select(self, fields: List[str]) -> "FakeQuery":
+        return FakeQuery(self._documents, fields)
+
+    async def stream(self):
+        now = datetime.now(timezone.utc)
+        for document_id, data in list(self._documents.items()):
+            if self._fields is not None:
+                data = {field: data[field] for field in self._fields if field in data}
+            yield FakeDocument(document_id, data, now)
+
+
+class FakeReference(str):
+    """Document reference, interchangeable with its document ID."""
+
+    @property
+    def id(self) -> str:
+        return str(self)
+
+
+class FakeBatch:
+    """Batched write applied to the documents on commit."""
+
+    def __init__(self, documents: Dict[str, Dict[str, Any]]):
+        self._documents = documents
+        self._operations: List[Callable[[], None]] = []
+
+    def set(self, reference: FakeReference, data: Dict[str, Any]) -> None:
+        self._operations.append(lambda: self._documents.__setitem__(reference.id, dict(data)))
+
+    def update(self, reference: FakeReference, data: Dict[str, Any]) -> None:
+        self._operations.append(lambda: self._documents[reference.id].update(data))
+
+    def delete(self, reference: FakeReference) -> None:
+        self._operations.append(lambda: self._documents.pop(reference.id, None))
+
+    async def commit(self) -> None:
+        for operation in self._operations:
+            operation()
+
+
+class FakeAsyncFirestore:
+    """Async client over in-memory collections, recording which fields were read."""
+
+    def __init__(self, documents: Dict[str, Dict[str, Any]]):
+        self.documents = documents
+        self.get_all_calls = 0
+        self.batches = 0
+
+    def collection(self, name: str) -> FakeQuery:
+        query = FakeQuery(self.documents)
+        query.document = lambda document_id=None: FakeReference(document_id or uuid.uuid4().hex)
+        return query
+
+    def batch(self) -> FakeBatch:
+        self.batches += 1
+        return FakeBatch(self.documents)
+
+    async def get_all(self, references: List[str], field_paths: Optional[List[str]] = None):
+        self.get_all_calls += 1
+        now = datetime.now(timezone.utc)
+        for document_id in references:
+            data = self.documents.get(document_id)
+            if data is not None and field_paths is not None:
+                data = {field: data[field] for field in field_paths if field in data}
+            yield FakeDocument(document_id, data, now)
@@ -0,0 +1,82 @@
+"""Tests for streaming NDJSON bulk ingestion."""
+
+import json
+
+import pytest
+
+from fake_firestore import FakeAsyncFirestore
+from src.config import settings
+
+
+@pytest.fixture
+def firestore(services):
+    firestore = FakeAsyncFirestore({})
+    services.vector_store.db = firestore
+    return firestore
+
+
+def post_bulk(client, lines):
+    """Post NDJSON lines and return the response events."""
+    body = b"\n".join(
+        line if isinstance(line, bytes) else json.dumps(line).encode("utf-8")
+        for line in lines
+    )
+    response = client.post(
+        "/documents/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_documents_are_embedded_and_written_in_batches(
+    client, services, firestore, embedding_service, monkeypatch
+):
+    monkeypatch.setattr(settings, "bulk_max_batch_size", 2)
+    embedding_service.calls = 0
+
+    events = post_bulk(client, [
+        {"text": f"Document {i}", "document_id": f"bulk-{i}"} for i in range(5)
+    ])
+
+    assert [event["event"] for event in events].count("progress") == 3
+    assert events[-1] == {"event": "done", "received": 5, "written": 5, "failed": 0}
+    assert embedding_service.calls == 3
+    assert sorted(firestore.documents) == [f"bulk-{i}" for i in range(5)]
+    assert all(f"bulk-{i}" in services.vector_store.index for i in range(5))
+
+
+def test_invalid_lines_are_reported_without_stopping_the_stream(client, firestore):
+    events = post_bulk(client, [
+        {"text": "First", "document_id": "first"},
+        b"{not json",
+        b'{"text": "\xff"}',
+        {"text": ""},
+        {"text": "Last", "document_id": "last"}
+    ])
+
+    errors = [event for event in events if event["event"] == "error"]
+    assert [error["line"] for error in errors] == [2, 3, 4]
+    assert "UTF-8" in errors[1]["error"]
+    assert errors[2]["error"].startswith("text:")
+    assert events[-1] == {"event": "done", "received": 5, "written": 2, "failed": 3}
+    assert sorted(firestore.documents) == ["first", "last"]
+
+
+def test_a_failed_batch_reports_each_of_its_documents(client, firestore, embedding_service):
+    async def fail(texts):
+        raise RuntimeError("embedding quota exceeded")
+
+    embedding_service.embed_documents = fail
+
+    events = post_bulk(client, [
+        {"text": "One", "document_id": "one"},
+        {"text": "Two", "document_id": "two"}
+    ])
+
+    errors = [event for event in events if event["event"] == "error"]
+    assert [error["document_id"] for error in errors] == ["one", "two"]
+    assert all(error["error"] == "embedding quota exceeded" for error in errors)
+    assert events[-1] == {"event": "done", "received": 2, "written": 0, "failed": 2}
+    assert firestore.documents == {}
@@ -0,0 +1,57 @@
+"""Tests for the server-sent events chat endpoint."""
+
+import json
+
+# Same text as the indexed document, so retrieval finds it
+QUERY = "Peter builds APIs with Python and FastAPI"
+
+
+def read_events(response):
+    """Parse a server-sent events body into (event, data) pairs."""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_answer_is_streamed_as_tokens_then_done(client, chat_model):
+    response = client.post("/chat/stream", json={"query": QUERY, "profile": "fast"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["x-accel-buffering"] == "no"
+    events = read_events(response)
+    names = [name for name, _ in events]
+    assert "node_start" in names and "node_end" in names
+    assert names[-1] == "done"
+    tokens = [data["content"] for name, data in events if name == "token"]
+    assert len(tokens) > 1
+    done = events[-1][1]
+    assert "".join(tokens) == done["response"] == chat_model.reply
+    assert done["cached"] is False
+    assert done["conversation_id"]
+    assert [doc["id"] for doc in done["retrieved_context"]] == ["python"]
+
+
+def test_cached_answer_is_sent_as_one_token(client, chat_model):
+    first = read_events(client.post("/chat/stream", json={"query": QUERY, "profile": "fast"}))
+    calls = chat_model.calls
+
+    events = read_events(client.post("/chat/stream", json={"query": QUERY, "profile": "fast"}))
+
+    assert [name for name, _ in events] == ["token", "done"]
+    assert events[0][1]["content"] == first[-1][1]["response"]
+    assert events[1][1]["cached"] is True
+    assert chat_model.calls == calls
+
+
+def test_failures_end_the_stream_with_an_error_event(client, services):
+    def broken_agent(profile=None):
+        raise RuntimeError("graph unavailable")
+
+    services.agent = broken_agent
+
+    events = read_events(client.post("/chat/stream", json={"query": QUERY}))
+
+    assert events == [("error", {"error": "graph unavailable"})]
@@ -0,0 +1,120 @@
+"""Tests for the bounded conversation checkpointer."""
+
+import operator
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from src.config.settings import Settings
+from src.core.checkpointer import BoundedCheckpointSaver
+
+
+class CounterState(TypedDict):
+    turns: Annotated[List[int], operator.add]
+
+
+def make_graph(checkpointer: BoundedCheckpointSaver):
+    """Compile a one-node graph that appends a turn per invocation."""
+    workflow = StateGraph(CounterState)
+    workflow.add_node("count", lambda state: {"turns": [len(state["turns"])]})
+    workflow.add_edge(START, "count")
+    workflow.add_edge("count", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def config(thread_id: str):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+async def test_state_persists_across_turns():
+    graph = make_graph(BoundedCheckpointSaver())
+
+    for _ in range(3):
+        result = await graph.ainvoke({"turns": []}, config("a"))
+
+    assert result["turns"] == [0, 1, 2]
+
+
+async def test_old_checkpoints_are_pruned():
+    saver = BoundedCheckpointSaver(max_checkpoints=4)
+    graph = make_graph(saver)
+
+    for _ in range(10):
+        result = await graph.ainvoke({"turns": []}, config("a"))
+
+    assert result["turns"] == list(range(10))
+    assert len(list(saver.list(config("a")))) == 4
+    assert saver.stats()["pruned_checkpoints"] > 0
+
+
+async def test_least_recently_used_threads_are_evicted():
+    saver = BoundedCheckpointSaver(max_threads=2)
+    graph = make_graph(saver)
+
+    for thread_id in ("a", "b", "a", "c"):
+        await graph.ainvoke({"turns": []}, config(thread_id))
+
+    stats = saver.stats()
+    assert stats["threads"] == 2
+    assert stats["evictions"] == 1
+    assert saver.get_tuple(config("b")) is None
+    assert (await graph.aget_state(config("a"))).values["turns"] == [0, 1]
+
+
+async def test_idle_threads_expire():
+    saver = BoundedCheckpointSaver(ttl_seconds=0)
+    graph = make_graph(saver)
+
+    await graph.ainvoke({"turns": []}, config("a"))
+    result = await graph.ainvoke({"turns": []}, config("a"))
+
+    assert result["turns"] == [0]
+    assert saver.stats()["expirations"] >= 1
+
+
+async def test_evicted_threads_reload_from_disk(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    saver = BoundedCheckpointSaver(max_threads=1, path=path)
+    graph = make_graph(saver)
+
+    await graph.ainvoke({"turns": []}, config("a"))
+    await graph.ainvoke({"turns": []}, config("b"))
+    result = await graph.ainvoke({"turns": []}, config("a"))
+
+    assert result["turns"] == [0, 1]
+    assert saver.stats()["loaded_from_disk"] == 1
+    saver.close()
+
+
+async def test_threads_survive_restart(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    saver = BoundedCheckpointSaver(max_checkpoints=3, path=path)
+    for _ in range(5):
+        await make_graph(saver).ainvoke({"turns": []}, config("a"))
+    saver.close()
+
+    reopened = BoundedCheckpointSaver(max_checkpoints=3, path=path)
+    result = await make_graph(reopened).ainvoke({"turns": []}, config("a"))
+
+    assert result["turns"] == list(range(6))
+    assert len(list(reopened.list(config("a")))) == 3
+    reopened.close()
+
+
+@pytest.mark.parametrize("persistent", [False, True])
+async def test_delete_thread(persistent, tmp_path):
+    saver = BoundedCheckpointSaver(path=str(tmp_path / "checkpoints.db") if persistent else None)
+    graph = make_graph(saver)
+    await graph.ainvoke({"turns": []}, config("a"))
+
+    await saver.adelete_thread("a")
+
+    assert saver.get_tuple(config("a")) is None
+    saver.close()
+
+
+def test_checkpoints_stay_in_memory_by_default(monkeypatch):
+    monkeypatch.delenv("CHECKPOINT_DB_PATH", raising=False)
+
+    assert Settings(_env_file=None).checkpoint_db_path is None
@@ -0,0 +1,55 @@
+"""Tests for token-aware text chunking."""
+
+import pytest
+
+from src.utils.chunking import chunk_text
+from src.utils.tokens import count_tokens
+
+TEXT = " ".join(f"word{i}" for i in range(600))
+
+
+def test_short_text_is_a_single_chunk():
+    chunks = chunk_text("a short text", max_tokens=100)
+
+    assert len(chunks) == 1
+    assert chunks[0].text == "a short text"
+    assert (chunks[0].start, chunks[0].end) == (0, len("a short text"))
+
+
+def test_chunks_are_exact_substrings_within_budget():
+    chunks = chunk_text(TEXT, max_tokens=50, overlap_tokens=10)
+
+    assert len(chunks) > 1
+    for i, chunk in enumerate(chunks):
+        assert chunk.index == i
+        assert chunk.text == TEXT[chunk.start:chunk.end]
+        assert count_tokens(chunk.text) <= 50
+
+
+def test_chunks_cover_text_and_overlap():
+    chunks = chunk_text(TEXT, max_tokens=50, overlap_tokens=10)
+
+    assert chunks[0].start == 0
+    assert chunks[-1].end == len(TEXT)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start < previous.end
+        assert chunk.start > previous.start
+
+
+def test_chunks_without_overlap_are_contiguous():
+    chunks = chunk_text(TEXT, max_tokens=50)
+
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert TEXT[previous.end:chunk.start].strip() == ""
+
+
+def test_boundaries_fall_between_words():
+    words = set(TEXT.split())
+
+    for chunk in chunk_text(TEXT, max_tokens=37, overlap_tokens=5):
+        assert set(chunk.text.split()) <= words
+
+
+def test_invalid_budget_is_rejected():
+    with pytest.raises(ValueError):
+        chunk_text(TEXT, max_tokens=0)
@@ -0,0 +1,41 @@
+"""Tests for the lifecycle of the service container."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import firebase_admin
+import pytest
+from firebase_admin import firestore_async
+
+from src.config import settings
+from src.services.container import ServiceContainer
+
+
+@pytest.fixture
+def container(monkeypatch):
+    monkeypatch.setattr(firebase_admin, "_apps", {"[DEFAULT]": object()})
+    monkeypatch.setattr(firestore_async, "client", lambda *args, **kwargs: MagicMock())
+    monkeypatch.setattr(settings, "embedding_cache_path", None)
+    monkeypatch.setattr(settings, "index_sync_enabled", False)
+    container = ServiceContainer()
+    container.vector_store.load_index = AsyncMock(return_value=0)
+    container.vector_store.save_index_snapshot = AsyncMock()
+    return container
+
+
+async def test_start_loads_the_index_without_a_snapshot_dir(container, monkeypatch):
+    monkeypatch.setattr(settings, "index_snapshot_dir", None)
+
+    await container.start()
+
+    container.vector_store.load_index.assert_awaited_once_with()
+
+
+async def test_close_closes_the_firestore_client(container):
+    db = container.vector_store.db
+    db._transport.close = AsyncMock()
+
+    await container.close()
+
+    db.close.assert_called_once_with()
+    db._transport.close.assert_awaited_once_with()
+    container.vector_store.save_index_snapshot.assert_awaited_once_with()
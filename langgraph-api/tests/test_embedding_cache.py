@@ -0,0 +1,37 @@
+"""Tests for the persistent document embedding cache."""
+
+from src.services.embedding_cache import PersistentEmbeddingCache
+
+
+def test_embeddings_survive_reopening(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    cache = PersistentEmbeddingCache(path)
+    cache.put_many("model-a", ["first", "second"], [[0.1, 0.2], [0.3, 0.4]])
+    cache.close()
+
+    reopened = PersistentEmbeddingCache(path)
+
+    assert reopened.get_many("model-a", ["second", "third", "first"]) == [
+        [0.3, 0.4], None, [0.1, 0.2]
+    ]
+    assert reopened.stats()["entries"] == 2
+    assert (reopened.hits, reopened.misses) == (2, 1)
+    reopened.close()
+
+
+def test_entries_are_scoped_by_model_and_exact_text(tmp_path):
+    cache = PersistentEmbeddingCache(str(tmp_path / "embeddings.sqlite3"))
+    cache.put_many("model-a", ["Text"], [[1.0, 0.0]])
+
+    assert cache.get_many("model-b", ["Text"]) == [None]
+    assert cache.get_many("model-a", ["text", "Text "]) == [None, None]
+    cache.close()
+
+
+def test_lookups_beyond_the_parameter_limit(tmp_path):
+    cache = PersistentEmbeddingCache(str(tmp_path / "embeddings.sqlite3"))
+    texts = [f"text {i}" for i in range(1200)]
+    cache.put_many("model-a", texts, [[float(i)] for i in range(1200)])
+
+    assert cache.get_many("model-a", texts) == [[float(i)] for i in range(1200)]
+    cache.close()
@@ -0,0 +1,74 @@
+"""Tests for the embedding service."""
+
+import numpy as np
+import pytest
+
+from src.services.embedding_cache import PersistentEmbeddingCache, QueryEmbeddingCache
+from src.services.embeddings import EmbeddingService
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = EmbeddingService(
+        query_cache=QueryEmbeddingCache(),
+        document_cache=PersistentEmbeddingCache(str(tmp_path / "embeddings.sqlite3"))
+    )
+    yield service
+    service.document_cache.close()
+    service.client.close()
+
+
+def test_similarities_of_many_candidates(service):
+    scores = service.similarities([1.0, 0.0], [[2.0, 0.0], [1.0, 1.0], [-1.0, 0.0]])
+
+    np.testing.assert_allclose(scores, [1.0, np.sqrt(0.5), 0.0], rtol=1e-6)
+
+
+def test_similarities_of_a_single_candidate(service):
+    scores = service.similarities([[1.0, 0.0], [0.0, 1.0]], [1.0, 0.0])
+
+    assert scores.shape == (2, 1)
+    np.testing.assert_allclose(scores[:, 0], [1.0, 0.0], atol=1e-6)
+
+
+def test_similarities_of_no_candidates(service):
+    assert service.similarities([1.0, 0.0], []).shape == (0,)
+
+
+class FakeEmbeddings:
+    """Stands in for OpenAIEmbeddings, recording the texts sent to the API."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def aembed_documents(self, texts):
+        self.requests.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+async def test_documents_are_embedded_once_per_distinct_text(service):
+    service.embeddings = FakeEmbeddings()
+
+    first = await service.embed_documents(["alpha", "beta", "alpha"])
+    second = await service.embed_documents(["beta", "gamma"])
+
+    assert service.embeddings.requests == [["alpha", "beta"], ["gamma"]]
+    assert first == [[5.0, 1.0], [4.0, 1.0], [5.0, 1.0]]
+    assert second == [[4.0, 1.0], [5.0, 1.0]]
+
+
+async def test_cached_documents_survive_a_restart(service, tmp_path):
+    service.embeddings = FakeEmbeddings()
+    await service.embed_documents(["alpha"])
+    service.document_cache.close()
+
+    restarted = EmbeddingService(
+        query_cache=QueryEmbeddingCache(),
+        document_cache=PersistentEmbeddingCache(str(tmp_path / "embeddings.sqlite3"))
+    )
+    restarted.embeddings = FakeEmbeddings()
+
+    assert await restarted.embed_documents(["alpha"]) == [[5.0, 1.0]]
+    assert restarted.embeddings.requests == []
+    restarted.document_cache.close()
+    restarted.client.close()
@@ -0,0 +1,55 @@
+"""Tests for token-budgeted conversation history."""
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from src.core.history import conversation_turns, format_history, history_tokens, split_history
+
+
+def conversation(turns: int):
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"question {i} " * 10))
+        messages.append(AIMessage(content=f"answer {i} " * 10))
+    return messages
+
+
+def test_window_fits_budget_and_starts_with_user_message():
+    messages = conversation(10)
+
+    older, recent = split_history(messages, max_tokens=100)
+
+    assert older + recent == messages
+    assert history_tokens(recent) <= 100
+    assert recent and isinstance(recent[0], HumanMessage)
+
+
+def test_everything_fits_a_large_budget():
+    messages = conversation(3)
+
+    assert split_history(messages, max_tokens=10_000) == ([], messages)
+
+
+def test_window_never_starts_with_an_answer():
+    messages = conversation(2)
+    budget = history_tokens(messages[1:])
+
+    older, recent = split_history(messages, max_tokens=budget)
+
+    assert older == messages[:2]
+    assert recent == messages[2:]
+
+
+def test_format_history_includes_summary_and_roles():
+    text = format_history("Visitor is a recruiter.", [HumanMessage(content="Hi"), AIMessage(content="Hello")])
+
+    assert text.splitlines() == [
+        "Summary of earlier conversation: Visitor is a recruiter.",
+        "Visitor: Hi",
+        "You: Hello",
+    ]
+
+
+def test_conversation_turns_drop_system_messages():
+    messages = [SystemMessage(content="note"), *conversation(1)]
+
+    assert conversation_turns(messages) == messages[1:]
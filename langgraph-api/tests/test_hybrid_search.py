@@ -0,0 +1,135 @@
+"""Tests for lexical search and reciprocal rank fusion."""
+
+import numpy as np
+import pytest
+
+from conftest import DIMENSION
+from src.services.embedding_index import EmbeddingIndex
+from src.services.lexical_index import BM25Index
+
+
+def result(document_id: str, similarity: float, **fields):
+    """Build a search result."""
+    return {"id": document_id, "similarity": similarity, "parent_id": None, **fields}
+
+
+def test_fuse_sums_reciprocal_ranks():
+    vector = [result("a", 0.9), result("b", 0.8), result("c", 0.7)]
+    lexical = [result("b", 0.8), result("c", 0.7), result("d", 0.6)]
+
+    fused = EmbeddingIndex.fuse(vector, lexical, top_k=10, threshold=0.0, rrf_k=60)
+
+    # b and c appear in both lists and outrank a and d
+    assert [r["id"] for r in fused] == ["b", "c", "a", "d"]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[2]["score"] == pytest.approx(1 / 61)
+
+
+def test_fuse_applies_threshold_to_lexical_only_results():
+    vector = [result("a", 0.9)]
+    lexical = [result("z", 0.1), result("a", 0.9)]
+
+    fused = EmbeddingIndex.fuse(vector, lexical, top_k=10, threshold=0.5)
+
+    assert [r["id"] for r in fused] == ["a"]
+
+
+def test_fuse_keeps_best_chunk_per_parent():
+    vector = [result("p#0", 0.9, parent_id="p"), result("p#1", 0.8, parent_id="p"), result("q", 0.7)]
+
+    fused = EmbeddingIndex.fuse(vector, [], top_k=10, threshold=0.0)
+
+    assert [r["id"] for r in fused] == ["p#0", "q"]
+
+
+def test_fuse_limits_to_top_k():
+    vector = [result(str(i), 0.9) for i in range(10)]
+
+    assert len(EmbeddingIndex.fuse(vector, [], top_k=3, threshold=0.0)) == 3
+
+
+def test_lexical_search_reports_cosine_similarity(rng):
+    index = EmbeddingIndex(DIMENSION, lexical_index=BM25Index())
+    vectors = rng.normal(size=(3, DIMENSION))
+    index.load([
+        ("cats", {"embedding": vectors[0].tolist(), "text": "cats purr and sleep"}),
+        ("dogs", {"embedding": vectors[1].tolist(), "text": "dogs bark at cats"}),
+        ("fish", {"embedding": vectors[2].tolist(), "text": "fish swim"}),
+    ])
+    query = vectors[0].tolist()
+
+    results = index.lexical_search("cats purr", top_k=10, query_embedding=query)
+
+    assert [r["id"] for r in results] == ["cats", "dogs"]
+    assert results[0]["similarity"] == pytest.approx(1.0, abs=1e-5)
+    assert results[0]["coverage"] == pytest.approx(1.0)
+    assert results[1]["coverage"] < 1.0
+    cosine = float(np.dot(vectors[0], vectors[1]) / np.linalg.norm(vectors[0]) / np.linalg.norm(vectors[1]))
+    assert results[1]["similarity"] == pytest.approx(max(cosine, 0.0), abs=1e-5)
+
+
+def test_lexical_search_honours_filters(rng):
+    index = EmbeddingIndex(DIMENSION, lexical_index=BM25Index())
+    vectors = rng.normal(size=(2, DIMENSION))
+    index.load([
+        ("a", {"embedding": vectors[0].tolist(), "text": "python", "metadata": {"lang": "en"}}),
+        ("b", {"embedding": vectors[1].tolist(), "text": "python", "metadata": {"lang": "sv"}}),
+    ])
+
+    results = index.lexical_search("python", 10, filters={"lang": "sv"})
+
+    assert [r["id"] for r in results] == ["b"]
+
+
+def test_lexical_search_without_embedding_reports_coverage(rng):
+    index = EmbeddingIndex(DIMENSION, lexical_index=BM25Index())
+    vectors = rng.normal(size=(2, DIMENSION))
+    index.load([
+        ("a", {"embedding": vectors[0].tolist(), "text": "python fastapi"}),
+        ("b", {"embedding": vectors[1].tolist(), "text": "python"}),
+    ])
+
+    results = index.lexical_search("python fastapi", 10)
+
+    assert [r["id"] for r in results] == ["a", "b"]
+    assert [r["similarity"] for r in results] == [r["coverage"] for r in results]
+    assert results[0]["similarity"] == pytest.approx(1.0)
+
+
+def load_store(vector_store, embedding_service):
+    texts = {"python": "Peter writes Python", "cooking": "Peter likes cooking pasta"}
+    vector_store.index.load([
+        (doc_id, {"embedding": embedding_service.vector(text), "text": text})
+        for doc_id, text in texts.items()
+    ])
+
+
+async def test_hybrid_fast_path_skips_the_embedding(vector_store, embedding_service):
+    load_store(vector_store, embedding_service)
+
+    results = await vector_store.search("python", top_k=1, threshold=0.9, mode="hybrid")
+
+    assert [r["id"] for r in results] == ["python"]
+    assert embedding_service.calls == 0
+
+
+async def test_lexical_mode_skips_the_embedding(vector_store, embedding_service):
+    load_store(vector_store, embedding_service)
+
+    results = await vector_store.search("pasta recipes", mode="lexical")
+
+    assert [r["id"] for r in results] == ["cooking"]
+    assert embedding_service.calls == 0
+
+
+async def test_hybrid_fusion_embeds_and_reports_cosine(vector_store, embedding_service):
+    load_store(vector_store, embedding_service)
+    # Too many terms for the fast path
+    query = "how often does Peter write Python code"
+    embedding_service.vectors[query] = embedding_service.vector("Peter writes Python")
+
+    results = await vector_store.search(query, top_k=2, threshold=0.5, mode="hybrid")
+
+    assert embedding_service.calls == 1
+    assert [r["id"] for r in results] == ["python"]
+    assert results[0]["similarity"] == pytest.approx(1.0, abs=1e-5)
@@ -0,0 +1,162 @@
+"""Tests for saving and restoring embedding index snapshots."""
+
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from conftest import DIMENSION
+from src.services.embedding_index import EmbeddingIndex
+from src.services.index_snapshot import (
+    MANIFEST_FILE,
+    _snapshot_lock,
+    load_snapshot,
+    save_snapshot
+)
+from src.services.lexical_index import BM25Index
+
+
+def test_round_trip_preserves_results_and_watermark(documents, rng, tmp_path):
+    newest = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    for i, (_, data) in enumerate(documents):
+        data["updated_at"] = newest - timedelta(minutes=i)
+    index = EmbeddingIndex(DIMENSION)
+    index.load(documents)
+
+    save_snapshot(index, str(tmp_path), "docs")
+    restored = EmbeddingIndex(DIMENSION)
+    watermark = load_snapshot(restored, str(tmp_path), "docs")
+
+    assert watermark == newest
+    assert len(restored) == len(index)
+    for query in rng.normal(size=(3, DIMENSION)).tolist():
+        assert restored.search(query, 5, 0.0) == index.search(query, 5, 0.0)
+    filtered = restored.search(query, 5, 0.0, filters={"category": "even"})
+    assert all(result["metadata"]["category"] == "even" for result in filtered)
+
+
+def test_restore_rebuilds_lexical_index_from_text(documents, tmp_path):
+    index = EmbeddingIndex(DIMENSION, lexical_index=BM25Index())
+    index.load(documents)
+    save_snapshot(index, str(tmp_path), "docs")
+
+    restored = EmbeddingIndex(DIMENSION, lexical_index=BM25Index())
+    load_snapshot(restored, str(tmp_path), "docs")
+
+    results = restored.lexical_search("42", 1)
+    assert [result["id"] for result in results] == ["doc-42"]
+
+
+def test_restored_index_accepts_writes(documents, rng, tmp_path):
+    index = EmbeddingIndex(DIMENSION)
+    index.load(documents)
+    save_snapshot(index, str(tmp_path), "docs")
+    restored = EmbeddingIndex(DIMENSION)
+    load_snapshot(restored, str(tmp_path), "docs")
+
+    query = rng.normal(size=DIMENSION).tolist()
+    restored.upsert("new", {"embedding": query, "text": "new"})
+    restored.remove("doc-0")
+
+    assert restored.search(query, 1, 0.0)[0]["id"] == "new"
+    assert "doc-0" not in restored.document_ids()
+
+
+def test_writes_after_restore_leave_snapshot_rows_shared(documents, rng, tmp_path):
+    index = EmbeddingIndex(DIMENSION)
+    index.load(documents)
+    save_snapshot(index, str(tmp_path), "docs")
+    restored = EmbeddingIndex(DIMENSION)
+    load_snapshot(restored, str(tmp_path), "docs")
+    mapped = restored._matrix.base
+    before = np.array(mapped)
+
+    # Enough inserts to grow the tail several times
+    for i in range(100):
+        restored.upsert(f"new-{i}", {"embedding": rng.normal(size=DIMENSION).tolist()})
+    query = rng.normal(size=DIMENSION).tolist()
+    restored.upsert("doc-1", {"embedding": query})
+    restored.remove("doc-2")
+
+    assert restored._matrix.base is mapped
+    assert not mapped.flags.writeable
+    np.testing.assert_array_equal(mapped, before)
+    assert restored.search(query, 1, 0.0)[0]["id"] == "doc-1"
+    assert restored.payload("doc-1")["metadata"] == documents[1][1]["metadata"]
+    assert len(restored) == len(documents) + 99
+    batch = restored.search_many([query, query], 1, 0.0)
+    assert [results[0]["id"] for results in batch] == ["doc-1", "doc-1"]
+
+
+def test_reload_after_restore_replaces_snapshot_rows(documents, tmp_path):
+    index = EmbeddingIndex(DIMENSION)
+    index.load(documents)
+    save_snapshot(index, str(tmp_path), "docs")
+    restored = EmbeddingIndex(DIMENSION)
+    load_snapshot(restored, str(tmp_path), "docs")
+
+    restored.load(documents[:10])
+
+    assert restored.document_ids() == [document_id for document_id, _ in documents[:10]]
+    assert restored._matrix.flags.writeable
+
+
+def test_saves_wait_for_the_snapshot_lock(documents, tmp_path):
+    index = EmbeddingIndex(DIMENSION)
+    index.load(documents)
+    snapshot_dir = tmp_path / "docs"
+    snapshot_dir.mkdir()
+
+    with _snapshot_lock(snapshot_dir, exclusive=False):
+        writer = threading.Thread(target=save_snapshot, args=(index, str(tmp_path), "docs"))
+        writer.start()
+        writer.join(timeout=0.2)
+        assert writer.is_alive()
+        assert not (snapshot_dir / MANIFEST_FILE).exists()
+    writer.join()
+
+    assert (snapshot_dir / MANIFEST_FILE).exists()
+
+
+def test_concurrent_saves_keep_the_manifest_matrix(documents, tmp_path):
+    index = EmbeddingIndex(DIMENSION)
+    index.load(documents)
+
+    writers = [
+        threading.Thread(target=save_snapshot, args=(index, str(tmp_path), "docs"))
+        for _ in range(4)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+
+    snapshot_dir = tmp_path / "docs"
+    manifest = json.loads((snapshot_dir / MANIFEST_FILE).read_text())
+    assert [path.name for path in snapshot_dir.glob("embeddings-*.npy")] == [
+        manifest["matrix_file"]
+    ]
+    restored = EmbeddingIndex(DIMENSION)
+    load_snapshot(restored, str(tmp_path), "docs")
+    assert len(restored) == len(documents)
+
+
+def test_corrupt_matrix_is_rejected(documents, tmp_path):
+    index = EmbeddingIndex(DIMENSION)
+    index.load(documents)
+    manifest_path = save_snapshot(index, str(tmp_path), "docs")
+    matrix_file = json.loads(manifest_path.read_text())["matrix_file"]
+    with open(manifest_path.parent / matrix_file, "r+b") as matrix:
+        matrix.seek(-4, 2)
+        matrix.write(b"\x00\x00\x80\x7f")
+
+    assert load_snapshot(EmbeddingIndex(DIMENSION), str(tmp_path), "docs") is None
+
+
+def test_dimension_mismatch_is_rejected(documents, tmp_path):
+    index = EmbeddingIndex(DIMENSION)
+    index.load(documents)
+    save_snapshot(index, str(tmp_path), "docs")
+
+    assert load_snapshot(EmbeddingIndex(DIMENSION * 2), str(tmp_path), "docs") is None
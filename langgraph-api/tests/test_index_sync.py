@@ -0,0 +1,105 @@
+"""Tests for keeping the embedding index in sync with snapshot listeners."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from conftest import DIMENSION
+from fake_firestore import FakeCollection
+from src.services.embedding_index import EmbeddingIndex
+from src.services.index_sync import IndexSynchronizer
+
+
+@pytest.fixture
+def vectors(rng):
+    return rng.normal(size=(4, DIMENSION)).tolist()
+
+
+@pytest.fixture
+def collection(vectors):
+    collection = FakeCollection()
+    written = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    collection.documents["a"] = {"embedding": vectors[0], "text": "alpha", "updated_at": written}
+    collection.documents["b"] = {"embedding": vectors[1], "text": "beta", "updated_at": written}
+    return collection
+
+
+def top_id(index: EmbeddingIndex, query):
+    results = index.search(query, top_k=1, threshold=0.0)
+    return results[0]["id"] if results else None
+
+
+def loaded_index(collection) -> EmbeddingIndex:
+    """Index loaded from the collection, as load_index does before syncing."""
+    index = EmbeddingIndex(DIMENSION)
+    index.load(list(collection.documents.items()))
+    return index
+
+
+def test_add_modify_and_remove_reach_the_index(collection, vectors):
+    index = loaded_index(collection)
+    sync = IndexSynchronizer(collection, index)
+    sync.start()
+
+    assert sync.wait_until_synced(timeout=1)
+    assert sorted(index.document_ids()) == ["a", "b"]
+
+    collection.set("c", {"embedding": vectors[2], "text": "gamma"})
+    assert top_id(index, vectors[2]) == "c"
+
+    collection.set("a", {"embedding": vectors[3], "text": "alpha, revised"})
+    assert top_id(index, vectors[3]) == "a"
+    assert index.payload("a")["text"] == "alpha, revised"
+
+    collection.delete("b")
+    assert "b" not in index.document_ids()
+
+    stats = sync.stats()
+    assert stats["synced"] and stats["running"]
+    # The unchanged initial documents are not rewritten
+    assert stats["snapshots"] == 4
+    assert stats["changes_applied"] == 3
+    assert stats["lag_seconds"] is not None
+
+
+def test_initial_snapshot_reconciles_a_stale_index(collection, vectors):
+    index = EmbeddingIndex(DIMENSION)
+    index.load([
+        ("a", {"embedding": vectors[0], "text": "alpha"}),
+        ("deleted-while-offline", {"embedding": vectors[3], "text": "gone"}),
+    ])
+
+    IndexSynchronizer(collection, index).start()
+
+    assert sorted(index.document_ids()) == ["a", "b"]
+
+
+def test_chunked_parents_are_dropped(collection, vectors):
+    index = loaded_index(collection)
+    IndexSynchronizer(collection, index).start()
+
+    collection.set("a", {"text": "alpha", "chunk_count": 2})
+    collection.set("a#0", {"embedding": vectors[0], "text": "al", "parent_id": "a"})
+
+    assert "a" not in index.document_ids()
+    assert index.search(vectors[0], top_k=1, threshold=0.0)[0]["parent_id"] == "a"
+
+
+def test_stop_unsubscribes(collection, vectors):
+    index = loaded_index(collection)
+    sync = IndexSynchronizer(collection, index)
+    sync.start()
+    sync.stop()
+
+    collection.set("c", {"embedding": vectors[2], "text": "gamma"})
+
+    assert not sync.running
+    assert "c" not in index.document_ids()
+
+
+def test_sync_requires_a_loaded_index(collection):
+    sync = IndexSynchronizer(collection, EmbeddingIndex(DIMENSION))
+
+    with pytest.raises(RuntimeError):
+        sync.start()
+    assert not collection.watches
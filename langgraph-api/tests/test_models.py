@@ -0,0 +1,31 @@
+"""Tests for request model validation."""
+
+import pytest
+from pydantic import ValidationError
+
+from src.models import BatchSearchRequest, ChatRequest
+
+
+def test_chat_requests_without_id_start_separate_conversations():
+    first = ChatRequest(query="Hej")
+    second = ChatRequest(query="Hej")
+
+    assert first.conversation_id
+    assert first.conversation_id != second.conversation_id
+
+
+def test_chat_request_keeps_given_conversation_id():
+    assert ChatRequest(query="Hej", conversation_id="abc").conversation_id == "abc"
+
+
+@pytest.mark.parametrize("query", ["", "   "])
+def test_batch_search_rejects_blank_queries(query):
+    with pytest.raises(ValidationError):
+        BatchSearchRequest(queries=["Python", query])
+
+
+def test_batch_search_endpoint_returns_422_for_blank_queries(client):
+    response = client.post("/search/batch", json={"queries": ["Python", " "]})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "queries", 1]
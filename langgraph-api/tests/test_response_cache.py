@@ -0,0 +1,76 @@
+"""Tests for the semantic response cache and its use by the chat endpoint."""
+
+from src.services.response_cache import ResponseCache
+
+QUERY = "What has Peter built with Python?"
+
+
+def test_lookup_is_scoped_to_filters_profile_and_model():
+    cache = ResponseCache(max_size=4, similarity_threshold=0.9)
+    scope = cache.scope({"lang": "en"}, "fast", "gpt-4o-mini")
+    cache.put([1.0, 0.0], scope, {"response": "cached"}, {})
+
+    assert cache.get([1.0, 0.01], scope, lambda doc_id: None) == {"response": "cached"}
+    for other in (
+        cache.scope(None, "fast", "gpt-4o-mini"),
+        cache.scope({"lang": "en"}, "quality", "gpt-4o-mini"),
+        cache.scope({"lang": "en"}, "fast", "gpt-4o"),
+    ):
+        assert cache.get([1.0, 0.0], other, lambda doc_id: None) is None
+
+
+def test_stale_citations_miss():
+    cache = ResponseCache(max_size=4, similarity_threshold=0.9)
+    scope = cache.scope(None, "fast", "gpt-4o-mini")
+    cache.put([1.0, 0.0], scope, {"response": "cached"}, {"doc": 1})
+
+    assert cache.get([1.0, 0.0], scope, lambda doc_id: 2) is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_written_documents_invalidate_answers_citing_them():
+    cache = ResponseCache(max_size=4, similarity_threshold=0.9)
+    scope = cache.scope(None, "fast", "gpt-4o-mini")
+    cache.put([1.0, 0.0], scope, {"response": "cached"}, {"doc": 1})
+
+    assert cache.invalidate(["doc"]) == 1
+    assert cache.get([1.0, 0.0], scope, lambda doc_id: 1) is None
+
+
+def test_first_turn_of_a_new_session_is_served_from_cache(client, services, chat_model):
+    first = client.post("/chat/", json={"query": QUERY, "profile": "fast"})
+    assert first.status_code == 200
+    assert first.json()["cached"] is False
+    calls = chat_model.calls
+
+    second = client.post("/chat/", json={"query": QUERY, "profile": "fast"})
+
+    body = second.json()
+    assert body["cached"] is True
+    assert body["response"] == first.json()["response"]
+    assert body["conversation_id"] != first.json()["conversation_id"]
+    assert chat_model.calls == calls
+    # The cached turn is part of the new conversation's history
+    state = services.agent("fast").get_state({"configurable": {"thread_id": body["conversation_id"]}})
+    assert [m.content for m in state.values["messages"]] == [QUERY, body["response"]]
+
+
+def test_answers_are_not_shared_between_profiles(client, chat_model):
+    client.post("/chat/", json={"query": QUERY, "profile": "fast"})
+
+    response = client.post("/chat/", json={"query": QUERY, "profile": "quality"})
+
+    assert response.json()["cached"] is False
+
+
+def test_later_turns_are_not_served_from_cache(client):
+    first = client.post("/chat/", json={"query": QUERY, "profile": "fast"})
+    conversation_id = first.json()["conversation_id"]
+    client.post("/chat/", json={"query": "Something else about Peter", "profile": "fast"})
+
+    response = client.post(
+        "/chat/",
+        json={"query": QUERY, "profile": "fast", "conversation_id": conversation_id}
+    )
+
+    assert response.json()["cached"] is False
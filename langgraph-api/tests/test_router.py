@@ -0,0 +1,68 @@
+"""Tests for the local retrieval router."""
+
+import numpy as np
+import pytest
+
+from src.core.router import RetrievalRouter, Route, load_model, save_model, train_model
+
+
+async def no_embedding(query: str):
+    raise AssertionError("rules must decide without an embedding")
+
+
+@pytest.mark.parametrize("query, should_retrieve", [
+    ("hej!", False),
+    ("Thanks", False),
+    ("What did Peter study?", True),
+    ("Vad har du jobbat med?", True),
+])
+async def test_rules_decide_without_embedding(query, should_retrieve):
+    route = await RetrievalRouter().route(query, no_embedding)
+
+    assert route == Route(should_retrieve, "rule")
+
+
+async def test_without_model_the_llm_decides():
+    async def embed(query: str):
+        return [0.0] * 4
+
+    route = await RetrievalRouter().route("Explain quantum tunnelling", embed)
+
+    assert route.should_retrieve is None
+    assert route.source == "llm"
+
+
+async def test_classifier_decides_when_confident(tmp_path):
+    rng = np.random.default_rng(0)
+    positives = rng.normal(loc=1.0, size=(50, 8))
+    negatives = rng.normal(loc=-1.0, size=(50, 8))
+    weights, bias = train_model(
+        np.vstack([positives, negatives]) / 4,
+        np.array([1] * 50 + [0] * 50)
+    )
+    path = str(tmp_path / "router.npz")
+    save_model(path, weights, bias)
+    router = RetrievalRouter(model_path=path, confidence=0.8)
+
+    async def embed(query: str):
+        return (np.ones(8) if query == "yes" else -np.ones(8)).tolist()
+
+    assert (await router.route("yes", embed)).should_retrieve is True
+    assert (await router.route("no", embed)).should_retrieve is False
+    assert router.stats()["decisions"]["classifier"] == 2
+    loaded_weights, loaded_bias = load_model(path)
+    assert np.allclose(loaded_weights, weights)
+    assert loaded_bias == pytest.approx(bias)
+
+
+def test_llm_decisions_are_logged_only_when_enabled(tmp_path):
+    log_path = tmp_path / "decisions.jsonl"
+    router = RetrievalRouter()
+    router.record("query", Route(None, "llm"), True, 0.1)
+    assert not log_path.exists()
+
+    router = RetrievalRouter(log_path=str(log_path))
+    router.record("query", Route(None, "llm", 0.8), True, 0.1)
+
+    assert len(log_path.read_text().splitlines()) == 1
+    assert router.stats()["accuracy"] == 1.0
@@ -0,0 +1,62 @@
+"""Tests for loading the index from a projection and fetching text for BM25."""
+
+import asyncio
+
+import pytest
+
+from fake_firestore import FakeAsyncFirestore
+from src.config import settings
+from src.services import firebase_vector_store
+
+
+@pytest.fixture
+def firestore(vector_store, embedding_service):
+    documents = {
+        f"doc-{i}": {
+            "embedding": embedding_service.vector(f"text {i}"),
+            "text": f"Peter project number{i}",
+            "metadata": {}
+        }
+        for i in range(5)
+    }
+    vector_store.db = FakeAsyncFirestore(documents)
+    return vector_store.db
+
+
+async def text_loaded():
+    task = firebase_vector_store._text_load_task
+    if task is not None:
+        await asyncio.wait_for(task, timeout=5)
+    return firebase_vector_store._texts_loaded
+
+
+async def test_vector_mode_loads_no_text(vector_store, firestore, monkeypatch):
+    monkeypatch.setattr(settings, "search_mode", "vector")
+
+    assert await vector_store.load_index() == 5
+
+    assert firebase_vector_store._text_load_task is None
+    assert len(vector_store.index.unhydrated(vector_store.index.document_ids())) == 5
+    await vector_store.search("Peter", mode="vector", threshold=0.01)
+    assert firebase_vector_store._text_load_task is None
+
+
+async def test_first_lexical_search_fetches_text(vector_store, firestore, monkeypatch):
+    monkeypatch.setattr(settings, "search_mode", "vector")
+    await vector_store.load_index()
+
+    await vector_store.search("number3", mode="lexical")
+    assert await text_loaded()
+
+    results = await vector_store.search("number3", mode="lexical")
+    assert [r["id"] for r in results] == ["doc-3"]
+    assert not vector_store.index.unhydrated(vector_store.index.document_ids())
+
+
+async def test_lexical_default_fetches_text_after_load(vector_store, firestore, monkeypatch):
+    monkeypatch.setattr(settings, "search_mode", "hybrid")
+
+    await vector_store.load_index()
+
+    assert await text_loaded()
+    assert firestore.get_all_calls == 1
@@ -0,0 +1,108 @@
+"""Tests for the nearest-neighbour backends behind the embedding index."""
+
+import numpy as np
+import pytest
+
+from conftest import DIMENSION, brute_force
+from src.services.embedding_index import EmbeddingIndex
+from src.services.vector_index import ExactIndex, IVFFlatIndex, ScalarQuantizedIndex
+
+
+def make_index(backend: str, documents) -> EmbeddingIndex:
+    """Build an index over the documents with the given backend."""
+    vector_index = {
+        "exact": ExactIndex(),
+        # Probing every list makes IVF exhaustive, so results are exact
+        "ivf": IVFFlatIndex(nlist=16, nprobe=16, min_train_size=256),
+        "sq8": ScalarQuantizedIndex(rerank_factor=4),
+    }[backend]
+    index = EmbeddingIndex(DIMENSION, vector_index=vector_index)
+    index.load(documents)
+    return index
+
+
+@pytest.mark.parametrize("backend", ["exact", "ivf", "sq8"])
+def test_top_k_matches_brute_force(backend, documents, rng):
+    index = make_index(backend, documents)
+
+    for query in rng.normal(size=(5, DIMENSION)):
+        results = index.search(query.tolist(), top_k=10, threshold=0.0)
+        expected = brute_force(documents, query, 10)
+
+        ids = [result["id"] for result in results]
+        if backend == "sq8":
+            # Quantized scores may swap near-ties, re-ranking restores the set
+            assert len(set(ids) & set(expected)) >= 9
+        else:
+            assert ids == expected[:len(ids)]
+        similarities = [result["similarity"] for result in results]
+        assert similarities == sorted(similarities, reverse=True)
+
+
+@pytest.mark.parametrize("backend", ["exact", "ivf", "sq8"])
+def test_filters_only_return_matching_documents(backend, documents, rng):
+    index = make_index(backend, documents)
+    query = rng.normal(size=DIMENSION)
+
+    results = index.search(query.tolist(), top_k=10, threshold=0.0, filters={"category": "odd"})
+
+    expected = brute_force(
+        documents, query, 10,
+        keep=lambda doc_id, data: data["metadata"]["category"] == "odd"
+    )
+    assert [result["id"] for result in results] == expected[:len(results)]
+    assert all(result["metadata"]["category"] == "odd" for result in results)
+
+
+@pytest.mark.parametrize("backend", ["exact", "ivf", "sq8"])
+def test_removed_and_updated_documents(backend, documents, rng):
+    index = make_index(backend, documents)
+    query = rng.normal(size=DIMENSION)
+    best = index.search(query.tolist(), top_k=1, threshold=0.0)[0]["id"]
+
+    index.remove(best)
+    assert best not in [r["id"] for r in index.search(query.tolist(), top_k=10, threshold=0.0)]
+
+    index.upsert("new", {"embedding": query.tolist(), "text": "the query itself"})
+    top = index.search(query.tolist(), top_k=1, threshold=0.0)[0]
+    assert top["id"] == "new"
+    assert top["similarity"] == pytest.approx(1.0, abs=1e-3)
+
+
+def test_threshold_drops_dissimilar_documents(documents, rng):
+    index = make_index("exact", documents)
+    query = np.asarray(documents[0][1]["embedding"])
+
+    results = index.search(query.tolist(), top_k=10, threshold=0.99)
+
+    assert [result["id"] for result in results] == ["doc-0"]
+
+
+def test_sq8_keeps_only_codes_resident(documents):
+    index = make_index("sq8", documents)
+
+    assert isinstance(index._matrix, np.memmap)
+    assert index.vector_index.stats()["memory_bytes"] < len(documents) * DIMENSION * 4
+
+
+def test_sq8_rebuilds_when_inserts_saturate_the_scales(documents):
+    index = make_index("sq8", documents)
+    vector_index = index.vector_index
+    axis = np.zeros(DIMENSION)
+    axis[0] = 1.0
+
+    # Unit vectors along one axis lie outside the scales fitted to random rows
+    index.upsert("axis-0", {"embedding": axis.tolist()})
+    assert vector_index.stats()["saturated_inserts"] == 1
+
+    limit = int(vector_index.saturation_limit * len(documents))
+    for i in range(1, limit + 1):
+        index.upsert(f"axis-{i}", {"embedding": axis.tolist()})
+
+    assert vector_index.stats()["saturated_inserts"] == 0
+    row = index._rows["axis-0"]
+    decoded = vector_index._codes[row] * vector_index._scale
+    np.testing.assert_allclose(decoded, axis, atol=1e-2)
+    results = index.search(axis.tolist(), top_k=1, threshold=0.0)
+    assert results[0]["id"].startswith("axis-")
+    assert results[0]["similarity"] == pytest.approx(1.0)
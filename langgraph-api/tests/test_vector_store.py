@@ -0,0 +1,14 @@
+"""Tests for FirebaseVectorStore search over the resident index."""
+
+
+async def test_search_makes_no_firestore_round_trips(vector_store, embedding_service, documents):
+    documents[7][1]["embedding"] = embedding_service.vector("where is document seven")
+    vector_store.index.load(documents)
+
+    results = await vector_store.search("where is document seven", top_k=3, threshold=0.0)
+    batches = await vector_store.search_batch(["where is document seven"], top_k=3, threshold=0.0)
+
+    assert results[0]["id"] == "doc-7"
+    assert results[0]["text"] == "document number 7"
+    assert [result["id"] for result in batches[0]] == [result["id"] for result in results]
+    assert vector_store.db.mock_calls == []